@@ -0,0 +1,210 @@
+"""Throughput benchmark of every stage of the pipeline on synthetic models
+
+    python -m benchmarks.pipeline --models 4 --parameters 2000000 --tensors 120 --output benchmark.json
+
+Serialization, analysis, plotting and persistence are timed separately, every stage reports
+tensors/s, bytes/s, the peak of the memory it allocated and the peak resident set size of the
+process after the stage. The allocations are traced with `tracemalloc` in one extra, untimed
+repetition, thus tracing does not distort the times. The report is written as JSON, thus runs of
+different versions can be compared
+"""
+import os
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import numpy as np
+
+
+import tfwda.analyse.standard
+import tfwda.analyse.parallel
+import tfwda.instrumentation.standard
+import tfwda.logger.standard
+import tfwda.model.standard
+import tfwda.serializer.standard
+import tfwda.plotter.raster
+import tfwda.persistence.columnar
+import benchmarks.synthetic
+
+
+STAGES = ['serialize', 'analyse', 'plot', 'persist']
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True, text = True, check = True,
+                              cwd = os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Stopwatch:
+    """Measures the best wall time of a stage over several repetitions and the peak of the memory
+    the stage allocates
+
+    Parameters
+    ----------
+        tensors : int
+            Number of tensors a repetition processes
+        bytes   : int
+            Number of bytes a repetition processes
+
+    Attributes
+    ----------
+        traced : bool
+            Whether the next repetitions trace the allocations with `tracemalloc` instead of being timed,
+            tracing has to be started by the caller
+    """
+
+
+    def __init__(self, tensors: int, bytes: int):
+        self.tensors = tensors
+        self.bytes   = bytes
+        self.traced  = False
+        self.times   = []
+        self.peaks   = []
+        self.rss     = []
+
+
+    def __enter__(self) -> 'Stopwatch':
+        if self.traced:
+            tracemalloc.reset_peak()
+            self.__baseline = tracemalloc.get_traced_memory()[0]
+        self.__start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exception) -> None:
+        seconds = time.perf_counter() - self.__start
+        if self.traced:
+            self.peaks.append(tracemalloc.get_traced_memory()[1] - self.__baseline)
+            return
+        self.times.append(seconds)
+        self.rss.append(tfwda.instrumentation.standard.peak_rss())
+
+
+    def report(self) -> dict:
+        """Best time, throughput and peak memory of the stage, the peak is None if no repetition was traced"""
+        seconds = min(self.times)
+        return {'seconds': seconds, 'mean_seconds': float(np.mean(self.times)), 'repeats': len(self.times),
+                'tensors_per_second': self.tensors / seconds if seconds > 0 else float('inf'),
+                'bytes_per_second': self.bytes / seconds if seconds > 0 else float('inf'),
+                'peak_memory_bytes': max(self.peaks) if self.peaks else None,
+                'process_peak_rss_bytes': self.rss[0]}
+
+
+def run(models: list, repeats: int = 3, workers: int = 1, batched: bool = False, plot: bool = True, trace: bool = True) -> dict:
+    """Runs every stage of the pipeline `repeats` times on the models and, if `trace` is set, once more
+    under `tracemalloc`. Allocations of worker processes are not traced
+
+    Parameters
+    ----------
+        models  : list[model.standard.IFModel]
+            Models which are processed
+        repeats : int
+            Number of repetitions of every stage, the best time is reported
+        workers : int
+            Number of workers of the analysis and of the raster plotter
+        batched : bool
+            Whether the analyser processes small weights in one segmented batch
+        plot    : bool
+            Whether the plotting stage is run, it dominates the run time
+        trace   : bool
+            Whether the peak memory of every stage is traced in an extra repetition
+
+    Returns
+    -------
+        dict
+            Report per stage, see `Stopwatch.report`
+    """
+    logger     = tfwda.logger.standard.Logger(False)
+    serializer = tfwda.serializer.standard.Serializer(logger)
+    if workers > 1:
+        analyser = tfwda.analyse.parallel.ParallelAnalyser(logger, workers, batched = batched)
+    else:
+        analyser = tfwda.analyse.standard.Analyser(logger, batched = batched)
+
+    tensors = sum(len(model.weights) for model in models)
+    size    = sum(int(np.prod(tfwda.model.standard.shape_of(weight))) * np.dtype(tfwda.model.standard.dtype_of(weight)).itemsize
+                  for model in models for weight in model.weights)
+    watches = {stage: Stopwatch(tensors, size) for stage in STAGES}
+    with tempfile.TemporaryDirectory() as directory:
+        plotter = tfwda.plotter.raster.RasterPlotter(logger, directory, workers = workers)
+        for repeat in range(repeats + 1 if trace else repeats):
+            if repeat == repeats:
+                for watch in watches.values():
+                    watch.traced = True
+                tracemalloc.start()
+            with watches['serialize']:
+                serialized = [serializer.flatten(model) for model in models]
+            with watches['analyse']:
+                information = [analyser.process({'weights': weights, 'metadata': metadata}) for weights, metadata in serialized]
+            if plot:
+                with watches['plot']:
+                    for model, (weights, metadata), info in zip(models, serialized, information):
+                        plotter.plot(model.name, weights, metadata, info['histograms'])
+            store = tfwda.persistence.columnar.ColumnarResultStore(os.path.join(directory, f"results-{repeat}"))
+            with watches['persist']:
+                for model, info in zip(models, information):
+                    store.write(model.name, info)
+                store.close()
+            del serialized, information
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        plotter.close()
+    if workers > 1:
+        analyser.close()
+
+    return {stage: watch.report() for stage, watch in watches.items() if watch.times}
+
+
+def main(arguments: list = None) -> dict:
+    parser = argparse.ArgumentParser(description = "Throughput benchmark of every stage of the pipeline on synthetic models")
+    parser.add_argument("--models", type = int, default = 2, help = "number of models")
+    parser.add_argument("--parameters", type = int, default = 1_000_000, help = "approximate number of parameters per model")
+    parser.add_argument("--tensors", type = int, default = 100, help = "number of tensors per model")
+    parser.add_argument("--mix", type = str, default = None, help = "tensor mix as JSON, e.g. '{\"conv\": 0.5, \"vector\": 0.5}'")
+    parser.add_argument("--dtype", type = str, default = "float32", help = "dtype of the weights")
+    parser.add_argument("--keras", action = "store_true", help = "build Keras models instead of numpy weight sets")
+    parser.add_argument("--repeats", type = int, default = 3, help = "repetitions per stage, the best time is reported")
+    parser.add_argument("--workers", type = int, default = 1, help = "workers of the analysis and of the plotter")
+    parser.add_argument("--batched", action = "store_true", help = "segmented batch analysis of small weights")
+    parser.add_argument("--no-plot", action = "store_true", help = "skip the plotting stage")
+    parser.add_argument("--no-trace", action = "store_true", help = "skip the traced repetition, no peak memory per stage is reported")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the synthetic weights")
+    parser.add_argument("--output", type = str, default = None, help = "path of the JSON report")
+    args = parser.parse_args(arguments)
+
+    if args.keras:
+        models = [benchmarks.synthetic.keras_model(f"Synthetic{index}", layers = max(1, args.tensors // 6),
+                                                   width = max(1, int(np.sqrt(args.parameters / max(1, args.tensors // 6) / 9))))
+                  for index in range(args.models)]
+    else:
+        mix    = json.loads(args.mix) if args.mix is not None else None
+        models = [benchmarks.synthetic.synthetic_model(f"Synthetic{index}", args.parameters, args.tensors, mix, args.dtype, args.seed + index)
+                  for index in range(args.models)]
+
+    report = {
+        'revision': _revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'config': vars(args),
+        'stages': run(models, args.repeats, args.workers, args.batched, not args.no_plot, not args.no_trace)
+    }
+    for stage, result in report['stages'].items():
+        peak = f"{result['peak_memory_bytes'] / 1024 ** 2:>10.1f} MiB peak" if result['peak_memory_bytes'] is not None else f"{'-':>14} peak"
+        print(f"{stage:<10} {result['seconds']:>10.4f} s {result['tensors_per_second']:>12.1f} tensors/s "
+              f"{result['bytes_per_second'] / 1024 ** 2:>10.1f} MiB/s {peak} {result['process_peak_rss_bytes'] / 1024 ** 2:>10.1f} MiB process peak RSS")
+    if args.output is not None:
+        with open(args.output, "w") as report_file:
+            json.dump(report, report_file, indent = 4)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import numpy as np
+from typing import Optional
+
+
+import tfwda.model.standard
+import tfwda.model.checkpoint
+
+
+# relative frequency of the tensor kinds of typical convolutional networks
+DEFAULT_MIX = {'conv': 0.3, 'dense': 0.1, 'vector': 0.6}
+
+
+class SyntheticModel(tfwda.model.standard.IFModel):
+    """Model whose weights are plain numpy arrays, it is built offline and deterministically
+    out of a seed, thus every run of a benchmark sees the same weights
+
+    Parameters
+    ----------
+        name    : str
+            Name of the model
+        weights : list[model.checkpoint.MappedVariable]
+            Weights of the model
+    """
+
+
+    def __init__(self, name: str, weights: list[tfwda.model.checkpoint.MappedVariable]) -> None:
+        self.name    = name
+        self.weights = weights
+
+
+    def summary(self) -> None:
+        """Prints name, shape and dtype of every weight"""
+        for weight in self.weights:
+            print(f"{weight.name:<48} {str(weight.shape):<24} {weight.dtype.name}")
+
+
+def _variable(name: str, array: np.ndarray) -> tfwda.model.checkpoint.MappedVariable:
+    return tfwda.model.checkpoint.MappedVariable(name, array.shape, array.dtype, lambda: array.reshape(-1))
+
+
+def synthetic_model(name: str, parameters: int, tensors: int, mix: Optional[dict] = None, dtype: str = "float32", seed: int = 0) -> SyntheticModel:
+    """Builds a model of about `parameters` weights spread over `tensors` tensors. Convolution
+    kernels (3, 3, c, c) and dense kernels (n, n) share the bulk of the parameters, vectors like
+    biases and normalization parameters are small, their size follows the channel count
+
+    Parameters
+    ----------
+        name       : str
+            Name of the model
+        parameters : int
+            Approximate number of parameters
+        tensors    : int
+            Number of tensors
+        mix        : dict
+            Relative frequency of 'conv', 'dense' and 'vector' tensors, see `DEFAULT_MIX`
+        dtype      : str
+            Dtype of all weights
+        seed       : int
+            Seed of the random generator
+
+    Returns
+    -------
+        SyntheticModel
+            Model with normally distributed weights
+    """
+    mix       = DEFAULT_MIX if mix is None else mix
+    generator = np.random.default_rng(seed = seed)
+    kinds     = generator.choice(list(mix.keys()), size = tensors, p = np.asarray(list(mix.values())) / sum(mix.values()))
+    large     = max(1, int(np.sum(kinds != 'vector')))
+    per_large = max(1, parameters // large)
+    channels  = max(1, int(np.sqrt(per_large / 9)))
+
+    weights = []
+    for index, kind in enumerate(kinds):
+        if kind == 'conv':
+            shape = (3, 3, channels, channels)
+        elif kind == 'dense':
+            width = max(1, int(np.sqrt(per_large)))
+            shape = (width, width)
+        else:
+            shape = (channels,)
+        array = (generator.standard_normal(size = shape, dtype = np.float32) * 0.05).astype(dtype)
+        weights.append(_variable(f"{name}/layer_{index}/{kind}:0", array))
+    return SyntheticModel(name, weights)
+
+
+def keras_model(name: str, layers: int, width: int):
+    """Builds an untrained Keras model out of alternating convolution and batch normalization
+    blocks, tensorflow is only imported if this function is used
+
+    Parameters
+    ----------
+        name   : str
+            Name of the model
+        layers : int
+            Number of convolution blocks
+        width  : int
+            Number of channels of every convolution
+
+    Returns
+    -------
+        model.tensorflow.Model
+            Wrapped Keras model
+    """
+    import tensorflow as tf
+    import tfwda.model.tensorflow
+
+    inputs = tf.keras.Input(shape = (32, 32, 3))
+    hidden = inputs
+    for _ in range(layers):
+        hidden = tf.keras.layers.Conv2D(width, 3, padding = "same")(hidden)
+        hidden = tf.keras.layers.BatchNormalization()(hidden)
+    outputs = tf.keras.layers.Dense(10)(tf.keras.layers.GlobalAveragePooling2D()(hidden))
+    return tfwda.model.tensorflow.Model(name, tf.keras.Model(inputs, outputs, name = name))
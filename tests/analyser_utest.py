@@ -0,0 +1,392 @@
+import unittest
+import numpy as np
+import scipy.stats
+
+import tfwda.analyse.aggregate
+import tfwda.analyse.axes
+import tfwda.analyse.compare
+import tfwda.analyse.drift
+import tfwda.analyse.histogram
+import tfwda.analyse.kernels
+import tfwda.analyse.parallel
+import tfwda.analyse.sketch
+import tfwda.analyse.standard
+import tfwda.logger.standard
+
+
+class TestAnalyser(unittest.TestCase):
+    def setUp(self) -> None:
+        generator    = np.random.default_rng(seed = 42)
+        self.weights = [generator.normal(loc = 0.1, scale = 0.5, size = 3000).astype(np.float32),
+                        generator.standard_t(df = 4, size = 1001),
+                        generator.integers(low = -8, high = 8, size = 257).astype(np.int8)]
+
+
+    def test_fused_kernel_s01(self):
+        """
+        The fused kernel has to yield the same statistics as the separate
+        numpy and scipy calls
+        """
+
+        """ PREPARATION """
+
+
+        """ EXECUTION """
+        statistics = [tfwda.analyse.kernels.describe(weight) for weight in self.weights]
+
+
+        """ VERIFICATION """
+        for weight, stats in zip(self.weights, statistics):
+            reference = weight.astype(np.float64)
+            self.assertAlmostEqual(first = np.min(reference), second = stats['min'], places = 6)
+            self.assertAlmostEqual(first = np.max(reference), second = stats['max'], places = 6)
+            self.assertAlmostEqual(first = np.mean(reference), second = stats['mean'], places = 6)
+            self.assertAlmostEqual(first = np.quantile(reference, q = 0.25), second = stats['25-quantile'], places = 6)
+            self.assertAlmostEqual(first = np.median(reference), second = stats['median'], places = 6)
+            self.assertAlmostEqual(first = np.quantile(reference, q = 0.75), second = stats['75-quantile'], places = 6)
+            self.assertAlmostEqual(first = np.subtract(*np.quantile(reference, q = [0.75, 0.25])), second = stats['IQR'], places = 6)
+            self.assertAlmostEqual(first = np.var(reference), second = stats['variance'], places = 6)
+            self.assertAlmostEqual(first = scipy.stats.skew(reference), second = stats['skewness'], places = 6)
+            self.assertAlmostEqual(first = scipy.stats.kurtosis(reference), second = stats['kurtosis'], places = 6)
+            self.assertAlmostEqual(first = scipy.stats.median_abs_deviation(reference, scale = "normal"), second = stats['MAD'], places = 6)
+
+
+    def test_fused_kernel_mode_s01(self):
+        """
+        The mode is the centre of the most frequent bin of numpy's 'auto' histogram,
+        whose edges are computed in float64
+        """
+
+        """ PREPARATION """
+        weight = self.weights[0]
+
+
+        """ EXECUTION """
+        stats = tfwda.analyse.kernels.describe(weight)
+
+
+        """ VERIFICATION """
+        counts, edges = np.histogram(weight.astype(np.float64), bins = 'auto')
+        centres       = edges[:-1] + np.diff(edges) / 2
+        self.assertEqual(first = [float(mode) for mode in centres[counts == np.max(counts)]], second = stats['mode'])
+        np.testing.assert_array_equal(counts, stats['histogram'].counts)
+
+
+    def test_fused_kernel_heavy_tail_s01(self):
+        """
+        Heavy-tailed weights get the capped 'auto' bin count of recent numpy
+        releases regardless of the installed numpy, the edges are float64 even
+        for float16 weights
+        """
+
+        """ PREPARATION """
+        generator = np.random.default_rng(seed = 7)
+        weights   = [generator.standard_cauchy(size = 200000).astype(np.float32),
+                     (generator.standard_cauchy(size = 20000) * 100).clip(-60000, 60000).astype(np.float16)]
+
+
+        """ EXECUTION """
+        statistics = [tfwda.analyse.kernels.describe(weight) for weight in weights]
+        chunked    = [tfwda.analyse.kernels.describe(weight, chunk_size = 4096) for weight in weights]
+
+
+        """ VERIFICATION """
+        for weight, stats, chunked_stats in zip(weights, statistics, chunked):
+            reference  = weight.astype(np.float64)
+            data_range = float(np.ptp(reference))
+            iqr        = float(np.subtract(*np.percentile(reference, [75, 25])))
+            width      = min(max(2 * iqr * reference.size ** (-1 / 3), data_range / np.sqrt(reference.size) / 2), data_range / (np.log2(reference.size) + 1))
+            self.assertEqual(first = int(np.ceil(data_range / width)), second = stats['histogram'].counts.size)
+            self.assertEqual(first = np.float64, second = stats['histogram'].edges.dtype.type)
+            self.assertTrue(expr = np.all(np.diff(stats['histogram'].edges) > 0))
+            self.assertEqual(first = weight.size, second = int(np.sum(stats['histogram'].counts)))
+            np.testing.assert_array_equal(stats['histogram'].counts, chunked_stats['histogram'].counts)
+
+
+    def test_fused_kernel_constant_s01(self):
+        """
+        A constant weight has no spread, skewness is 0 and kurtosis -3
+        """
+
+        """ PREPARATION """
+        weight = np.ones(128, dtype = np.float32)
+
+
+        """ EXECUTION """
+        stats = tfwda.analyse.kernels.describe(weight)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 0.0, second = stats['variance'])
+        self.assertEqual(first = 0.0, second = stats['skewness'])
+        self.assertEqual(first = -3.0, second = stats['kurtosis'])
+        self.assertEqual(first = 0.0, second = stats['MAD'])
+        self.assertEqual(first = [1.0], second = stats['mode'])
+
+
+    def test_segmented_batch_s01(self):
+        """
+        Analysing small weights in one segmented batch has to yield the same
+        statistics as analysing them one after another
+        """
+
+        """ PREPARATION """
+        analyser = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False), batched = True, segment_threshold = 2000)
+
+
+        """ EXECUTION """
+        batched    = analyser.describe(self.weights)
+        sequential = [tfwda.analyse.kernels.describe(weight) for weight in self.weights]
+
+
+        """ VERIFICATION """
+        for batched_stats, sequential_stats in zip(batched, sequential):
+            for key in sequential_stats:
+                if key == 'mode':
+                    np.testing.assert_allclose(actual = batched_stats[key], desired = sequential_stats[key], rtol = 1e-6)
+                elif key == 'histogram':
+                    np.testing.assert_array_equal(batched_stats[key].counts, sequential_stats[key].counts)
+                    np.testing.assert_allclose(actual = batched_stats[key].edges, desired = sequential_stats[key].edges, rtol = 1e-6)
+                else:
+                    self.assertAlmostEqual(first = sequential_stats[key], second = batched_stats[key], places = 9)
+
+
+    def test_parallel_analysis_s01(self):
+        """
+        Analysing weights on a worker pool over shared memory has to keep the
+        order and values of the sequential analysis
+        """
+
+        """ PREPARATION """
+        analyser = tfwda.analyse.parallel.ParallelAnalyser(tfwda.logger.standard.Logger(False), workers = 2, tasks_per_worker = 2)
+
+
+        """ EXECUTION """
+        parallel = analyser.describe(self.weights)
+        analyser.close()
+
+
+        """ VERIFICATION """
+        sequential = [tfwda.analyse.kernels.describe(weight) for weight in self.weights]
+        for parallel_stats, sequential_stats in zip(parallel, sequential):
+            histogram = sequential_stats.pop('histogram')
+            np.testing.assert_array_equal(parallel_stats.pop('histogram').counts, histogram.counts)
+            self.assertEqual(first = sequential_stats, second = parallel_stats)
+
+
+    def test_drift_s01(self):
+        """
+        The chunked drift norms have to agree with numpy's norms and an
+        unchanged weight must not drift at all
+        """
+
+        """ PREPARATION """
+        previous = self.weights[0]
+        current  = previous + np.float32(0.01) * self.weights[1][:previous.size // 3].repeat(3).astype(np.float32)
+        tfwda.analyse.drift.CHUNK_SIZE, chunk_size = 1000, tfwda.analyse.drift.CHUNK_SIZE
+
+
+        """ EXECUTION """
+        weight_drift = tfwda.analyse.drift.drift(previous, current, tfwda.analyse.kernels.describe(previous), tfwda.analyse.kernels.describe(current))
+        no_drift     = tfwda.analyse.drift.drift(previous, previous.copy(), tfwda.analyse.kernels.describe(previous), tfwda.analyse.kernels.describe(previous))
+        tfwda.analyse.drift.CHUNK_SIZE = chunk_size
+
+
+        """ VERIFICATION """
+        difference = current.astype(np.float64) - previous.astype(np.float64)
+        self.assertAlmostEqual(first = np.linalg.norm(difference), second = weight_drift['L2'], places = 9)
+        self.assertAlmostEqual(first = np.max(np.abs(difference)), second = weight_drift['Linf'], places = 12)
+        self.assertAlmostEqual(first = np.linalg.norm(difference) / np.linalg.norm(previous.astype(np.float64)), second = weight_drift['relative'], places = 12)
+        self.assertFalse(expr = no_drift['changed'])
+        self.assertEqual(first = 0.0, second = no_drift['L2'])
+        self.assertEqual(first = 0.0, second = no_drift['median'])
+
+
+    def test_approximate_analysis_s01(self):
+        """
+        Weights above the threshold are described out of a sample, their quantiles
+        stay within the rank error and the error is recorded in the properties
+        """
+
+        """ PREPARATION """
+        weight   = np.random.default_rng(seed = 1).standard_t(df = 5, size = 400000).astype(np.float32)
+        analyser = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False), approximate = True, approximate_threshold = 300000, epsilon = 0.01, delta = 0.01)
+        metadata = {'names': ["embedding:0", "bias:0"], 'shapes': [(400000,), (3000,)], 'dtypes': ["float32", "float32"]}
+
+
+        """ EXECUTION """
+        properties = analyser.process({'weights': [weight, self.weights[0]], 'metadata': metadata})
+
+
+        """ VERIFICATION """
+        ordered = np.sort(weight)
+        for key, q in [('25-quantile', 0.25), ('median', 0.5), ('75-quantile', 0.75)]:
+            rank = np.searchsorted(ordered, properties[key][0]) / weight.size
+            self.assertLessEqual(a = abs(rank - q), b = 0.01)
+        self.assertAlmostEqual(first = float(np.mean(weight, dtype = np.float64)), second = properties['mean'][0], places = 12)
+        self.assertEqual(first = [0.01, 0.0], second = properties['quantile_errors'])
+        self.assertEqual(first = [0.99, 1.0], second = properties['quantile_confidences'])
+
+
+    def test_approximate_chunked_s01(self):
+        """
+        Described chunk by chunk in its native dtype, the sketch of a float16
+        weight keeps the exact range, histogram and moments
+        """
+
+        """ PREPARATION """
+        weight = np.random.default_rng(seed = 7).normal(size = 200003).astype(np.float16)
+
+
+        """ EXECUTION """
+        expected = tfwda.analyse.sketch.describe(weight, epsilon = 0.01, delta = 0.01)
+        chunked  = tfwda.analyse.sketch.describe(weight, epsilon = 0.01, delta = 0.01, chunk_size = 4096)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = float(np.min(weight)), second = chunked['min'])
+        self.assertEqual(first = float(np.max(weight)), second = chunked['max'])
+        for statistic in ['25-quantile', 'median', '75-quantile', 'IQR', 'MAD', 'mode']:
+            self.assertEqual(first = expected[statistic], second = chunked[statistic])
+        for statistic in ['mean', 'variance', 'skewness', 'kurtosis']:
+            self.assertAlmostEqual(first = expected[statistic], second = chunked[statistic], places = 10)
+        np.testing.assert_array_equal(expected['histogram'].counts, chunked['histogram'].counts)
+        self.assertEqual(first = weight.size, second = int(chunked['histogram'].counts.sum()))
+
+
+    def test_fixed_histogram_aggregate_s01(self):
+        """
+        Fixed-edge histograms of single weights merge into the histogram of their
+        concatenation, grouped by layer type and over the whole model
+        """
+
+        """ PREPARATION """
+        scheme   = tfwda.analyse.aggregate.EdgeScheme(tfwda.analyse.aggregate.Edges(-1.0, 1.0, 64), [("gamma", None, tfwda.analyse.aggregate.Edges(0.0, 2.0, 32))])
+        analyser = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False), edge_scheme = scheme)
+        weights  = [self.weights[0], self.weights[1], (self.weights[0] + 1.0).astype(np.float32)]
+        names    = ["conv1_block1_conv/kernel:0", "conv1_block2_conv/kernel:0", "conv1_block1_bn/gamma:0"]
+        metadata = {'names': names, 'shapes': [(3000,), (1001,), (3000,)], 'dtypes': ["float32", "float64", "float32"]}
+
+
+        """ EXECUTION """
+        properties = analyser.process({'weights': weights, 'metadata': metadata})
+        kernels    = tfwda.analyse.aggregate.aggregate(zip(names, metadata['shapes'], properties['fixed_histograms']), tfwda.analyse.aggregate.layer_type)
+        blocks     = tfwda.analyse.aggregate.aggregate(zip(names, metadata['shapes'], properties['fixed_histograms']), tfwda.analyse.aggregate.block)
+
+
+        """ VERIFICATION """
+        expected = tfwda.analyse.histogram.bin_fixed(np.concatenate([weights[0], weights[1]]), -1.0, 1.0, 64)
+        np.testing.assert_array_equal(expected.counts, kernels['kernel'].counts)
+        self.assertEqual(first = expected.underflow + expected.overflow, second = kernels['kernel'].underflow + kernels['kernel'].overflow)
+        self.assertEqual(first = 3000, second = kernels['gamma'].total)
+        self.assertEqual(first = [("conv1_block1", (-1.0, 1.0, 64)), "conv1_block2", ("conv1_block1", (0.0, 2.0, 32))], second = list(blocks.keys()))
+
+
+    def test_layer_type_rank_s01(self):
+        """
+        Convolution kernels are grouped apart from dense kernels of the same variable
+        name, both in the aggregates and in the rules of the edge scheme
+        """
+
+        """ PREPARATION """
+        generator = np.random.default_rng(seed = 5)
+        scheme    = tfwda.analyse.aggregate.EdgeScheme(tfwda.analyse.aggregate.Edges(-1.0, 1.0, 64), [("kernel_4d", None, tfwda.analyse.aggregate.Edges(-0.5, 0.5, 32))])
+        analyser  = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False), edge_scheme = scheme)
+        shapes    = [(3, 3, 8, 16), (16, 10), (10,)]
+        weights   = [generator.normal(scale = 0.2, size = shape).astype(np.float32).reshape(-1) for shape in shapes]
+        names     = ["conv/kernel:0", "dense/kernel:0", "dense/bias:0"]
+        metadata  = {'names': names, 'shapes': shapes, 'dtypes': ["float32"] * 3}
+
+
+        """ EXECUTION """
+        properties = analyser.process({'weights': weights, 'metadata': metadata})
+        documents  = tfwda.analyse.aggregate.aggregate_model(names, shapes, properties['fixed_histograms'])
+        stored     = tfwda.analyse.aggregate.aggregate_documents([{'weights': {'names': names, 'shapes': [list(shape) for shape in shapes],
+                                                                               'fixed_histograms': [histogram.to_document() for histogram in properties['fixed_histograms']]}}],
+                                                                 tfwda.analyse.aggregate.layer_type)
+
+
+        """ VERIFICATION """
+        groups = {document['group']: document for document in documents if document['grouping'] == 'layer_type'}
+        self.assertEqual(first = ["kernel_4d", "kernel", "bias"], second = list(groups.keys()))
+        self.assertEqual(first = 32, second = len(properties['fixed_histograms'][0].counts))
+        self.assertEqual(first = 64, second = len(properties['fixed_histograms'][1].counts))
+        self.assertEqual(first = ["kernel_4d", "kernel", "bias"], second = list(stored.keys()))
+        self.assertEqual(first = weights[0].size, second = stored['kernel_4d'].total)
+        self.assertEqual(first = weights[1].size, second = stored['kernel'].total)
+
+
+    def test_compare_distances_s01(self):
+        """
+        Distances out of quantile functions agree with the empirical Wasserstein-1
+        distance and Kolmogorov-Smirnov statistic and vanish on the diagonal
+        """
+
+        """ PREPARATION """
+        generator = np.random.default_rng(seed = 3)
+        samples   = [generator.normal(loc = 0.0, scale = 1.0, size = 20000), generator.normal(loc = 0.5, scale = 1.0, size = 20000),
+                     generator.laplace(loc = 0.0, scale = 1.0, size = 20000)]
+        quantiles = np.stack([tfwda.analyse.compare.quantile_function(sample, 513) for sample in samples])
+
+
+        """ EXECUTION """
+        distances = tfwda.analyse.compare.distances(quantiles)
+
+
+        """ VERIFICATION """
+        for first, second in [(0, 1), (0, 2), (1, 2)]:
+            self.assertAlmostEqual(first = scipy.stats.wasserstein_distance(samples[first], samples[second]), second = distances['W1'][first, second], delta = 0.01)
+            self.assertAlmostEqual(first = scipy.stats.ks_2samp(samples[first], samples[second]).statistic, second = distances['KS'][first, second], delta = 0.005)
+        for distance in tfwda.analyse.compare.DISTANCES:
+            np.testing.assert_allclose(np.diag(distances[distance]), 0.0, atol = 1e-12)
+        np.testing.assert_allclose(distances['JS'], distances['JS'].T)
+        self.assertGreater(a = distances['JS'][0, 1], b = 0.0)
+
+
+    def test_axis_statistics_s01(self):
+        """
+        Statistics along the output and input axis of a kernel agree with the
+        statistics of every single filter and channel
+        """
+
+        """ PREPARATION """
+        kernel   = np.random.default_rng(seed = 5).normal(size = (3, 3, 6, 10)).astype(np.float32)
+        analyser = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False), axes = (-1, -2))
+
+
+        """ EXECUTION """
+        statistics = analyser.describe([kernel.reshape(-1)], ["conv/kernel:0"], [kernel.shape])[0]['axes']
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = [-1, -2], second = list(statistics.keys()))
+        for axis, slices in [(-1, [kernel[..., index] for index in range(10)]), (-2, [kernel[:, :, index, :] for index in range(6)])]:
+            for index, weight_slice in enumerate(slices):
+                expected = tfwda.analyse.kernels.describe(np.ascontiguousarray(weight_slice).reshape(-1))
+                for statistic in tfwda.analyse.axes.AXIS_STATISTICS:
+                    self.assertAlmostEqual(first = expected[statistic], second = statistics[axis][statistic][index], places = 10)
+
+
+    def test_chunked_kernel_s01(self):
+        """
+        Described chunk by chunk, float16, int8 and spiky weights get the
+        same order statistics and histogram and the same moments up to rounding
+        """
+
+        """ PREPARATION """
+        generator = np.random.default_rng(seed = 11)
+        weights   = self.weights + [generator.normal(size = 20011).astype(np.float16),
+                                    np.concatenate([np.zeros(5000, dtype = np.float32), generator.normal(scale = 1e-30, size = 300).astype(np.float32)])]
+
+
+        """ EXECUTION """
+        described = [(tfwda.analyse.kernels.describe(weight), tfwda.analyse.kernels.describe(weight, chunk_size = 64)) for weight in weights]
+
+
+        """ VERIFICATION """
+        for expected, chunked in described:
+            for statistic in ['min', 'max', '25-quantile', 'median', '75-quantile', 'IQR', 'MAD', 'mode']:
+                self.assertEqual(first = expected[statistic], second = chunked[statistic])
+            for statistic in ['mean', 'variance', 'skewness', 'kurtosis']:
+                self.assertAlmostEqual(first = expected[statistic], second = chunked[statistic], places = 10)
+            np.testing.assert_array_equal(expected['histogram'].counts, chunked['histogram'].counts)
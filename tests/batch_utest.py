@@ -0,0 +1,111 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+
+import tfwda.batch.standard
+import tfwda.model_store.tensorflow
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.directory, "models", "run1"))
+        for index in range(6):
+            np.savez(os.path.join(self.directory, "models", "run1", f"step{index}.npz"), kernel = np.full((4, 3), index, dtype = np.float32))
+
+
+    def test_shards_and_journal_s01(self):
+        """
+        Every model belongs to exactly one shard and a restarted job
+        skips the models its journal reports as done
+        """
+
+        """ PREPARATION """
+        tasks   = tfwda.batch.standard.discover([os.path.join(self.directory, "models")])
+        job_dir = os.path.join(self.directory, "job")
+        journal = tfwda.batch.standard.Journal(job_dir, 0, 3)
+        journal.record("done", tasks[0], tensors = 1)
+        with open(journal.path, "a") as torn:
+            torn.write('{"event": "done", "model": "run1_st')
+
+
+        """ EXECUTION """
+        shards   = [tfwda.batch.standard.shard(tasks, index, 3) for index in range(3)]
+        restart  = tfwda.batch.standard.Journal(job_dir, 1, 2)
+        reopened = tfwda.batch.standard.Journal(job_dir, 0, 3)
+        reopened.record("failed", tasks[1], error = "interrupted")
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = [f"run1_step{index}" for index in range(6)], second = [task.name for task in tasks])
+        self.assertEqual(first = sorted(tasks), second = sorted(task for tasks_of_shard in shards for task in tasks_of_shard))
+        self.assertEqual(first = shards[1], second = tfwda.batch.standard.shard(list(reversed(tasks)), 1, 3)[::-1])
+        self.assertEqual(first = ["run1_step0"], second = list(restart.completed.keys()))
+        self.assertEqual(first = ["run1_step0"], second = list(tfwda.batch.standard.Journal(job_dir, 0, 3).completed.keys()))
+
+
+    def test_manifest_names_s01(self):
+        """
+        Models of the same file name in different directories keep distinct
+        names when listed in a manifest or given directly
+        """
+
+        """ PREPARATION """
+        models = os.path.join(self.directory, "models")
+        os.makedirs(os.path.join(models, "run2"))
+        np.savez(os.path.join(models, "run2", "step0.npz"), kernel = np.zeros((4, 3), dtype = np.float32))
+        with open(os.path.join(models, "manifest.txt"), "w") as manifest:
+            manifest.write("# two runs\nrun1/step0.npz\n\nrun2/step0.npz\n")
+
+
+        """ EXECUTION """
+        listed = tfwda.batch.standard.discover([os.path.join(models, "manifest.txt")])
+        given  = tfwda.batch.standard.discover([os.path.join(models, "run1", "step0.npz"), os.path.join(models, "run2", "step0.npz")])
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = ["run1_step0", "run2_step0"], second = [task.name for task in listed])
+        self.assertEqual(first = listed, second = given)
+
+
+    def test_run_and_resume_s01(self):
+        """
+        The runner processes the pending models on its pool, reports a broken
+        model as failed, resumes an interrupted model out of its tensor cache
+        and retries the failed model on restart
+        """
+
+        """ PREPARATION """
+        broken  = os.path.join(self.directory, "models", "run1", "broken.npz")
+        with open(broken, "wb") as archive:
+            archive.write(b"not an archive")
+        tasks   = tfwda.batch.standard.discover([os.path.join(self.directory, "models")])
+        job_dir = os.path.join(self.directory, "job")
+        config  = {'db_connection_string': None, 'database_name': "NNModels", 'verbosity': False, 'path_to_dir': os.path.join(job_dir, "plots"),
+                   'plot_backend': "raster", 'output': os.path.join(self.directory, "results")}
+        runner  = tfwda.batch.standard.BatchRunner(job_dir, config, workers = 2, verbosity = False)
+        # an earlier attempt analysed all tensors of run1_step2 but crashed before the journal entry
+        interrupted = tasks[[task.name for task in tasks].index("run1_step2")]
+        tfwda.batch.standard._initialize(dict(runner.model_store, output = os.path.join(self.directory, "attempt")))
+        tfwda.batch.standard._process(interrupted, job_dir, False)
+        ModelStore = tfwda.model_store.tensorflow.ModelStore
+        ModelStore._ModelStore__instance.result_store.close()
+        ModelStore._ModelStore__instance = None
+        tfwda.batch.standard._model_store = None
+
+
+        """ EXECUTION """
+        summary = runner.run(tasks)
+        np.savez(broken, kernel = np.ones((4, 3), dtype = np.float32))
+        restart = tfwda.batch.standard.BatchRunner(job_dir, config, workers = 2, verbosity = False).run(tasks)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = ["run1_broken"], second = list(summary['failed'].keys()))
+        self.assertEqual(first = [f"run1_step{index}" for index in range(6)], second = sorted(summary['done']))
+        self.assertEqual(first = {f"run1_step{index}": (1, int(index == 2)) for index in range(6)},
+                         second = {name: (entry['tensors'], entry['resumed']) for name, entry in runner.journal.completed.items()})
+        self.assertFalse(expr = os.path.exists(tfwda.batch.standard.tensor_cache_path(job_dir, interrupted)))
+        self.assertEqual(first = ["run1_broken"], second = restart['done'])
+        self.assertEqual(first = [f"run1_step{index}" for index in range(6)], second = sorted(restart['skipped']))
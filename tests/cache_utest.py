@@ -0,0 +1,115 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+
+import tfwda.analyse.kernels
+import tfwda.analyse.standard
+import tfwda.cache.standard
+import tfwda.logger.standard
+
+
+class TestTensorCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.weight    = np.random.default_rng(seed = 3).normal(size = 2048).astype(np.float32)
+
+
+    def test_roundtrip_s01(self):
+        """
+        Identical bytes share a key and the cached statistics equal
+        the freshly computed ones
+        """
+
+        """ PREPARATION """
+        cache      = tfwda.cache.standard.TensorCache(os.path.join(self.directory, "cache.sqlite"))
+        statistics = tfwda.analyse.kernels.describe(self.weight)
+        key        = tfwda.cache.standard.tensor_key(self.weight, "float32", (32, 64))
+
+
+        """ EXECUTION """
+        cache.put(key, statistics, "dense/kernel:0", "plots/dense.png")
+        entry = cache.get(tfwda.cache.standard.tensor_key(self.weight.copy(), "float32", (32, 64)))
+
+
+        """ VERIFICATION """
+        self.assertIsNone(obj = cache.get(tfwda.cache.standard.tensor_key(self.weight, "float32", (64, 32))))
+        self.assertEqual(first = "plots/dense.png", second = entry.plot_path)
+        np.testing.assert_array_equal(statistics.pop('histogram').counts, entry.statistics.pop('histogram').counts)
+        self.assertEqual(first = statistics, second = entry.statistics)
+
+
+    def test_fingerprint_key_s01(self):
+        """
+        Results of an approximate analysis are keyed apart from exact
+        ones of the same bytes
+        """
+
+        """ PREPARATION """
+        exact       = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False))
+        approximate = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False), approximate = True, approximate_threshold = 1024)
+
+
+        """ EXECUTION """
+        exact_key       = tfwda.cache.standard.tensor_key(self.weight, "float32", (32, 64), exact.fingerprint(self.weight.size))
+        approximate_key = tfwda.cache.standard.tensor_key(self.weight, "float32", (32, 64), approximate.fingerprint(self.weight.size))
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = "exact", second = exact.fingerprint(self.weight.size))
+        self.assertEqual(first = "exact", second = approximate.fingerprint(1024))
+        self.assertNotEqual(first = exact_key, second = approximate_key)
+
+
+    def test_lru_eviction_s01(self):
+        """
+        Beyond the size bound the least recently used entry is evicted
+        """
+
+        """ PREPARATION """
+        statistics = tfwda.analyse.kernels.describe(self.weight)
+        size       = len(tfwda.cache.standard.TensorCache.encode(statistics))
+        cache      = tfwda.cache.standard.TensorCache(os.path.join(self.directory, "cache.sqlite"), max_bytes = 2 * size)
+
+
+        """ EXECUTION """
+        cache.put("first", statistics, "first")
+        cache.put("second", statistics, "second")
+        cache.get("first")
+        cache.put("third", statistics, "third")
+
+
+        """ VERIFICATION """
+        self.assertIsNotNone(obj = cache.get("first"))
+        self.assertIsNone(obj = cache.get("second"))
+        self.assertIsNotNone(obj = cache.get("third"))
+
+
+    def test_flush_s01(self):
+        """
+        Entries and access times of hits are persisted by flush and close,
+        the access times still decide which entry is evicted
+        """
+
+        """ PREPARATION """
+        statistics = tfwda.analyse.kernels.describe(self.weight)
+        size       = len(tfwda.cache.standard.TensorCache.encode(statistics))
+        path       = os.path.join(self.directory, "cache.sqlite")
+        cache      = tfwda.cache.standard.TensorCache(path, max_bytes = 2 * size)
+        cache.put("first", statistics, "first")
+        cache.put("second", statistics, "second")
+        cache.flush()
+
+
+        """ EXECUTION """
+        cache.get("first")
+        cache.close()
+        reopened = tfwda.cache.standard.TensorCache(path, max_bytes = 2 * size)
+        reopened.put("third", statistics, "third")
+
+
+        """ VERIFICATION """
+        self.assertIsNotNone(obj = reopened.get("first"))
+        self.assertIsNone(obj = reopened.get("second"))
+        self.assertIsNotNone(obj = reopened.get("third"))
+        reopened.close()
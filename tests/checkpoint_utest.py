@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import h5py
+import numpy as np
+import tensorflow as tf
+import keras
+
+import tfwda.model.checkpoint
+import tfwda.model.standard
+
+
+class TestCheckpointModel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        inner          = keras.Sequential([keras.layers.Dense(5, name = "inner_dense")], name = "inner")
+        inputs         = keras.Input((4,))
+        outputs        = keras.layers.Flatten()(keras.layers.Conv1D(2, 2, name = "conv")(keras.layers.Reshape((4, 1))(inputs)))
+        outputs        = keras.layers.BatchNormalization(name = "bn")(inner(outputs))
+        self.model     = keras.Model(inputs, outputs, name = "tiny")
+        self.model.get_layer("bn").moving_mean.assign(np.arange(5, dtype = np.float32))
+
+
+    def write_layered_weights(self, path: str) -> None:
+        """Writes the weights of the model in the layout of `.weights.h5` files of newer Keras
+        versions, every layer stores its variables in a 'vars' group named after the layer"""
+        groups = {"conv": "layers/conv1d/vars", "inner_dense": "layers/sequential/layers/dense/vars", "bn": "layers/batch_normalization/vars"}
+        with h5py.File(path, 'w') as handle:
+            for layer_name, group_name in groups.items():
+                group = handle.create_group(group_name)
+                group.attrs["name"] = layer_name
+                for index, weight in enumerate(self.model.get_layer("inner").get_layer(layer_name).weights if layer_name == "inner_dense"
+                                               else self.model.get_layer(layer_name).weights):
+                    group.create_dataset(str(index), data = weight.numpy())
+
+
+    def test_checkpoint_roundtrip_s01(self):
+        """
+        Weights read out of a tensorflow checkpoint, a legacy HDF5 model file,
+        a legacy weights file and a weights file of the newer layout carry the
+        names and values of the model
+        """
+
+        """ PREPARATION """
+        paths = {name: os.path.join(self.directory, name) for name in ["model.h5", "weights.h5", "model.weights.h5", "ckpt"]}
+        self.model.save(paths["model.h5"])
+        self.model.save_weights(paths["weights.h5"])
+        self.write_layered_weights(paths["model.weights.h5"])
+        tf.train.Checkpoint(model = self.model).write(paths["ckpt"])
+        expected = {tfwda.model.standard.variable_path(weight.name): weight.numpy() for weight in self.model.weights}
+
+
+        """ EXECUTION """
+        models = {name: tfwda.model.checkpoint.CheckpointModel(name, path, names = tfwda.model.checkpoint.keras_names(self.model, path)
+                                                               if name == "model.weights.h5" else None)
+                  for name, path in paths.items()}
+        stored = tfwda.model.checkpoint.CheckpointModel("stored", paths["model.weights.h5"])
+
+
+        """ VERIFICATION """
+        for name, model in models.items():
+            names = [tfwda.model.standard.variable_path(weight.name) for weight in model.weights]
+            self.assertEqual(first = sorted(expected.keys()), second = sorted(names), msg = name)
+            for path, weight in zip(names, model.weights):
+                self.assertEqual(first = expected[path].shape, second = weight.shape)
+                np.testing.assert_array_equal(expected[path], weight.numpy())
+            model.close()
+        self.assertIn(member = "layers/batch_normalization/vars/2", container = [weight.name for weight in stored.weights])
+        self.assertEqual(first = "inner/inner_dense/kernel", second = tfwda.model.standard.variable_path("inner/inner_dense/kernel:0"))
@@ -0,0 +1,85 @@
+import os
+import io
+import unittest
+import tempfile
+import contextlib
+import numpy as np
+
+import tfwda.instrumentation.standard
+import tfwda.logger.standard
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_sinks_s01(self):
+        """
+        Stage and tensor measurements reach the in-memory collector and the
+        Prometheus textfile aggregates them per kind and stage
+        """
+
+        """ PREPARATION """
+        directory       = tempfile.mkdtemp()
+        memory          = tfwda.instrumentation.standard.MemorySink()
+        prometheus      = tfwda.instrumentation.standard.PrometheusTextfileSink(os.path.join(directory, "tfwda.prom"))
+        instrumentation = tfwda.instrumentation.standard.Instrumentation([memory, prometheus], track_memory = True)
+
+
+        """ EXECUTION """
+        with instrumentation.stage("analyse", "Model") as measurement:
+            for index in range(3):
+                with instrumentation.tensor("analyse", "Model", f"weight_{index}", 8000):
+                    np.ones(1000)
+            measurement.bytes = 24000
+        instrumentation.close()
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = ["tensor"] * 3 + ["stage"], second = [event["kind"] for event in memory.events])
+        self.assertEqual(first = 24000, second = memory.events[-1]["bytes"])
+        self.assertGreaterEqual(a = memory.events[0]["peak_memory_bytes"], b = 8000)
+        with open(os.path.join(directory, "tfwda.prom")) as metrics_file:
+            metrics = metrics_file.read()
+        self.assertIn(member = 'tfwda_events_total{kind="tensor",stage="analyse"} 3', container = metrics)
+        self.assertIn(member = 'tfwda_bytes_total{kind="stage",stage="analyse"} 24000', container = metrics)
+
+
+    def test_default_memory_s01(self):
+        """
+        Without tracing a measurement reports how far it raised the peak
+        resident set size, not the lifetime peak of the process
+        """
+
+        """ PREPARATION """
+        memory          = tfwda.instrumentation.standard.MemorySink()
+        instrumentation = tfwda.instrumentation.standard.Instrumentation([memory])
+
+
+        """ EXECUTION """
+        with instrumentation.stage("idle"):
+            pass
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 0, second = memory.events[0]["peak_memory_bytes"])
+        self.assertGreater(a = memory.events[0]["process_peak_rss_bytes"], b = 0)
+
+
+    def test_lazy_logging_s01(self):
+        """
+        Arguments are only formatted if the logger is verbose
+        """
+
+        """ PREPARATION """
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted although verbosity is off")
+        output = io.StringIO()
+
+
+        """ EXECUTION """
+        tfwda.logger.standard.Logger(False).log("%s is flattened now...", "Info", Exploding())
+        with contextlib.redirect_stdout(output):
+            tfwda.logger.standard.Logger(True).log("%s of shape %s", "Info", "dense/kernel:0", (3, 4))
+
+
+        """ VERIFICATION """
+        self.assertIn(member = "dense/kernel:0 of shape (3, 4)", container = output.getvalue())
@@ -0,0 +1,170 @@
+import os
+import time
+import tempfile
+import unittest
+import mongomock
+import numpy as np
+
+import tfwda.cache.standard
+import tfwda.model.checkpoint
+import tfwda.model.numpy
+import tfwda.model_store.tensorflow
+import tfwda.persistence.columnar
+import tfwda.persistence.mongodb
+import tfwda.utils.errors
+
+
+class TestModelStorePipes(unittest.TestCase):
+    def setUp(self) -> None:
+        generator      = np.random.default_rng(seed = 5)
+        self.directory = tempfile.mkdtemp()
+        self.plots     = os.path.join(self.directory, "plots")
+        os.makedirs(self.plots)
+        self.arrays    = [{'dense/kernel:0': generator.normal(size = (40, 30)).astype(np.float32),
+                           'dense/bias:0': generator.normal(size = 30).astype(np.float16)} for _ in range(2)]
+        self.database  = mongomock.MongoClient()["NNModels"]
+
+
+    def tearDown(self) -> None:
+        ModelStore = tfwda.model_store.tensorflow.ModelStore
+        if ModelStore._ModelStore__instance is not None:
+            ModelStore._ModelStore__instance.result_store.close()
+        ModelStore._ModelStore__instance = None
+
+
+    def new_store(self, collection: str, **kwargs) -> tfwda.model_store.tensorflow.ModelStore:
+        """Fresh model store which writes to `collection` and renders raster plots"""
+        tfwda.model_store.tensorflow.ModelStore._ModelStore__instance = None
+        result_store = tfwda.persistence.mongodb.MongoResultStore(self.database[collection], background = False)
+        return tfwda.model_store.tensorflow.ModelStore(None, "NNModels", self.plots, False, plot_backend = "raster", result_store = result_store, **kwargs)
+
+
+    def documents(self, collection: str) -> list[tuple]:
+        """Model name and weights of every stored document"""
+        return [(document["model_name"], document["weights"]) for document in self.database[collection].find({}, {"_id": 0, "date": 0})]
+
+
+    def models(self, prefix: str) -> list[tfwda.model.numpy.ArrayModel]:
+        """One ArrayModel per set of arrays, named by prefix and position"""
+        return [tfwda.model.numpy.ArrayModel(f"{prefix}{index}", arrays) for index, arrays in enumerate(self.arrays)]
+
+
+    def test_streaming_s01(self):
+        """
+        Streaming stores the same documents as the stage-by-stage mode, a
+        second run is served from the cache and reuses the plots
+        """
+
+        """ PREPARATION """
+        cache = tfwda.cache.standard.TensorCache(os.path.join(self.directory, "cache.sqlite"))
+        self.new_store("batch").pipe_models(self.models("Model"))
+
+
+        """ EXECUTION """
+        self.new_store("streaming", cache = cache).pipe_models(self.models("Model"), streaming = True)
+        misses = cache.misses
+        cached = self.new_store("cached", cache = cache)
+        cached.pipe_models(self.models("Copy"), streaming = True)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = self.documents("batch"), second = self.documents("streaming"))
+        self.assertEqual(first = [weights for _, weights in self.documents("batch")], second = [weights for _, weights in self.documents("cached")])
+        self.assertEqual(first = 4, second = misses)
+        self.assertEqual(first = 4, second = cache.hits)
+        for index in range(2):
+            for name, shape, dtype in [("dense/kernel:0", (40, 30), "float32"), ("dense/bias:0", (30,), "float16")]:
+                self.assertTrue(expr = os.path.exists(cached.plotter.file_path(f"Copy{index}", name, shape, dtype)))
+
+
+    def test_pipelined_s01(self):
+        """
+        The pipelined mode stores the same documents as the stage-by-stage
+        mode, the error of a failing stage is raised as PipelineError and
+        streaming cannot be combined with it
+        """
+
+        """ PREPARATION """
+        def unreadable():
+            raise IOError("The weight could not be read")
+        broken = self.models("Broken")
+        broken[1].weights.append(tfwda.model.checkpoint.MappedVariable("dense/broken:0", (3,), np.dtype(np.float32), unreadable))
+        self.new_store("batch").pipe_models(self.models("Model"))
+
+
+        """ EXECUTION """
+        pipelined = self.new_store("pipelined")
+        pipelined.pipe_models(self.models("Model"), pipelined = True, capacity = 1)
+        with self.assertRaises(ValueError):
+            pipelined.pipe_models(self.models("Model"), streaming = True, pipelined = True)
+        with self.assertRaises(tfwda.utils.errors.PipelineError) as context:
+            self.new_store("failed").pipe_models(broken, pipelined = True)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = self.documents("batch"), second = self.documents("pipelined"))
+        self.assertEqual(first = "serialize", second = context.exception.stage)
+        self.assertIsInstance(obj = context.exception.__cause__, cls = IOError)
+
+
+    def test_query_max_age_s01(self):
+        """
+        Query results expire, thus results written by another process
+        show up in a later query
+        """
+
+        """ PREPARATION """
+        store = self.new_store("shared", query_cache_max_age = 0.05)
+        store.pipe_models(self.models("Model")[:1])
+        other = tfwda.persistence.mongodb.MongoResultStore(self.database["shared"], background = False)
+
+
+        """ EXECUTION """
+        before            = store.query(columns = ["median"])
+        weights, metadata = store.serializer.flatten(self.models("Other")[0])
+        other.write("Other0", store.analyser.process({'weights': weights, 'metadata': metadata}))
+        other.close()
+        cached            = store.query(columns = ["median"])
+        time.sleep(0.1)
+        after             = store.query(columns = ["median"])
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 60.0, second = self.new_store("default").query_cache.max_age)
+        self.assertEqual(first = ["Model0"] * 2, second = before.model_name.tolist())
+        self.assertEqual(first = before.model_name.tolist(), second = cached.model_name.tolist())
+        self.assertEqual(first = ["Model0"] * 2 + ["Other0"] * 2, second = after.model_name.tolist())
+
+
+    def test_series_s01(self):
+        """
+        A checkpoint series reuses unchanged weights and reports drift only for
+        weights whose shape and dtype stayed the same
+        """
+
+        """ PREPARATION """
+        kernel = self.arrays[0]['dense/kernel:0']
+        bias   = self.arrays[0]['dense/bias:0']
+        head   = np.arange(24, dtype = np.float32).reshape(6, 4)
+        delta  = np.full(kernel.shape, 0.5, dtype = np.float32)
+        steps  = [{'dense/kernel:0': kernel, 'dense/bias:0': bias, 'head/kernel:0': head},
+                  {'dense/kernel:0': kernel + delta, 'dense/bias:0': bias, 'head/kernel:0': head.reshape(4, 6)},
+                  {'dense/kernel:0': kernel + delta, 'dense/bias:0': bias.astype(np.float32), 'head/kernel:0': head.reshape(4, 6)}]
+        tfwda.model_store.tensorflow.ModelStore._ModelStore__instance = None
+        columnar = tfwda.persistence.columnar.ColumnarResultStore(os.path.join(self.directory, "results"))
+        store    = tfwda.model_store.tensorflow.ModelStore(None, "NNModels", self.plots, False, plot_backend = "raster", result_store = columnar)
+
+
+        """ EXECUTION """
+        store.pipe_series([tfwda.model.numpy.ArrayModel(f"step{index}", arrays) for index, arrays in enumerate(steps)])
+        drift   = columnar.scan(columns = ["model_name", "name", "changed", "L2"], kind = "drift").to_pylist()
+        results = columnar.scan(columns = ["model_name", "name", "shape", "dtype"]).to_pylist()
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 9, second = len(results))
+        self.assertEqual(first = [("step1", "dense/kernel:0", True), ("step1", "dense/bias:0", False), ("step2", "dense/kernel:0", False),
+                                  ("step2", "head/kernel:0", False)],
+                         second = [(row["model_name"], row["name"], row["changed"]) for row in drift])
+        self.assertAlmostEqual(first = float(np.linalg.norm(delta.astype(np.float64))), second = drift[0]["L2"], places = 3)
+        self.assertEqual(first = [0.0] * 3, second = [row["L2"] for row in drift[1:]])
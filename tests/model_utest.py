@@ -1,7 +1,11 @@
+import os
+import tempfile
 import unittest
+import numpy as np
 import tensorflow as tf
 
 from tfwda.model.tensorflow import Model
+from tfwda.model.numpy import ArrayModel
 
 
 class TestModel(unittest.TestCase):
@@ -28,3 +32,50 @@ class TestModel(unittest.TestCase):
         """ VERIFICATION """
         self.assertEqual(first = "DenseNet121", second = model.name)
         self.assertEqual(first = self.densenet121, second = model.architecture)
+
+
+    def test_model_select_s01(self):
+        """
+        A selection of the Model should only contain the weights which pass all
+        filters and narrow further with another select
+        """
+
+        """ PREPARATION """
+        model = Model(name = "DenseNet121", architecture = self.densenet121)
+
+
+        """ EXECUTION """
+        moving_statistics = model.select(layer_types = ["BatchNormalization"], trainable = False)
+        large_kernels     = model.select(layer_types = ["Conv2D"]).select(min_size = 100000)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = "DenseNet121", second = moving_statistics.name)
+        self.assertTrue(expr = all("moving" in weight.name for weight in moving_statistics.weights))
+        self.assertEqual(first = 2 * sum(isinstance(layer, tf.keras.layers.BatchNormalization) for layer in self.densenet121.layers),
+                         second = len(moving_statistics.weights))
+        self.assertTrue(expr = all(weight.shape.num_elements() >= 100000 for weight in large_kernels.weights))
+
+
+    def test_array_model_s01(self):
+        """
+        The ArrayModel should expose a state dict saved as npz archive with the
+        names, shapes and dtypes of its arrays and read every array on demand
+        """
+
+        """ PREPARATION """
+        state_dict = {'conv1.weight': np.random.default_rng(seed = 0).normal(size = (8, 3, 3, 3)).astype(np.float16),
+                      'bn1.num_batches_tracked': np.array(7, dtype = np.int64)}
+        directory  = tempfile.mkdtemp()
+        np.savez(os.path.join(directory, "state_dict.npz"), **state_dict)
+
+
+        """ EXECUTION """
+        model = ArrayModel.from_npz("ResNet", os.path.join(directory, "state_dict.npz"))
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = ['conv1.weight', 'bn1.num_batches_tracked'], second = [weight.name for weight in model.weights])
+        self.assertEqual(first = [(8, 3, 3, 3), ()], second = [weight.shape for weight in model.weights])
+        np.testing.assert_array_equal(state_dict['conv1.weight'], model.weights[0].numpy())
+        self.assertEqual(first = ['conv1.weight'], second = [weight.name for weight in model.select(dtypes = ["float16"]).weights])
@@ -0,0 +1,219 @@
+import io
+import unittest
+import tempfile
+import collections
+import mongomock
+import numpy as np
+
+import tfwda.analyse.standard
+import tfwda.cache.standard
+import tfwda.logger.standard
+import tfwda.persistence.mongodb
+import tfwda.persistence.columnar
+import tfwda.persistence.standard
+
+
+class MemoryBucket:
+    """GridFS bucket in memory, the GridFS of mongomock does not support every pymongo version"""
+
+
+    def __init__(self):
+        self.files = {}
+
+
+    def upload_from_stream_with_id(self, file_id, filename: str, source: bytes, metadata: dict = None) -> None:
+        self.files[file_id] = source
+
+
+    def open_download_stream(self, file_id) -> io.BytesIO:
+        return io.BytesIO(self.files[file_id])
+
+
+class CheckedBucket(MemoryBucket):
+    """Bucket which records whether a document referred to a payload before its upload and fails
+    the uploads of one model"""
+
+
+    def __init__(self, collection, failing_model: str):
+        super().__init__()
+        self.collection    = collection
+        self.failing_model = failing_model
+        self.early         = 0
+
+
+    def upload_from_stream_with_id(self, file_id, filename: str, source: bytes, metadata: dict = None) -> None:
+        self.early += self.collection.count_documents({"payload_id": file_id})
+        if metadata["model_name"] == self.failing_model:
+            raise IOError(f"{filename} could not be uploaded")
+        super().upload_from_stream_with_id(file_id, filename, source, metadata)
+
+
+class TestPersistence(unittest.TestCase):
+    def setUp(self) -> None:
+        generator = np.random.default_rng(seed = 7)
+        weights   = [generator.normal(size = 500).astype(np.float32), generator.normal(size = 64).astype(np.float32)]
+        metadata  = collections.OrderedDict({'names': ["dense/kernel:0", "dense/bias:0"], 'shapes': [(10, 50), (64,)], 'dtypes': ["float32", "float32"]})
+        analyser  = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False))
+
+        self.info       = analyser.process({'weights': weights, 'metadata': metadata})
+        self.collection = mongomock.MongoClient()["NNModels"]["model_information"]
+
+
+    def test_background_bulk_write_s01(self):
+        """
+        Documents written through the background writer are all persisted
+        after a flush
+        """
+
+        """ PREPARATION """
+        store = tfwda.persistence.mongodb.MongoResultStore(self.collection, batch_size = 2)
+
+
+        """ EXECUTION """
+        for count in range(5):
+            store.write(f"Model{count}", self.info)
+        store.flush()
+        store.close()
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 5, second = self.collection.count_documents({}))
+        document = self.collection.find_one({"model_name": "Model3"})
+        self.assertEqual(first = self.info["median"], second = document["weights"]["medians"])
+
+
+    def test_binary_arrays_s01(self):
+        """
+        Packed float32 arrays are restored by unpack_document
+        """
+
+        """ PREPARATION """
+        store = tfwda.persistence.mongodb.MongoResultStore(self.collection, background = False, binary_arrays = True)
+
+
+        """ EXECUTION """
+        store.write("Packed", self.info, store_histograms = True)
+        store.close()
+
+
+        """ VERIFICATION """
+        document = tfwda.persistence.mongodb.unpack_document(self.collection.find_one({"model_name": "Packed"}))
+        np.testing.assert_allclose(document["weights"]["medians"], np.asarray(self.info["median"], dtype = np.float32))
+        self.assertEqual(first = self.info["names"], second = document["weights"]["names"])
+        self.assertEqual(first = len(self.info["histograms"]), second = len(document["weights"]["histograms"]))
+
+
+    def test_columnar_scan_s01(self):
+        """
+        One row per weight is written and a filtered, projected scan only
+        returns the requested rows and columns
+        """
+
+        """ PREPARATION """
+        import pyarrow.dataset
+        directory = tempfile.mkdtemp()
+        store     = tfwda.persistence.columnar.ColumnarResultStore(directory, file_format = "arrow")
+
+
+        """ EXECUTION """
+        for count in range(3):
+            store.write(f"Model{count}", self.info, store_histograms = count == 0)
+        store.close()
+        table = store.scan(columns = ["model_name", "name", "median"], filter = pyarrow.dataset.field("model_name") == "Model1")
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 6, second = store.scan(columns = ["name"]).num_rows)
+        self.assertEqual(first = ["model_name", "name", "median"], second = table.column_names)
+        self.assertEqual(first = self.info["median"], second = table.column("median").to_pylist())
+        self.assertEqual(first = self.info["names"], second = table.column("name").to_pylist())
+
+
+    def test_tensor_documents_s01(self):
+        """
+        Every weight gets its own indexed document and payloads beyond
+        the inline size are moved to GridFS and restored
+        """
+
+        """ PREPARATION """
+        collection = mongomock.MongoClient()["NNModels"]["tensor_information"]
+        store      = tfwda.persistence.mongodb.MongoTensorResultStore(collection, bucket = MemoryBucket(), inline_bytes = 256, background = False)
+
+
+        """ EXECUTION """
+        for count in range(3):
+            store.write(f"Model{count}", self.info, store_histograms = True)
+        store.close()
+        documents = list(collection.find({"name": "dense/kernel:0"}, {"model_name": 1, "kurtosis": 1, "payload_id": 1}))
+        inline    = collection.find_one({"model_name": "Model1", "name": "dense/bias:0"})
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 6, second = collection.count_documents({}))
+        self.assertIn(member = "name_1_model_name_1_date_-1", container = collection.index_information())
+        self.assertIn(member = "model_name_1_date_1_index_1", container = collection.index_information())
+        self.assertEqual(first = ["Model0", "Model1", "Model2"], second = [document["model_name"] for document in documents])
+        self.assertEqual(first = [self.info["kurtosis"][0]] * 3, second = [document["kurtosis"] for document in documents])
+        self.assertEqual(first = self.info["histograms"][0].counts.tolist(), second = store.load_payload(documents[1])["histogram"]["counts"])
+        self.assertEqual(first = self.info["histograms"][1].counts.tolist(), second = store.load_payload(inline)["histogram"]["counts"])
+        self.assertNotIn(member = "payload_id", container = inline)
+
+
+    def test_payloads_first_s01(self):
+        """
+        Payloads are uploaded before the documents referring to them, even
+        when a batch starts with documents of another model, and the documents
+        of a model whose upload failed are skipped
+        """
+
+        """ PREPARATION """
+        collection = mongomock.MongoClient()["NNModels"]["tensor_information"]
+        bucket     = CheckedBucket(collection, "Model2")
+        store      = tfwda.persistence.mongodb.MongoTensorResultStore(collection, bucket = bucket, inline_bytes = 256, batch_size = 4, background = False)
+
+
+        """ EXECUTION """
+        with self.assertRaises(IOError):
+            for count in range(3):
+                store.write(f"Model{count}", self.info, store_histograms = True)
+        store.close()
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 0, second = bucket.early)
+        self.assertEqual(first = ["Model0", "Model0", "Model1", "Model1"], second = sorted(document["model_name"] for document in collection.find({})))
+        self.assertEqual(first = 2, second = len(bucket.files))
+
+
+    def test_query_s01(self):
+        """
+        Queries on the columnar and the per-tensor store return the same
+        columns and a repeated query is served from the cache
+        """
+
+        """ PREPARATION """
+        columnar = tfwda.persistence.columnar.ColumnarResultStore(tempfile.mkdtemp())
+        tensors  = tfwda.persistence.mongodb.MongoTensorResultStore(mongomock.MongoClient()["NNModels"]["tensor_information"], bucket = MemoryBucket(),
+                                                                    background = False)
+        for store in [columnar, tensors]:
+            for count in [2, 0, 1]:
+                store.write(f"Model{count}", self.info)
+            store.close()
+        query = tfwda.persistence.standard.build_query(["Model0", "Model1"], "kernel", columns = ["kurtosis", "shape"])
+        cache = tfwda.cache.standard.QueryCache()
+
+
+        """ EXECUTION """
+        results = [store.query(query) for store in [columnar, tensors]]
+        records = tfwda.persistence.standard.to_records(cache.fetch(query, columnar.query))
+        cached  = cache.fetch(query, tensors.query)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = ("model_name", "date", "name", "kurtosis", "shape"), second = records.dtype.names)
+        self.assertEqual(first = ["Model0", "Model1"], second = records.model_name.tolist())
+        self.assertEqual(first = [(10, 50)] * 2, second = records["shape"].tolist())
+        np.testing.assert_array_equal(results[0]["kurtosis"], results[1]["kurtosis"])
+        np.testing.assert_array_equal(np.full(2, self.info["kurtosis"][0]), cached["kurtosis"])
+        self.assertEqual(first = (1, 1), second = (cache.hits, cache.misses))
+        self.assertFalse(expr = cached["kurtosis"].flags.writeable)
@@ -0,0 +1,65 @@
+import time
+import unittest
+import threading
+
+import tfwda.pipeline.standard
+import tfwda.utils.errors
+
+
+class TestPipeline(unittest.TestCase):
+    def test_bounded_queues_s01(self):
+        """
+        Results keep the order of the items and a slow stage holds the
+        faster stages back, at most a few items are in flight
+        """
+
+        """ PREPARATION """
+        in_flight = {'current': 0, 'maximum': 0}
+        lock      = threading.Lock()
+        def produce(item):
+            with lock:
+                in_flight['current'] += 1
+                in_flight['maximum']  = max(in_flight['maximum'], in_flight['current'])
+            return item * 2
+        def consume(item):
+            time.sleep(0.005)
+            with lock:
+                in_flight['current'] -= 1
+            return item + 1
+        stages   = [tfwda.pipeline.standard.Stage("produce", produce), tfwda.pipeline.standard.Stage("consume", consume)]
+        pipeline = tfwda.pipeline.standard.Pipeline(stages, capacity = 1)
+
+
+        """ EXECUTION """
+        results = pipeline.run(range(50))
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = [item * 2 + 1 for item in range(50)], second = results)
+        self.assertLessEqual(a = in_flight['maximum'], b = 3)
+
+
+    def test_error_propagation_s01(self):
+        """
+        The first error of a stage stops the pipeline and is raised with
+        the name of the failed stage and the error as cause
+        """
+
+        """ PREPARATION """
+        def fail(item):
+            if item == 3:
+                raise KeyError(item)
+            return item
+        stages   = [tfwda.pipeline.standard.Stage("pass", lambda item: item), tfwda.pipeline.standard.Stage("fail", fail, workers = 2)]
+        pipeline = tfwda.pipeline.standard.Pipeline(stages)
+
+
+        """ EXECUTION """
+        with self.assertRaises(tfwda.utils.errors.PipelineError) as context:
+            pipeline.run(iter(range(10 ** 6)))
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = "fail", second = context.exception.stage)
+        self.assertIsInstance(obj = context.exception.__cause__, cls = KeyError)
+        self.assertEqual(first = 1, second = threading.active_count())
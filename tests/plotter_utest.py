@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+import collections
+import numpy as np
+
+import tfwda.analyse.histogram
+import tfwda.logger.standard
+import tfwda.plotter.raster
+
+
+class TestRasterPlotter(unittest.TestCase):
+    def setUp(self) -> None:
+        generator      = np.random.default_rng(seed = 9)
+        self.directory = tempfile.mkdtemp()
+        self.weights   = [generator.normal(size = 4000).astype(np.float32), generator.normal(size = 16).astype(np.float16)]
+        self.metadata  = collections.OrderedDict({'names': ["dense/kernel:0", "dense/bias:0"], 'shapes': [(40, 100), (16,)], 'dtypes': ["float32", "float16"]})
+
+
+    def test_raster_plot_s01(self):
+        """
+        Weights rendered on the worker pool and a histogram rendered in process
+        are written as PNG files where file_path locates them
+        """
+
+        """ PREPARATION """
+        plotter   = tfwda.plotter.raster.RasterPlotter(tfwda.logger.standard.Logger(False), self.directory, workers = 2, max_bins = 32)
+        histogram = tfwda.analyse.histogram.Histogram(np.array([1, 4, 2]), np.array([-1.0, 0.0, 1.0, 2.0]))
+
+
+        """ EXECUTION """
+        plotter.plot("Model", self.weights, self.metadata)
+        plotter.plot_histogram("Model", histogram, "dense/gamma:0", (3,), "float32")
+        plotter.close()
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = f"{self.directory}/Model_dense_kernel_0_(40, 100)_float32.png",
+                         second = plotter.file_path("Model", "dense/kernel:0", (40, 100), "float32"))
+        self.assertLessEqual(a = plotter.bin(self.weights[0])[0].size, b = 32)
+        for name, shape, dtype in zip(self.metadata['names'] + ["dense/gamma:0"], self.metadata['shapes'] + [(3,)], self.metadata['dtypes'] + ["float32"]):
+            with open(plotter.file_path("Model", name, shape, dtype), "rb") as png:
+                self.assertEqual(first = b"\x89PNG\r\n\x1a\n", second = png.read(8))
+
+
+    def test_bin_limits_s01(self):
+        """
+        Heavy-tailed weights and fine histograms of the Analyser are both
+        rendered with at most max_bins bins and no value is lost
+        """
+
+        """ PREPARATION """
+        plotter   = tfwda.plotter.raster.RasterPlotter(tfwda.logger.standard.Logger(False), self.directory, max_bins = 32)
+        heavy     = np.random.default_rng(seed = 11).standard_cauchy(size = 100000).astype(np.float32)
+        histogram = tfwda.analyse.histogram.Histogram(np.arange(1000), np.linspace(-1.0, 1.0, 1001))
+
+
+        """ EXECUTION """
+        counts, edges               = plotter.bin(heavy)
+        merged_counts, merged_edges = plotter.coarsen(histogram)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = 32, second = counts.size)
+        self.assertEqual(first = heavy.size, second = int(counts.sum()))
+        self.assertEqual(first = (float(heavy.min()), float(heavy.max())), second = (edges[0], edges[-1]))
+        self.assertEqual(first = 32, second = merged_counts.size)
+        self.assertEqual(first = merged_counts.size + 1, second = merged_edges.size)
+        self.assertEqual(first = int(histogram.counts.sum()), second = int(merged_counts.sum()))
+        self.assertEqual(first = (-1.0, 1.0), second = (merged_edges[0], merged_edges[-1]))
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+try:
+    import ml_dtypes
+except ImportError:
+    ml_dtypes = None
+
+import tfwda.logger.standard
+import tfwda.model.numpy
+import tfwda.serializer.standard
+
+
+class TestSerializer(unittest.TestCase):
+    def setUp(self) -> None:
+        generator       = np.random.default_rng(seed = 3)
+        directory       = tempfile.mkdtemp()
+        memmap          = np.lib.format.open_memmap(os.path.join(directory, "kernel.npy"), mode = "w+", dtype = np.float32, shape = (6, 5))
+        memmap[:]       = generator.normal(size = (6, 5))
+        self.arrays     = {'dense/kernel:0': memmap,
+                           'dense/bias:0': generator.normal(size = 5).astype(np.float16),
+                           'embedding/embeddings:0': generator.normal(size = (4, 3)).astype(ml_dtypes.bfloat16) if ml_dtypes is not None else None,
+                           'quantized/kernel:0': generator.integers(low = -128, high = 128, size = (3, 3), dtype = np.int8)}
+        # bfloat16 needs ml_dtypes, the remaining dtypes are checked without it
+        self.arrays     = {name: array for name, array in self.arrays.items() if array is not None}
+        self.expected   = [(name, shape, dtype) for name, shape, dtype in [('dense/kernel:0', (6, 5), 'float32'), ('dense/bias:0', (5,), 'float16'),
+                                                                       ('embedding/embeddings:0', (4, 3), 'bfloat16'), ('quantized/kernel:0', (3, 3), 'int8')]
+                           if name in self.arrays]
+        self.model      = tfwda.model.numpy.ArrayModel("Arrays", self.arrays)
+        self.serializer = tfwda.serializer.standard.Serializer(tfwda.logger.standard.Logger(False))
+
+
+    def test_flatten_zero_copy_s01(self):
+        """
+        Flattened weights are views on the memory mapped or in-memory arrays
+        and keep their native dtype
+        """
+
+        """ PREPARATION """
+
+
+        """ EXECUTION """
+        serialized_weights, metadata = self.serializer.flatten(self.model)
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = [dtype for _, _, dtype in self.expected], second = metadata['dtypes'])
+        self.assertEqual(first = [shape for _, shape, _ in self.expected], second = metadata['shapes'])
+        for array, weight in zip(self.arrays.values(), serialized_weights):
+            self.assertTrue(expr = np.shares_memory(array, weight))
+            self.assertEqual(first = array.dtype, second = weight.dtype)
+            self.assertEqual(first = 1, second = weight.ndim)
+            np.testing.assert_array_equal(np.asarray(array).reshape(-1), weight)
+
+
+    def test_iter_flatten_s01(self):
+        """
+        Iterating over the records yields the names, shapes and dtypes of
+        flatten in the same order
+        """
+
+        """ PREPARATION """
+        serialized_weights, metadata = self.serializer.flatten(self.model)
+
+
+        """ EXECUTION """
+        records = list(self.serializer.iter_flatten(self.model))
+
+
+        """ VERIFICATION """
+        self.assertEqual(first = metadata['names'], second = [record.name for record in records])
+        self.assertEqual(first = metadata['shapes'], second = [record.shape for record in records])
+        self.assertEqual(first = metadata['dtypes'], second = [record.dtype for record in records])
+        for weight, record in zip(serialized_weights, records):
+            self.assertTrue(expr = np.shares_memory(weight, record.view))
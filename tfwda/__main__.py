@@ -0,0 +1,54 @@
+"""Sharded, resumable batch analysis of model files
+
+    python -m tfwda /data/checkpoints --output results --job-dir job --shard-index 0 --shard-count 8 --workers 4
+
+Every node runs the same command with its own shard index, the models are split deterministically by
+their names. Completed models are journaled in the job directory, a restarted command skips them and
+resumes interrupted models tensor by tensor, see `tfwda.batch.standard`
+"""
+import sys
+import argparse
+
+
+import tfwda.batch.standard
+
+
+def main(arguments: list = None) -> int:
+    parser = argparse.ArgumentParser(prog = "python -m tfwda", description = "Sharded, resumable batch analysis of model files")
+    parser.add_argument("inputs", nargs = "+", help = "directories, model files (.h5, .hdf5, .keras, .npz, checkpoint prefixes) or manifests")
+    parser.add_argument("--job-dir", type = str, required = True, help = "directory of the progress journals, shared by all shards of a job")
+    parser.add_argument("--plots", type = str, default = None, help = "directory of the plots, by default 'plots' in the job directory")
+    parser.add_argument("--output", type = str, default = None, help = "directory of a columnar result store instead of MongoDB")
+    parser.add_argument("--format", type = str, default = "parquet", choices = ["parquet", "arrow"], help = "file format of the columnar result store")
+    parser.add_argument("--mongodb", type = str, default = None, help = "MongoDB connection string, used if no output directory is given")
+    parser.add_argument("--database", type = str, default = "NNModels", help = "name of the MongoDB database")
+    parser.add_argument("--shard-index", type = int, default = 0, help = "index of the shard of this node")
+    parser.add_argument("--shard-count", type = int, default = 1, help = "number of shards, e.g. nodes")
+    parser.add_argument("--workers", type = int, default = 1, help = "worker processes on this node, every worker processes one model at a time")
+    parser.add_argument("--plot-backend", type = str, default = "raster", choices = ["plotly", "raster"], help = "backend of the plots")
+    parser.add_argument("--batched", action = "store_true", help = "segmented batch analysis of small weights")
+    parser.add_argument("--approximate", action = "store_true", help = "approximate analysis of very large weights")
+    parser.add_argument("--per-tensor", action = "store_true", help = "one MongoDB document per weight, bulky payloads in GridFS")
+    parser.add_argument("--binary-arrays", action = "store_true", help = "store the statistics as packed float32 binaries in MongoDB")
+    parser.add_argument("--store-histograms", action = "store_true", help = "store the histograms next to the statistics")
+    parser.add_argument("--quiet", action = "store_true", help = "only print the summary")
+    args = parser.parse_args(arguments)
+    if args.output is None and args.mongodb is None:
+        parser.error("either --output or --mongodb is required")
+
+    tasks       = tfwda.batch.standard.discover(args.inputs)
+    model_store = {'db_connection_string': args.mongodb, 'database_name': args.database, 'verbosity': False,
+                   'path_to_dir': args.plots if args.plots is not None else f"{args.job_dir}/plots", 'batched_analysis': args.batched,
+                   'plot_backend': args.plot_backend, 'binary_arrays': args.binary_arrays, 'approximate_analysis': args.approximate,
+                   'output': args.output, 'file_format': args.format, 'per_tensor': args.per_tensor}
+    runner      = tfwda.batch.standard.BatchRunner(args.job_dir, model_store, args.shard_index, args.shard_count, args.workers,
+                                                   args.store_histograms, verbosity = not args.quiet)
+    summary     = runner.run(tasks)
+    print(f"{len(summary['done'])} done, {len(summary['skipped'])} skipped, {len(summary['failed'])} failed")
+    for model_name, error in summary['failed'].items():
+        print(f"{model_name}: {error}", file = sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import abc
+import re
+import collections
+import numpy as np
+from abc import abstractmethod
+from typing import Callable, Iterable, NamedTuple, Optional, Sequence
+
+
+import tfwda.analyse.histogram
+
+
+class Edges(NamedTuple):
+    """Uniform edges of a fixed-edge histogram
+
+    Attributes
+    ----------
+        low  : float
+            First edge
+        high : float
+            Last edge
+        bins : int
+            Number of bins
+    """
+    low  : float
+    high : float
+    bins : int
+
+
+def layer_type(name: str, shape: Optional[Sequence[int]] = None) -> str:
+    """Type of a weight out of its name and rank, i.e. the variable name without scope and device suffix,
+    e.g. 'gamma' for 'conv2_block1_1_bn/gamma:0' or 'kernel' for 'dense/kernel:0'. Weights of a rank above
+    2 carry their rank, e.g. 'kernel_4d' for the kernel of a 2D convolution, so that convolution kernels
+    are kept apart from dense kernels of the same variable name
+
+    Parameters
+    ----------
+        name  : str
+            Name of the weight
+        shape : Sequence[int]
+            Shape of the weight, the rank is not considered if None
+    """
+    variable = name.split(":")[0].split("/")[-1]
+    if shape is not None and len(shape) > 2:
+        return "%s_%dd" % (variable, len(shape))
+    return variable
+
+
+def block(name: str, shape: Optional[Sequence[int]] = None) -> str:
+    """Block of a weight out of its name, the outermost scope up to a 'block<n>' part as the Keras
+    applications name their blocks, e.g. 'conv2_block1' for 'conv2_block1_1_bn/gamma:0', otherwise
+    the outermost scope
+
+    Parameters
+    ----------
+        name  : str
+            Name of the weight
+        shape : Sequence[int]
+            Shape of the weight, not considered
+    """
+    scope = name.split(":")[0].split("/")[0]
+    match = re.match(r"^(.*?block\d+[a-z]?)", scope)
+    return match.group(1) if match else scope
+
+
+# groupings of the weights of a model which are aggregated, the whole model is one group
+GROUPINGS = collections.OrderedDict({'layer_type': layer_type, 'block': block, 'model': lambda name, shape = None: "model"})
+
+
+class IFEdgeScheme(metaclass = abc.ABCMeta):
+    """Interface for edge schemes, an edge scheme decides the edges of the fixed-edge histogram of
+    every weight, weights with equal edges can be merged
+
+    Methods (abstract)
+    ------------------
+        edges(name str, dtype str, shape Sequence[int]) Edges
+            Edges of a weight
+
+    Methods
+    -------
+        histogram(weight np.ndarray, name str, dtype str, shape Sequence[int]) FixedHistogram
+            Bins a flat weight over its edges
+    """
+
+
+    @abstractmethod
+    def edges(self, name: str, dtype: str, shape: Optional[Sequence[int]] = None) -> Edges:
+        pass
+
+
+    def histogram(self, weight: np.ndarray, name: str, dtype: str, shape: Optional[Sequence[int]] = None) -> tfwda.analyse.histogram.FixedHistogram:
+        """Bins a flat weight over its edges
+
+        Parameters
+        ----------
+            weight : np.ndarray
+                Flat weight
+            name   : str
+                Name of the weight
+            dtype  : str
+                Dtype of the weight
+            shape  : Sequence[int]
+                Shape of the weight, see `layer_type`
+        """
+        low, high, bins = self.edges(name, dtype, shape)
+        return tfwda.analyse.histogram.bin_fixed(weight, low, high, bins)
+
+
+class EdgeScheme(IFEdgeScheme):
+    """Deterministic edges per dtype and per layer type. The first rule whose layer type pattern and
+    dtype match a weight decides its edges, weights without a matching rule get the default edges
+
+    Parameters
+    ----------
+        default : Edges
+            Edges of weights without a matching rule
+        rules   : list[tuple[str, str, Edges]]
+            Regular expression on the layer type, see `layer_type`, dtype or None for any dtype,
+            and the edges, e.g. `("gamma", None, Edges(0.0, 2.0, 256))` for all batch normalization gammas
+            or `("kernel_4d", None, Edges(-0.5, 0.5, 512))` for the kernels of 2D convolutions
+
+    Methods
+    -------
+        edges(name str, dtype str, shape Sequence[int]) Edges
+            Edges of a weight
+    """
+
+
+    def __init__(self, default: Edges = Edges(-1.0, 1.0, 512), rules: Optional[list[tuple[str, Optional[str], Edges]]] = None):
+        self.default = default
+        self.rules   = [(re.compile(pattern), dtype, edges) for pattern, dtype, edges in (rules or [])]
+
+
+    def edges(self, name: str, dtype: str, shape: Optional[Sequence[int]] = None) -> Edges:
+        """Edges of a weight
+
+        Parameters
+        ----------
+            name  : str
+                Name of the weight
+            dtype : str
+                Dtype of the weight
+            shape : Sequence[int]
+                Shape of the weight, see `layer_type`
+        """
+        weight_type = layer_type(name, shape)
+        for pattern, rule_dtype, edges in self.rules:
+            if pattern.fullmatch(weight_type) and rule_dtype in [None, dtype]:
+                return edges
+        return self.default
+
+
+def aggregate(histograms: Iterable[tuple[str, Sequence[int], tfwda.analyse.histogram.FixedHistogram]], key: Callable[[str, Sequence[int]], str]) -> collections.OrderedDict:
+    """Merges the fixed-edge histograms of all weights which share a group, only the histograms are
+    touched, never the weights. Weights of a group whose edges differ are grouped by their edges as well
+
+    Parameters
+    ----------
+        histograms : Iterable[tuple[str, Sequence[int], analyse.histogram.FixedHistogram]]
+            Name, shape and fixed-edge histogram of every weight, None histograms are skipped
+        key        : Callable[[str, Sequence[int]], str]
+            Group of a weight out of its name and shape, e.g. `layer_type`, `block` or one of `GROUPINGS`
+
+    Returns
+    -------
+        collections.OrderedDict
+            Merged histogram per group, keyed by the group if all its weights share the edges, by
+            group and edges otherwise
+    """
+    merged = collections.OrderedDict()
+    edges  = collections.defaultdict(set)
+    for name, shape, histogram in histograms:
+        if histogram is None:
+            continue
+        group = key(name, shape)
+        bounds = (float(histogram.edges[0]), float(histogram.edges[-1]), histogram.counts.size)
+        edges[group].add(bounds)
+        merged[(group, bounds)] = merged[(group, bounds)].merge(histogram) if (group, bounds) in merged else histogram
+
+    return collections.OrderedDict(((group, bounds) if len(edges[group]) > 1 else group, histogram)
+                                   for (group, bounds), histogram in merged.items())
+
+
+def aggregate_model(names: list[str], shapes: list, histograms: list[tfwda.analyse.histogram.FixedHistogram]) -> list[dict]:
+    """Aggregates of a model for every grouping of `GROUPINGS` in the layout they are stored in
+
+    Parameters
+    ----------
+        names      : list[str]
+            Names of the weights
+        shapes     : list
+            Shapes of the weights
+        histograms : list[analyse.histogram.FixedHistogram]
+            Fixed-edge histogram of every weight
+
+    Returns
+    -------
+        list[dict]
+            One entry per grouping and group with 'grouping', 'group' and the histogram, see
+            `analyse.histogram.FixedHistogram.to_document`
+    """
+    documents = []
+    for grouping, key in GROUPINGS.items():
+        for group, histogram in aggregate(zip(names, shapes, histograms), key).items():
+            documents.append(dict(histogram.to_document(), grouping = grouping, group = group if isinstance(group, str) else group[0]))
+    return documents
+
+
+def aggregate_documents(documents: Iterable[dict], key: Callable[[str, Sequence[int]], str] = GROUPINGS['model']) -> collections.OrderedDict:
+    """Aggregates over the stored documents of any number of models, out of the persisted fixed-edge
+    histograms alone, e.g. the distribution of all batch normalization gammas in the database
+
+    Parameters
+    ----------
+        documents : Iterable[dict]
+            Documents as `persistence.standard.build_document` builds them, e.g. a MongoDB cursor
+            with a projection on `weights.names`, `weights.shapes` and `weights.fixed_histograms`
+        key       : Callable[[str, Sequence[int]], str]
+            Group of a weight out of its name and shape
+
+    Returns
+    -------
+        collections.OrderedDict
+            Merged histogram per group, see `aggregate`
+    """
+    def histograms():
+        for document in documents:
+            weights = document["weights"]
+            shapes  = weights.get("shapes", [None] * len(weights["names"]))
+            for name, shape, histogram in zip(weights["names"], shapes, weights.get("fixed_histograms", [])):
+                if histogram is not None:
+                    yield name, shape, tfwda.analyse.histogram.FixedHistogram.from_document(histogram)
+    return aggregate(histograms(), key)
@@ -0,0 +1,135 @@
+import numpy as np
+from typing import Sequence
+
+
+import tfwda.analyse.kernels
+
+
+# statistics computed along an axis, the mode is left out since it needs a histogram per slice
+AXIS_STATISTICS = ['min', 'max', 'mean', '25-quantile', 'median', '75-quantile', 'IQR', 'variance', 'skewness', 'kurtosis', 'MAD']
+# number of elements processed at once, whole rows are processed together until this is reached
+CHUNK_SIZE      = 1 << 20
+
+
+def rows(weight: np.ndarray, shape: Sequence[int], axis: int) -> np.ndarray:
+    """Arranges a flat weight as one row per index along `axis` of its original shape, e.g. one row per
+    output filter of a convolution kernel for axis -1
+
+    Parameters
+    ----------
+        weight : np.ndarray
+            Flat weight in C order
+        shape  : Sequence[int]
+            Original shape of the weight
+        axis   : int
+            Axis whose indices become the rows
+    """
+    return np.moveaxis(weight.reshape(tuple(shape)), axis, 0).reshape(shape[axis], -1)
+
+
+def _lerp(lower: np.ndarray, upper: np.ndarray, fraction: float) -> np.ndarray:
+    """Vectorized `analyse.kernels._lerp`, thus the quantiles agree with `np.quantile`"""
+    difference = upper - lower
+    if fraction >= 0.5:
+        return upper - difference * (1 - fraction)
+    return lower + difference * fraction
+
+
+def _order_statistics(block: np.ndarray, quantiles: tuple) -> tuple[np.ndarray, np.ndarray, list[np.ndarray]]:
+    """Row-wise `analyse.kernels.order_statistics` out of one partition of the block along its rows"""
+    size      = block.shape[1]
+    positions = tfwda.analyse.kernels._quantile_positions(size, quantiles)
+    kth       = {0, size - 1}
+    for lower_index, upper_index, _ in positions:
+        kth.update((lower_index, upper_index))
+    partitioned = np.partition(block, sorted(kth), axis = 1)
+    values      = [_lerp(partitioned[:, lower_index].astype(np.float64), partitioned[:, upper_index].astype(np.float64), fraction)
+                   for lower_index, upper_index, fraction in positions]
+    return partitioned[:, 0].astype(np.float64), partitioned[:, -1].astype(np.float64), values
+
+
+def _describe_block(block: np.ndarray, dtype: np.dtype) -> dict:
+    minima, maxima, (lower_quartile, medians, upper_quartile) = _order_statistics(block, tfwda.analyse.kernels.QUANTILES)
+
+    means      = np.mean(block, axis = 1, dtype = np.float64)
+    deviations = np.subtract(block, means[:, None], dtype = np.float64)
+    squared    = deviations * deviations
+    m2         = np.mean(squared, axis = 1)
+    m3         = np.mean(squared * deviations, axis = 1)
+    m4         = np.mean(squared * squared, axis = 1)
+    del deviations, squared
+
+    resolution = float(np.finfo(dtype if np.issubdtype(dtype, np.floating) else np.float64).resolution)
+    degenerate = m2 <= np.square(resolution * means, dtype = np.float64)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        skewness = np.where(degenerate, 0.0, m3 / m2 ** 1.5)
+        kurtosis = np.where(degenerate, -3.0, m4 / m2 ** 2 - 3.0)
+
+    absolute_deviations = np.abs(np.subtract(block, medians[:, None], dtype = np.float64))
+    _, _, (mads,)       = _order_statistics(absolute_deviations, (0.5,))
+    del absolute_deviations
+
+    return {'min': minima, 'max': maxima, 'mean': means, '25-quantile': lower_quartile, 'median': medians, '75-quantile': upper_quartile,
+            'IQR': upper_quartile - lower_quartile, 'variance': m2, 'skewness': skewness, 'kurtosis': kurtosis,
+            'MAD': mads / tfwda.analyse.kernels.NORMAL_SCALE}
+
+
+def describe_rows(matrix: np.ndarray) -> dict:
+    """Computes the statistics of `AXIS_STATISTICS` of every row of a matrix at once, e.g. of every output
+    filter of a kernel, see `rows`. Rows are processed in blocks of about `CHUNK_SIZE` elements, every
+    block needs two partitions along its rows and one moment pass accumulated in float64, there is no
+    loop over single rows
+
+    Parameters
+    ----------
+        matrix : np.ndarray
+            Matrix with one distribution per row, rows have at least one element
+
+    Returns
+    -------
+        dict
+            One float64 array per statistic with one entry per row, results agree with
+            `analyse.kernels.describe` of every row on its own
+    """
+    matrix     = tfwda.analyse.kernels.as_numeric(matrix)
+    block_rows = max(1, CHUNK_SIZE // max(1, matrix.shape[1]))
+    blocks     = [_describe_block(matrix[start:start + block_rows], matrix.dtype) for start in range(0, matrix.shape[0], block_rows)]
+    return {statistic: np.concatenate([block[statistic] for block in blocks]) for statistic in AXIS_STATISTICS}
+
+
+def applicable(shape: Sequence[int], axes: Sequence[int]) -> list[int]:
+    """Axes which a weight of the given shape is described along, weights of rank 0 or 1 have none
+
+    Parameters
+    ----------
+        shape : Sequence[int]
+            Original shape of the weight
+        axes  : Sequence[int]
+            Requested axes
+    """
+    if len(shape) < 2:
+        return []
+    return [axis for axis in axes if -len(shape) <= axis < len(shape)]
+
+
+def describe_axes(weight: np.ndarray, shape: Sequence[int], axes: Sequence[int]) -> dict:
+    """Statistics of every slice along each of the axes, e.g. per output filter (-1) and per input
+    channel (-2) of a Keras convolution kernel. Weights whose rank is too small for an axis skip it
+
+    Parameters
+    ----------
+        weight : np.ndarray
+            Flat weight in C order
+        shape  : Sequence[int]
+            Original shape of the weight
+        axes   : Sequence[int]
+            Axes of the original shape
+
+    Returns
+    -------
+        dict
+            Statistics per axis, see `describe_rows`, keyed by the axis as given
+    """
+    if weight.size == 0:
+        return {}
+    return {axis: describe_rows(rows(weight, shape, axis)) for axis in applicable(shape, axes)}
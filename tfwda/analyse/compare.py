@@ -0,0 +1,245 @@
+import numpy as np
+import collections
+from typing import NamedTuple
+
+
+import tfwda.analyse.kernels
+import tfwda.model.standard
+import tfwda.serializer.standard
+
+
+# distances between the weight distributions of two models
+DISTANCES  = ['W1', 'KS', 'KL', 'JS']
+# additive smoothing of the bin probabilities, keeps the Kullback-Leibler divergence finite
+SMOOTHING  = 1e-10
+# number of rows of a distance matrix computed at once, bounds the temporary memory to about
+# BLOCK_SIZE * models * points floats
+BLOCK_SIZE = 64
+
+
+class Comparison(NamedTuple):
+    """Distances between the weight distributions of several models
+
+    Attributes
+    ----------
+        model_names : list[str]
+            Names of the models, the order of the rows and columns of every matrix
+        layers      : collections.OrderedDict
+            Distance matrices per weight, keyed by name and shape, every entry maps each of `DISTANCES`
+            to a models x models matrix, rows and columns of models without the weight are NaN
+        sizes       : collections.OrderedDict
+            Number of elements per weight, keyed like `layers`
+        aggregate   : dict
+            Mean of the matrices of all weights, weighted by their number of elements, per distance
+    """
+    model_names : list[str]
+    layers      : collections.OrderedDict
+    sizes       : collections.OrderedDict
+    aggregate   : dict
+
+
+def probabilities(points: int) -> np.ndarray:
+    """Probabilities of the quantile grid, from 0 (minimum) to 1 (maximum)
+
+    Parameters
+    ----------
+        points : int
+            Number of quantiles, at least 2
+    """
+    return np.linspace(0.0, 1.0, points)
+
+
+def quantile_function(weight: np.ndarray, points: int) -> np.ndarray:
+    """Compact representation of the distribution of a weight, its quantiles at `probabilities(points)`.
+    The quantile function, interpolated linearly, is the representation every distance is computed out of
+
+    Parameters
+    ----------
+        weight : np.ndarray
+            Flat, non-empty array
+        points : int
+            Number of quantiles
+    """
+    return np.quantile(tfwda.analyse.kernels.as_numeric(weight), probabilities(points)).astype(np.float64)
+
+
+def wasserstein(quantiles: np.ndarray, block_size: int = BLOCK_SIZE) -> np.ndarray:
+    """Wasserstein-1 distance of every pair of distributions, the integral of the absolute difference
+    of their quantile functions, integrated with the trapezoidal rule
+
+    Parameters
+    ----------
+        quantiles  : np.ndarray
+            Quantile functions, one row per distribution, see `quantile_function`
+        block_size : int
+            Number of rows computed at once
+    """
+    points    = quantiles.shape[1]
+    weights   = np.full(points, 1.0 / (points - 1))
+    distances = np.empty((quantiles.shape[0], quantiles.shape[0]))
+    weights[[0, -1]] /= 2.0
+    for start in range(0, quantiles.shape[0], block_size):
+        block = quantiles[start:start + block_size]
+        distances[start:start + block.shape[0]] = np.abs(block[:, None, :] - quantiles[None, :, :]) @ weights
+    return distances
+
+
+def kolmogorov_smirnov(quantiles: np.ndarray) -> np.ndarray:
+    """Kolmogorov-Smirnov statistic of every pair of distributions, the largest absolute difference of
+    their distribution functions. Both distribution functions are piecewise linear between the
+    quantiles, thus the largest difference lies at a quantile of either distribution and evaluating
+    every distribution function at all quantiles is exact
+
+    Parameters
+    ----------
+        quantiles : np.ndarray
+            Quantile functions, one row per distribution, see `quantile_function`
+    """
+    count, points = quantiles.shape
+    grid          = probabilities(points)
+    flat          = quantiles.reshape(-1)
+    own           = np.stack([np.interp(row, row, grid) for row in quantiles])
+    deviations    = np.empty((count, count))
+    for index, row in enumerate(quantiles):
+        deviations[index] = np.max(np.abs(np.interp(flat, row, grid, left = 0.0, right = 1.0).reshape(count, points) - own), axis = 1)
+    return np.maximum(deviations, deviations.T)
+
+
+def histograms(quantiles: np.ndarray, bins: int) -> tuple[np.ndarray, np.ndarray]:
+    """Bin probabilities of every distribution over common edges spanning all distributions, read off
+    the distribution functions, see `kolmogorov_smirnov`
+
+    Parameters
+    ----------
+        quantiles : np.ndarray
+            Quantile functions, one row per distribution
+        bins      : int
+            Number of bins
+
+    Returns
+    -------
+        np.ndarray, np.ndarray
+            Probabilities, one row per distribution, and the edges
+    """
+    low, high = float(np.min(quantiles[:, 0])), float(np.max(quantiles[:, -1]))
+    if high <= low:
+        return np.ones((quantiles.shape[0], 1)), np.array([low, high])
+    edges = np.linspace(low, high, bins + 1)
+    grid  = probabilities(quantiles.shape[1])
+    cdf   = np.stack([np.interp(edges, row, grid, left = 0.0, right = 1.0) for row in quantiles])
+    cdf[:, 0], cdf[:, -1] = 0.0, 1.0
+    return np.diff(cdf, axis = 1), edges
+
+
+def kullback_leibler(counts: np.ndarray) -> np.ndarray:
+    """Kullback-Leibler divergence KL(row || column) of every pair of histograms over the same edges in
+    nats, computed as one matrix product. The histograms are smoothed by `SMOOTHING`
+
+    Parameters
+    ----------
+        counts : np.ndarray
+            Bin counts or probabilities, one row per distribution, e.g. stored fixed-edge histograms
+    """
+    probability = _normalize(counts)
+    logarithm   = np.log(probability)
+    entropy     = np.sum(probability * logarithm, axis = 1)
+    return np.maximum(entropy[:, None] - probability @ logarithm.T, 0.0)
+
+
+def jensen_shannon(counts: np.ndarray, block_size: int = BLOCK_SIZE) -> np.ndarray:
+    """Jensen-Shannon divergence of every pair of histograms over the same edges in nats, i.e. the
+    entropy of the mixture minus the mean entropy of both, bounded by ln(2)
+
+    Parameters
+    ----------
+        counts     : np.ndarray
+            Bin counts or probabilities, one row per distribution
+        block_size : int
+            Number of rows computed at once
+    """
+    probability = _normalize(counts)
+    entropy     = -np.sum(probability * np.log(probability), axis = 1)
+    divergences = np.empty((counts.shape[0], counts.shape[0]))
+    for start in range(0, counts.shape[0], block_size):
+        mixture = (probability[start:start + block_size, None, :] + probability[None, :, :]) / 2.0
+        mixed   = -np.sum(mixture * np.log(mixture), axis = 2)
+        divergences[start:start + mixture.shape[0]] = mixed - (entropy[start:start + mixture.shape[0], None] + entropy[None, :]) / 2.0
+    return np.clip(divergences, 0.0, np.log(2.0))
+
+
+def _normalize(counts: np.ndarray) -> np.ndarray:
+    probability = np.asarray(counts, dtype = np.float64) + SMOOTHING
+    return probability / np.sum(probability, axis = 1, keepdims = True)
+
+
+def distances(quantiles: np.ndarray, bins: int = 64) -> dict:
+    """All distances of `DISTANCES` between every pair of distributions
+
+    Parameters
+    ----------
+        quantiles : np.ndarray
+            Quantile functions, one row per distribution, see `quantile_function`
+        bins      : int
+            Number of bins of the histograms of the KL and JS divergences
+
+    Returns
+    -------
+        dict
+            Symmetric matrix per distance except 'KL', whose rows are the first argument
+    """
+    counts, _ = histograms(quantiles, bins)
+    return {'W1': wasserstein(quantiles), 'KS': kolmogorov_smirnov(quantiles), 'KL': kullback_leibler(counts), 'JS': jensen_shannon(counts)}
+
+
+def compare(models: list[tfwda.model.standard.IFModel], serializer: tfwda.serializer.standard.Serializer, points: int = 129, bins: int = 64) -> Comparison:
+    """Compares the weight distributions of several models or checkpoints. The models are streamed one
+    after another and every weight is reduced to its quantile function right away, thus only
+    `points` floats per model and weight are held. Weights are matched by their variable path, see
+    `model.standard.variable_path`, and shape, the matrices of a weight are computed for all models
+    containing it at once
+
+    Parameters
+    ----------
+        models     : list[model.standard.IFModel]
+            Models which are compared
+        serializer : serializer.standard.Serializer
+            Serializer which streams the weights of the models
+        points     : int
+            Number of quantiles per weight, the resolution of the distances
+        bins       : int
+            Number of bins of the histograms of the KL and JS divergences
+
+    Returns
+    -------
+        Comparison
+            Distance matrices per weight and their aggregate
+    """
+    model_names = [model.name for model in models]
+    functions   = collections.OrderedDict()
+    sizes       = collections.OrderedDict()
+    for index, model in enumerate(models):
+        for record in serializer.iter_flatten(model):
+            if record.view.size == 0:
+                continue
+            key = (tfwda.model.standard.variable_path(record.name), tuple(record.shape))
+            functions.setdefault(key, {})[index] = quantile_function(record.view, points)
+            sizes[key] = record.view.size
+
+    layers    = collections.OrderedDict()
+    total     = {distance: np.zeros((len(models), len(models))) for distance in DISTANCES}
+    weighting = np.zeros((len(models), len(models)))
+    for key, rows in functions.items():
+        indices = np.fromiter(rows.keys(), dtype = np.int64)
+        grid    = np.ix_(indices, indices)
+        result  = distances(np.stack(list(rows.values())), bins)
+        layers[key] = {}
+        for distance in DISTANCES:
+            matrix       = np.full((len(models), len(models)), np.nan)
+            matrix[grid] = result[distance]
+            layers[key][distance] = matrix
+            total[distance][grid] += sizes[key] * result[distance]
+        weighting[grid] += sizes[key]
+
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        aggregate = {distance: np.where(weighting > 0, total[distance] / weighting, np.nan) for distance in DISTANCES}
+    return Comparison(model_names, layers, sizes, aggregate)
@@ -0,0 +1,120 @@
+import numpy as np
+import collections
+
+
+import tfwda.analyse.kernels
+
+
+# norms of the difference of two steps
+DRIFT_NORMS      = ['L2', 'Linf', 'relative']
+# statistics whose change between two steps is recorded
+DRIFT_STATISTICS = ['min', 'max', 'mean', '25-quantile', 'median', '75-quantile', 'IQR', 'variance', 'skewness', 'kurtosis', 'MAD']
+# number of elements which are differenced at once, bounds the temporary memory
+CHUNK_SIZE       = 1 << 20
+
+
+def unchanged(previous: np.ndarray, current: np.ndarray) -> bool:
+    """Whether two flat weights are byte-identical
+
+    Parameters
+    ----------
+        previous : np.ndarray
+            Flat weight of the previous step
+        current  : np.ndarray
+            Flat weight of the current step
+    """
+    if previous.dtype != current.dtype or previous.size != current.size:
+        return False
+    return bool(np.array_equal(np.ascontiguousarray(previous).view(np.uint8), np.ascontiguousarray(current).view(np.uint8)))
+
+
+def delta_norms(previous: np.ndarray, current: np.ndarray) -> tuple[float, float, float]:
+    """L2 and L-infinity norm of the difference of two steps and the change relative to the L2 norm
+    of the previous step, the difference is accumulated chunk by chunk in float64
+
+    Parameters
+    ----------
+        previous : np.ndarray
+            Flat weight of the previous step
+        current  : np.ndarray
+            Flat weight of the current step, of the same size
+
+    Returns
+    -------
+        float, float, float
+            L2 norm, L-infinity norm and relative change, the relative change is inf if the previous
+            step is zero and the current is not
+    """
+    previous = tfwda.analyse.kernels.as_numeric(previous).reshape(-1)
+    current  = tfwda.analyse.kernels.as_numeric(current).reshape(-1)
+    squared  = 0.0
+    maximum  = 0.0
+    norm     = 0.0
+    for start in range(0, previous.size, CHUNK_SIZE):
+        before   = previous[start:start + CHUNK_SIZE].astype(np.float64)
+        after    = current[start:start + CHUNK_SIZE].astype(np.float64)
+        norm    += float(np.dot(before, before))
+        after   -= before
+        squared += float(np.dot(after, after))
+        maximum  = max(maximum, float(np.max(np.abs(after))))
+
+    l2 = np.sqrt(squared)
+    if norm > 0:
+        relative = l2 / np.sqrt(norm)
+    else:
+        relative = 0.0 if l2 == 0 else np.inf
+    return float(l2), maximum, float(relative)
+
+
+def drift(previous: np.ndarray, current: np.ndarray, previous_statistics: dict, current_statistics: dict) -> dict:
+    """Drift of a weight between two steps
+
+    Parameters
+    ----------
+        previous            : np.ndarray
+            Flat weight of the previous step
+        current             : np.ndarray
+            Flat weight of the current step
+        previous_statistics : dict
+            Statistics of the previous step, see `analyse.kernels.describe`
+        current_statistics  : dict
+            Statistics of the current step
+
+    Returns
+    -------
+        dict
+            'changed', the norms of `DRIFT_NORMS` and the change of every statistic of `DRIFT_STATISTICS`
+    """
+    result = {'changed': not unchanged(previous, current)}
+    if result['changed']:
+        result['L2'], result['Linf'], result['relative'] = delta_norms(previous, current)
+    else:
+        result['L2'], result['Linf'], result['relative'] = 0.0, 0.0, 0.0
+    for key in DRIFT_STATISTICS:
+        result[key] = float(current_statistics[key]) - float(previous_statistics[key])
+    return result
+
+
+def new_drift() -> collections.OrderedDict:
+    """Empty drift dictionary, parallel lists over the weights of a step like the properties of the Analyser"""
+    drift_properties = collections.OrderedDict({'names': [], 'changed': []})
+    for key in DRIFT_NORMS + DRIFT_STATISTICS:
+        drift_properties[key] = []
+    return drift_properties
+
+
+def append(drift_properties: collections.OrderedDict, name: str, weight_drift: dict) -> None:
+    """Appends the drift of a single weight to a drift dictionary
+
+    Parameters
+    ----------
+        drift_properties : collections.OrderedDict
+            Drift dictionary, see `new_drift`
+        name             : str
+            Name of the weight
+        weight_drift     : dict
+            Drift of the weight, see `drift`
+    """
+    drift_properties['names'].append(name)
+    for key, value in weight_drift.items():
+        drift_properties[key].append(value)
@@ -0,0 +1,154 @@
+import numpy as np
+from typing import NamedTuple
+
+
+class Histogram(NamedTuple):
+    """Binned distribution of a weight, it is computed once by the Analyser and consumed by the
+    Plotter and optionally persisted, so a weight never has to be binned twice
+
+    Attributes
+    ----------
+        counts : np.ndarray
+            Bin frequencies
+        edges  : np.ndarray
+            Bin edges, one more than `counts`
+    """
+    counts : np.ndarray
+    edges  : np.ndarray
+
+
+    def centres(self) -> np.ndarray:
+        """Centres of all bins"""
+        return self.edges[:-1] + np.diff(self.edges) / 2
+
+
+    def modes(self) -> list[float]:
+        """Centres of all bins which share the highest frequency"""
+        return [float(mode) for mode in self.centres()[self.counts == np.max(self.counts)]]
+
+
+    def to_document(self) -> dict:
+        """Compact representation of the histogram for the database"""
+        return {'counts': self.counts.tolist(), 'edges': self.edges.tolist()}
+
+
+    @staticmethod
+    def from_document(document: dict) -> 'Histogram':
+        """Restores a histogram out of its database representation
+
+        Parameters
+        ----------
+            document : dict
+                Representation as returned by `to_document`
+        """
+        return Histogram(np.asarray(document['counts'], dtype = np.int64), np.asarray(document['edges'], dtype = np.float64))
+
+
+class FixedHistogram(NamedTuple):
+    """Histogram over predefined, uniform edges, e.g. shared by all weights of a dtype or of a layer
+    type. Values below the first or above the last edge are counted separately, thus two histograms
+    over the same edges can be merged in O(bins) without losing a single value
+
+    Attributes
+    ----------
+        counts    : np.ndarray
+            Bin frequencies
+        edges     : np.ndarray
+            Bin edges, one more than `counts`
+        underflow : int
+            Number of values below the first edge
+        overflow  : int
+            Number of values above the last edge, NaNs included
+    """
+    counts    : np.ndarray
+    edges     : np.ndarray
+    underflow : int
+    overflow  : int
+
+
+    @property
+    def total(self) -> int:
+        """Number of binned values"""
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+
+    def merge(self, other: 'FixedHistogram') -> 'FixedHistogram':
+        """Adds the counts of another histogram over the same edges
+
+        Parameters
+        ----------
+            other : FixedHistogram
+                Histogram over the same edges
+
+        Raises
+        ------
+            ValueError
+                Is triggered when the edges differ
+        """
+        if self.edges.shape != other.edges.shape or not np.array_equal(self.edges, other.edges):
+            raise ValueError('Only histograms over the same edges can be merged!')
+        return FixedHistogram(self.counts + other.counts, self.edges, self.underflow + other.underflow, self.overflow + other.overflow)
+
+
+    def to_histogram(self) -> Histogram:
+        """Histogram of the values within the edges, e.g. for the Plotter"""
+        return Histogram(self.counts, self.edges)
+
+
+    def to_document(self) -> dict:
+        """Compact representation of the histogram for the database"""
+        return {'counts': self.counts.tolist(), 'edges': self.edges.tolist(), 'underflow': self.underflow, 'overflow': self.overflow}
+
+
+    @staticmethod
+    def from_document(document: dict) -> 'FixedHistogram':
+        """Restores a histogram out of its database representation
+
+        Parameters
+        ----------
+            document : dict
+                Representation as returned by `to_document`
+        """
+        return FixedHistogram(np.asarray(document['counts'], dtype = np.int64), np.asarray(document['edges'], dtype = np.float64),
+                              int(document['underflow']), int(document['overflow']))
+
+
+def bin_fixed(weight: np.ndarray, low: float, high: float, bins: int, chunk_size: int = 1 << 20) -> FixedHistogram:
+    """Bins a flat weight over `bins` uniform bins between `low` and `high` in a single pass, chunk
+    by chunk. Like `np.histogram` the last bin includes `high`
+
+    Parameters
+    ----------
+        weight     : np.ndarray
+            Flat array
+        low        : float
+            First edge
+        high       : float
+            Last edge, larger than `low`
+        bins       : int
+            Number of bins
+        chunk_size : int
+            Number of elements which are binned at once, bounds the temporary memory
+    """
+    edges  = np.linspace(low, high, bins + 1)
+    counts = np.zeros(bins + 2, dtype = np.int64)
+    scale  = bins / (high - low)
+    for start in range(0, weight.size, chunk_size):
+        chunk     = weight[start:start + chunk_size].astype(np.float64)
+        positions = np.floor((chunk - low) * scale)
+        np.nan_to_num(positions, copy = False, nan = bins)
+        np.clip(positions, -1, bins, out = positions)
+        positions[chunk == high] = bins - 1
+        positions[chunk > high]  = bins
+        indices = positions.astype(np.int64)
+
+        # rounding of the scaled values can shift them by one bin, the edges decide, as in np.histogram
+        inside  = np.flatnonzero((indices >= 0) & (indices < bins))
+        values  = chunk[inside]
+        shifted = indices[inside]
+        shifted[values < edges[shifted]] -= 1
+        shifted[(values >= edges[shifted + 1]) & (shifted != bins - 1)] += 1
+        indices[inside] = shifted
+
+        counts += np.bincount(indices + 1, minlength = bins + 2)
+    return FixedHistogram(counts[1:-1], edges, int(counts[0]), int(counts[-1]))
@@ -0,0 +1,414 @@
+import numpy as np
+from typing import Callable, Iterator, Optional, Sequence
+
+
+import tfwda.analyse.histogram
+
+
+NORMAL_SCALE = 0.6744897501960817
+QUANTILES    = (0.25, 0.5, 0.75)
+# number of elements read at once by the chunked kernels, larger weights are described chunk by chunk
+# and the extra memory stays at a few chunks of float64 regardless of the size of the weight
+CHUNK_SIZE   = 1 << 20
+# number of bins every pass of `select` splits the candidates of a rank into
+SELECT_BINS  = 4096
+# number of refinements after which `select` gathers the candidates of a rank regardless of their number
+MAX_DEPTH    = 16
+
+
+def _lerp(a: float, b: float, t: float) -> float:
+    """Linear interpolation between `a` and `b`, evaluated the same way as numpy's
+    linear quantile method so that results agree with `np.quantile`
+
+    Parameters
+    ----------
+        a : float
+            Lower neighbour
+        b : float
+            Upper neighbour
+        t : float
+            Fraction between the two neighbours, in [0, 1]
+    """
+    difference = b - a
+    if t >= 0.5:
+        return b - difference * (1 - t)
+    return a + difference * t
+
+
+def _quantile_positions(size: int, quantiles: tuple) -> list:
+    """Returns the lower index, upper index and fraction of every requested quantile,
+    `size` has to be strictly positive
+    """
+    positions = []
+    for q in quantiles:
+        virtual_index = (size - 1) * q
+        lower_index   = int(np.floor(virtual_index))
+        upper_index   = min(lower_index + 1, size - 1)
+        positions.append((lower_index, upper_index, virtual_index - lower_index))
+    return positions
+
+
+def order_statistics(weight: np.ndarray, quantiles: tuple = QUANTILES) -> tuple[float, float, list[float]]:
+    """Computes minimum, maximum and the requested quantiles out of a single partition
+    of the (flat) weight
+
+    Parameters
+    ----------
+        weight    : np.ndarray
+            Flat, non-empty array
+        quantiles : tuple
+            Quantiles which should be computed, linear interpolation is used
+
+    Returns
+    -------
+        float, float, list[float]
+            Minimum, maximum and the quantiles in the order they were requested
+    """
+    size      = weight.size
+    positions = _quantile_positions(size, quantiles)
+    kth       = {0, size - 1}
+    for lower_index, upper_index, _ in positions:
+        kth.update((lower_index, upper_index))
+    partitioned = np.partition(weight, sorted(kth))
+
+    values = [_lerp(float(partitioned[lower_index]), float(partitioned[upper_index]), fraction)
+              for lower_index, upper_index, fraction in positions]
+    return float(partitioned[0]), float(partitioned[-1]), values
+
+
+def median(weight: np.ndarray) -> float:
+    """Median of a flat, non-empty array out of a single partition"""
+    (lower_index, upper_index, fraction), = _quantile_positions(weight.size, (0.5,))
+    partitioned = np.partition(weight, sorted({lower_index, upper_index}))
+    return _lerp(float(partitioned[lower_index]), float(partitioned[upper_index]), fraction)
+
+
+def moments(weight: np.ndarray, chunk_size: int = CHUNK_SIZE) -> tuple[float, float, float, float]:
+    """Computes mean, (biased) variance, skewness and (Fisher) kurtosis, all central moments
+    share one array of deviations which is accumulated in float64. Weights with more than
+    `chunk_size` elements are read in their native dtype chunk by chunk, one pass sums up the
+    mean and a second pass the central moments, thus only the deviations of one chunk are held
+
+    Degenerated distributions, i.e. the variance vanishes relative to the mean, get a skewness
+    of 0 and a kurtosis of -3, as `scipy.stats.skew` and `scipy.stats.kurtosis` report them
+
+    Parameters
+    ----------
+        weight     : np.ndarray
+            Flat, non-empty array
+        chunk_size : int
+            Number of elements read at once
+
+    Returns
+    -------
+        float, float, float, float
+            Mean, variance, skewness and kurtosis
+    """
+    if weight.size > chunk_size:
+        return _chunked_moments(weight, chunk_size)
+    weight     = as_numeric(weight)
+    mean       = float(np.mean(weight, dtype = np.float64))
+    deviations = np.subtract(weight, mean, dtype = np.float64)
+    squared    = deviations * deviations
+    m2         = float(np.mean(squared))
+    m3         = float(np.mean(squared * deviations))
+    m4         = float(np.mean(squared * squared))
+    return (mean, m2) + standardized_moments(mean, m2, m3, m4, weight.dtype)
+
+
+def _chunked_moments(weight: np.ndarray, chunk_size: int) -> tuple[float, float, float, float]:
+    total = 0.0
+    for chunk in chunks(weight, chunk_size):
+        total += float(np.sum(chunk, dtype = np.float64))
+    mean = total / weight.size
+
+    m2, m3, m4 = 0.0, 0.0, 0.0
+    for chunk in chunks(weight, chunk_size):
+        deviations = np.subtract(chunk, mean, dtype = np.float64)
+        squared    = deviations * deviations
+        m2        += float(np.sum(squared))
+        m3        += float(np.sum(squared * deviations))
+        m4        += float(np.sum(squared * squared))
+    m2, m3, m4 = m2 / weight.size, m3 / weight.size, m4 / weight.size
+    return (mean, m2) + standardized_moments(mean, m2, m3, m4, as_numeric(weight[:1]).dtype)
+
+
+def standardized_moments(mean: float, m2: float, m3: float, m4: float, dtype: np.dtype) -> tuple[float, float]:
+    """Turns central moments into skewness and Fisher kurtosis
+
+    Parameters
+    ----------
+        mean : float
+            Mean of the distribution
+        m2, m3, m4 : float
+            Second, third and fourth central moment
+        dtype : np.dtype
+            Native dtype of the data, it determines when the variance counts as zero
+    """
+    resolution = float(np.finfo(dtype if np.issubdtype(dtype, np.floating) else np.float64).resolution)
+    if m2 <= (resolution * mean) ** 2:
+        return 0.0, -3.0
+    return m3 / m2 ** 1.5, m4 / m2 ** 2 - 3.0
+
+
+def auto_bin_count(size: int, minimum: float, maximum: float, iqr: float, is_integer: bool = False) -> int:
+    """Number of bins numpy's 'auto' estimator picks, computed from already known order statistics
+    instead of another percentile pass. Like recent numpy releases the Freedman-Diaconis width is at
+    least half the width of the square root estimator, which caps the count at about 2 * sqrt(`size`)
+    bins for heavy-tailed data, and the smaller of this width and the Sturges width is taken
+
+    The rule deliberately differs from older numpy releases, e.g. the pinned 1.21, whose 'auto' lacks
+    the cap and asks for hundreds of millions of bins for heavy-tailed weights. Both agree unless the
+    Freedman-Diaconis width is below half the square root width
+
+    Parameters
+    ----------
+        size       : int
+            Number of elements
+        minimum    : float
+            Smallest element
+        maximum    : float
+            Largest element
+        iqr        : float
+            Interquartile range
+        is_integer : bool
+            Whether the data has an integer dtype, the width is at least 1 then
+    """
+    data_range = float(maximum) - float(minimum)
+    sturges_bw = data_range / (np.log2(size) + 1.0)
+    sqrt_bw    = data_range / np.sqrt(size)
+    fd_bw      = 2.0 * iqr * size ** (-1.0 / 3.0)
+    width      = min(max(fd_bw, sqrt_bw / 2), sturges_bw)
+    if not width:
+        return 1
+    if is_integer and width < 1:
+        width = 1
+    return int(np.ceil(data_range / width))
+
+
+def histogram_range(minimum: float, maximum: float) -> tuple[np.float64, np.float64]:
+    """Range of a histogram as float64 scalars, `np.histogram` computes its edges in the widest dtype
+    of range and data, thus the edges of e.g. float16 weights keep their precision
+
+    Parameters
+    ----------
+        minimum : float
+            Smallest element
+        maximum : float
+            Largest element
+    """
+    return np.float64(minimum), np.float64(maximum)
+
+
+def as_numeric(weight: np.ndarray) -> np.ndarray:
+    """Returns the weight itself if numpy supports its dtype natively, extension dtypes like
+    bfloat16 are widened to float32, which represents them exactly
+
+    Parameters
+    ----------
+        weight : np.ndarray
+            Flat array
+    """
+    if weight.dtype.kind in 'biuf':
+        return weight
+    return weight.astype(np.float32)
+
+
+def chunks(weight: np.ndarray, chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Consecutive chunks of a flat weight, every chunk on its own is widened by `as_numeric`, thus
+    extension dtypes like bfloat16 are never widened as a whole
+
+    Parameters
+    ----------
+        weight     : np.ndarray
+            Flat array, e.g. a memory map
+        chunk_size : int
+            Number of elements per chunk
+    """
+    for start in range(0, weight.size, chunk_size):
+        yield as_numeric(weight[start:start + chunk_size])
+
+
+def _bin(values: np.ndarray, low: float, scale: float, bins: int) -> np.ndarray:
+    """Bin of every value for bins of width 1 / `scale` starting at `low`, the bin is monotone in
+    the value and clipped to the bins, thus the bins split the values into ordered groups"""
+    return np.clip(((values - low) * scale).astype(np.int64), 0, bins - 1)
+
+
+def _candidates(values: np.ndarray, levels: tuple) -> np.ndarray:
+    """Values which fall into the chosen bin of every refinement level"""
+    for low, scale, chosen in levels:
+        values = values[_bin(values, low, scale, SELECT_BINS) == chosen]
+    return values
+
+
+def select(weight: np.ndarray, ranks: Sequence[int], low: float, high: float, transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+           chunk_size: int = CHUNK_SIZE) -> list[float]:
+    """Exact order statistics of a flat weight with a constant amount of extra memory, i.e. the values
+    at the given ranks of the sorted weight as a partition would find them. Every pass over the chunks
+    splits the candidates of each rank into `SELECT_BINS` bins between their bounds and keeps the bin
+    which holds the rank, once at most `chunk_size` candidates are left they are gathered and partitioned.
+    Weights whose values spread over their range need two passes, bins of identical values are
+    resolved as soon as they are found
+
+    Parameters
+    ----------
+        weight     : np.ndarray
+            Flat, non-empty array
+        ranks      : Sequence[int]
+            Positions within the sorted weight, from 0 to `weight.size` - 1
+        low        : float
+            Lower bound of all values, e.g. the minimum
+        high       : float
+            Upper bound of all values, e.g. the maximum
+        transform  : Callable[[np.ndarray], np.ndarray]
+            Applied to every chunk before the selection, e.g. the absolute deviations from the median,
+            by default the chunks are compared as float64
+        chunk_size : int
+            Number of elements read at once
+
+    Returns
+    -------
+        list[float]
+            Value at every rank in the order of `ranks`
+    """
+    transform = transform if transform is not None else (lambda chunk: chunk.astype(np.float64))
+    if not high > low:
+        return [float(low)] * len(ranks)
+
+    # every unresolved rank keeps its refinement levels, the number of values below its candidates and
+    # the number of its candidates
+    states = {rank: [(), 0, weight.size] for rank in set(ranks)}
+    values = {}
+    while states:
+        groups = {}
+        for rank, (levels, _, count) in states.items():
+            groups.setdefault(levels, (count, []))[1].append(rank)
+        counts   = {levels: np.zeros(SELECT_BINS, dtype = np.int64) for levels, (count, _) in groups.items()
+                    if count > chunk_size and len(levels) < MAX_DEPTH}
+        gathered = {levels: [] for levels in groups.keys() if levels not in counts}
+        extrema  = {levels: [np.inf, -np.inf] for levels in counts.keys()}
+        scales   = {levels: _next_level(levels, low, high) for levels in counts.keys()}
+
+        for chunk in chunks(weight, chunk_size):
+            chunk_values = transform(chunk)
+            for levels in counts.keys():
+                candidates = _candidates(chunk_values, levels)
+                if candidates.size:
+                    counts[levels]  += np.bincount(_bin(candidates, *scales[levels], SELECT_BINS), minlength = SELECT_BINS)
+                    extrema[levels][0] = min(extrema[levels][0], float(np.min(candidates)))
+                    extrema[levels][1] = max(extrema[levels][1], float(np.max(candidates)))
+            for levels in gathered.keys():
+                gathered[levels].append(_candidates(chunk_values, levels))
+
+        for levels, candidates in gathered.items():
+            candidates = np.concatenate(candidates)
+            for rank in groups[levels][1]:
+                below        = states.pop(rank)[1]
+                values[rank] = float(np.partition(candidates, rank - below)[rank - below])
+        for levels, histogram in counts.items():
+            cumulative = np.cumsum(histogram)
+            for rank in groups[levels][1]:
+                if extrema[levels][0] == extrema[levels][1]:
+                    values[rank] = extrema[levels][0]
+                    del states[rank]
+                    continue
+                below  = states[rank][1]
+                chosen = int(np.searchsorted(cumulative, rank - below, side = "right"))
+                states[rank] = [levels + ((*scales[levels], chosen),), below + (int(cumulative[chosen - 1]) if chosen > 0 else 0), int(histogram[chosen])]
+    return [values[rank] for rank in ranks]
+
+
+def _next_level(levels: tuple, low: float, high: float) -> tuple[float, float]:
+    """Start and scale of the bins of the next refinement, the chosen bin of the last level split again"""
+    if not levels:
+        return low, SELECT_BINS / (high - low)
+    previous_low, previous_scale, chosen = levels[-1]
+    return previous_low + chosen / previous_scale, previous_scale * SELECT_BINS
+
+
+def describe(weight: np.ndarray, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Computes all statistics the Analyser extracts for a single flat weight, order statistics
+    come out of one partition, moments out of one pass over the deviations and the histogram
+    reuses the already computed range and IQR. Weights with more than `chunk_size` elements are
+    described chunk by chunk in their native dtype instead, see `describe_chunked`
+
+    Parameters
+    ----------
+        weight     : np.ndarray
+            Flat, non-empty array
+        chunk_size : int
+            Number of elements beyond which the weight is described chunk by chunk
+
+    Returns
+    -------
+        dict
+            Statistics keyed like `Analyser.process` names its properties, 'mode' holds a list
+            since a distribution can have several modes and 'histogram' the `analyse.histogram.Histogram`
+            the modes were taken from
+    """
+    if weight.size > chunk_size:
+        return describe_chunked(weight, chunk_size)
+    weight = as_numeric(weight)
+    minimum, maximum, (lower_quartile, median_value, upper_quartile) = order_statistics(weight)
+    mean, variance, skewness, kurtosis                              = moments(weight)
+    iqr = upper_quartile - lower_quartile
+
+    bin_count     = auto_bin_count(weight.size, minimum, maximum, iqr, np.issubdtype(weight.dtype, np.integer))
+    histogram     = tfwda.analyse.histogram.Histogram(*np.histogram(weight, bins = bin_count, range = histogram_range(minimum, maximum)))
+
+    absolute_deviations = np.abs(np.subtract(weight, median_value, dtype = np.float64))
+    mad                 = median(absolute_deviations) / NORMAL_SCALE
+
+    return {'min': minimum, 'max': maximum, 'mean': mean, '25-quantile': lower_quartile, 'median': median_value,
+            '75-quantile': upper_quartile, 'IQR': iqr, 'mode': histogram.modes(), 'variance': variance,
+            'skewness': skewness, 'kurtosis': kurtosis, 'MAD': mad, 'histogram': histogram}
+
+
+def describe_chunked(weight: np.ndarray, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Variant of `describe` whose extra memory does not grow with the weight. The weight is only
+    read in chunks of its native dtype, e.g. of float16, bfloat16 or int8, and never copied or
+    widened as a whole: moments are accumulated in float64, quartiles, median and MAD are selected
+    exactly by `select` and the histogram is summed up over the chunks. The results agree with
+    `describe`, the order statistics and the histogram exactly and the moments up to rounding
+
+    Parameters
+    ----------
+        weight     : np.ndarray
+            Flat, non-empty array, e.g. a memory map
+        chunk_size : int
+            Number of elements read at once
+
+    Returns
+    -------
+        dict
+            Statistics like `describe`
+    """
+    minimum, maximum = np.inf, -np.inf
+    for chunk in chunks(weight, chunk_size):
+        minimum, maximum = min(minimum, float(np.min(chunk))), max(maximum, float(np.max(chunk)))
+    dtype = as_numeric(weight[:1]).dtype
+
+    positions = _quantile_positions(weight.size, QUANTILES)
+    ranks     = sorted({index for lower_index, upper_index, _ in positions for index in (lower_index, upper_index)})
+    selected  = dict(zip(ranks, select(weight, ranks, minimum, maximum, chunk_size = chunk_size)))
+    lower_quartile, median_value, upper_quartile = [_lerp(selected[lower_index], selected[upper_index], fraction)
+                                                    for lower_index, upper_index, fraction in positions]
+    mean, variance, skewness, kurtosis           = moments(weight, chunk_size)
+    iqr = upper_quartile - lower_quartile
+
+    bin_count = auto_bin_count(weight.size, minimum, maximum, iqr, np.issubdtype(dtype, np.integer))
+    counts    = 0
+    for chunk in chunks(weight, chunk_size):
+        chunk_counts, edges = np.histogram(chunk, bins = bin_count, range = histogram_range(minimum, maximum))
+        counts             += chunk_counts
+    histogram = tfwda.analyse.histogram.Histogram(counts, edges)
+
+    (lower_index, upper_index, fraction), = _quantile_positions(weight.size, (0.5,))
+    deviations = select(weight, [lower_index, upper_index], 0.0, max(maximum - median_value, median_value - minimum),
+                        lambda chunk: np.abs(np.subtract(chunk, median_value, dtype = np.float64)), chunk_size)
+    mad        = _lerp(deviations[0], deviations[1], fraction) / NORMAL_SCALE
+
+    return {'min': minimum, 'max': maximum, 'mean': mean, '25-quantile': lower_quartile, 'median': median_value,
+            '75-quantile': upper_quartile, 'IQR': iqr, 'mode': histogram.modes(), 'variance': variance,
+            'skewness': skewness, 'kurtosis': kurtosis, 'MAD': mad, 'histogram': histogram}
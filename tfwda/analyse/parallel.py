@@ -0,0 +1,164 @@
+import numpy as np
+import concurrent.futures
+from multiprocessing import shared_memory
+from typing import Optional, Sequence
+
+
+import tfwda.analyse.aggregate
+import tfwda.analyse.standard
+import tfwda.logger.standard
+
+
+_ALIGNMENT = 64
+
+
+def _describe_shared(block_name: str, layout: list[tuple[int, int, np.dtype]], names: Optional[list[str]], shapes: Optional[list], options: dict) -> list[dict]:
+    """Worker entry point, attaches to the shared memory block and analyses the weights described
+    by `layout` through zero-copy views
+
+    Parameters
+    ----------
+        block_name        : str
+            Name of the shared memory block
+        layout            : list[tuple[int, int, np.dtype]]
+            Byte offset, number of elements and dtype of every weight of this task
+        names             : list[str]
+            Names of the weights of this task or None
+        shapes            : list
+            Original shapes of the weights of this task or None
+        options           : dict
+            Keyword arguments of the Analyser of the worker, e.g. `batched` and `segment_threshold`
+    """
+    block = shared_memory.SharedMemory(name = block_name)
+    try:
+        weights    = [np.ndarray(shape = (size,), dtype = dtype, buffer = block.buf, offset = offset) for offset, size, dtype in layout]
+        analyser   = tfwda.analyse.standard.Analyser(tfwda.logger.standard.Logger(False), **options)
+        statistics = analyser.describe(weights, names, shapes)
+        del weights
+    finally:
+        block.close()
+    return statistics
+
+
+class ParallelAnalyser(tfwda.analyse.standard.Analyser):
+    """Analyser which distributes the weights of a model over a pool of worker processes. The
+    weights are copied once into a shared memory block, the workers only get the name of the
+    block and the layout of their weights and read them as zero-copy views. The statistics
+    are reassembled in the order of the weights, thus the result does not depend on scheduling
+
+    Parameters
+    ----------
+        logger            : logger.standard.Logger
+            Logger instance
+        workers           : int
+            Number of worker processes, with a single worker the weights are analysed in process
+        batched           : bool
+            See `Analyser`, applies within every worker task
+        segment_threshold : int
+            See `Analyser`
+        tasks_per_worker  : int
+            Weights are split into about `workers * tasks_per_worker` tasks of similar size
+        approximate, approximate_threshold, epsilon, delta, edge_scheme, axes
+            See `Analyser`, apply within every worker task, the edge scheme has to be picklable
+
+    Methods
+    -------
+        describe(weights list[np.ndarray], names list[str], shapes list[Sequence]) list[dict]
+            Computes the statistics of every weight on the worker pool
+        close()
+            Shuts the worker pool down
+    """
+
+
+    def __init__(self, logger: tfwda.logger.standard.Logger, workers: int, batched: bool = False, segment_threshold: int = 4096, tasks_per_worker: int = 4,
+                 approximate: bool = False, approximate_threshold: int = 2 ** 24, epsilon: float = 0.005, delta: float = 0.001,
+                 edge_scheme: Optional[tfwda.analyse.aggregate.IFEdgeScheme] = None, axes: Optional[Sequence[int]] = None):
+        super().__init__(logger, batched = batched, segment_threshold = segment_threshold, approximate = approximate,
+                         approximate_threshold = approximate_threshold, epsilon = epsilon, delta = delta, edge_scheme = edge_scheme, axes = axes)
+        if workers < 1:
+            raise ValueError('The number of workers has to be at least 1!')
+        self.workers          = workers
+        self.tasks_per_worker = tasks_per_worker
+        self.__executor       = None
+
+
+    def describe(self, weights: list[np.ndarray], names: Optional[list[str]] = None, shapes: Optional[list[Sequence]] = None) -> list[dict]:
+        """Computes the statistics of every weight on the worker pool
+
+        Parameters
+        ----------
+            weights : list[np.ndarray]
+                Flat weights
+            names   : list[str]
+                Names of the weights, see `Analyser.describe`
+            shapes  : list[Sequence]
+                Original shapes of the weights, see `Analyser.describe`
+
+        Returns
+        -------
+            list[dict]
+                Statistics of every weight in the order of `weights`
+        """
+        if self.workers == 1 or len(weights) == 0:
+            return super().describe(weights, names, shapes)
+
+        offsets    = []
+        total_size = 0
+        for weight in weights:
+            offsets.append(total_size)
+            total_size += -(-weight.nbytes // _ALIGNMENT) * _ALIGNMENT
+        block = shared_memory.SharedMemory(create = True, size = max(total_size, 1))
+        try:
+            for weight, offset in zip(weights, offsets):
+                view    = np.ndarray(shape = (weight.size,), dtype = weight.dtype, buffer = block.buf, offset = offset)
+                view[:] = weight.reshape(-1)
+                del view
+
+            tasks = self.__split([(offset, weight.size, weight.dtype) for weight, offset in zip(weights, offsets)])
+            self.logger.log("%d weights are analysed in %d tasks by %d workers...", "Info", len(weights), len(tasks), self.workers)
+            executor = self.__get_executor()
+            options  = {'batched': self.batched, 'segment_threshold': self.segment_threshold, 'approximate': self.approximate,
+                        'approximate_threshold': self.approximate_threshold, 'epsilon': self.epsilon, 'delta': self.delta,
+                        'edge_scheme': self.edge_scheme, 'axes': self.axes}
+            futures  = []
+            start    = 0
+            for task in tasks:
+                futures.append(executor.submit(_describe_shared, block.name, task, names[start:start + len(task)] if names is not None else None,
+                                               shapes[start:start + len(task)] if shapes is not None else None, options))
+                start += len(task)
+            statistics = []
+            for future in futures:
+                statistics.extend(future.result())
+        finally:
+            block.close()
+            block.unlink()
+
+        return statistics
+
+
+    def close(self) -> None:
+        """Shuts the worker pool down, a later call of `describe` starts a new one"""
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+
+    def __get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self.__executor is None:
+            self.__executor = concurrent.futures.ProcessPoolExecutor(max_workers = self.workers)
+        return self.__executor
+
+
+    def __split(self, layout: list[tuple[int, int, np.dtype]]) -> list[list[tuple[int, int, np.dtype]]]:
+        """Splits the layout into consecutive tasks of about equal number of elements, consecutive
+        tasks keep the order of the weights"""
+        task_size = max(1, sum(size for _, size, _ in layout) // (self.workers * self.tasks_per_worker))
+        tasks     = [[]]
+        elements  = 0
+        for entry in layout:
+            if elements >= task_size:
+                tasks.append([])
+                elements = 0
+            tasks[-1].append(entry)
+            elements += entry[1]
+        return tasks
@@ -0,0 +1,152 @@
+import numpy as np
+
+
+import tfwda.analyse.histogram
+import tfwda.analyse.kernels
+
+
+def pack(weights: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """Packs flat weights into one contiguous float64 buffer
+
+    Parameters
+    ----------
+        weights : list[np.ndarray]
+            Flat, non-empty arrays
+
+    Returns
+    -------
+        np.ndarray, np.ndarray
+            The buffer and the offsets array, segment i spans buffer[offsets[i]:offsets[i + 1]]
+    """
+    sizes   = np.array([weight.size for weight in weights], dtype = np.intp)
+    offsets = np.zeros(len(weights) + 1, dtype = np.intp)
+    np.cumsum(sizes, out = offsets[1:])
+    buffer  = np.empty(offsets[-1], dtype = np.float64)
+    for weight, start, end in zip(weights, offsets[:-1], offsets[1:]):
+        buffer[start:end] = weight
+    return buffer, offsets
+
+
+def _segment_ids(sizes: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(sizes.size), sizes)
+
+
+def _segmented_sort(buffer: np.ndarray, segment_ids: np.ndarray) -> np.ndarray:
+    """Sorts every segment in place of the buffer, segments keep their position"""
+    return buffer[np.lexsort((buffer, segment_ids))]
+
+
+def _segmented_quantile(sorted_buffer: np.ndarray, starts: np.ndarray, sizes: np.ndarray, q: float) -> np.ndarray:
+    """Linear quantile of every segment of an already segment-wise sorted buffer"""
+    virtual_index = (sizes - 1) * q
+    lower_index   = np.floor(virtual_index).astype(np.intp)
+    upper_index   = np.minimum(lower_index + 1, sizes - 1)
+    fraction      = virtual_index - lower_index
+    lower         = sorted_buffer[starts + lower_index]
+    upper         = sorted_buffer[starts + upper_index]
+    difference    = upper - lower
+    return np.where(fraction >= 0.5, upper - difference * (1 - fraction), lower + difference * fraction)
+
+
+def _segmented_histograms(buffer: np.ndarray, segment_ids: np.ndarray, sizes: np.ndarray, minima: np.ndarray, maxima: np.ndarray,
+                          iqrs: np.ndarray, is_integer: np.ndarray) -> tuple[list[tfwda.analyse.histogram.Histogram], list[list[float]]]:
+    """Bins every segment with numpy's 'auto' bin count in one bincount over all segments and
+    returns the histograms and modes of every segment"""
+    data_range = maxima - minima
+    sturges_bw = data_range / (np.log2(sizes) + 1.0)
+    sqrt_bw    = data_range / np.sqrt(sizes)
+    fd_bw      = 2.0 * iqrs * sizes ** (-1.0 / 3.0)
+    width      = np.minimum(np.maximum(fd_bw, sqrt_bw / 2), sturges_bw)
+    width      = np.where(is_integer & (width > 0) & (width < 1), 1.0, width)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        bin_counts = np.where(width > 0, np.ceil(data_range / width), 1).astype(np.intp)
+
+    first_edges = np.where(data_range == 0, minima - 0.5, minima)
+    last_edges  = np.where(data_range == 0, maxima + 0.5, maxima)
+    edge_ids    = _segment_ids(bin_counts + 1)
+    edge_starts = np.zeros(sizes.size, dtype = np.intp)
+    np.cumsum(bin_counts[:-1] + 1, out = edge_starts[1:])
+    steps       = (last_edges - first_edges) / bin_counts
+    local_edges = np.arange(edge_ids.size) - edge_starts[edge_ids]
+    edges       = first_edges[edge_ids] + local_edges * steps[edge_ids]
+    edges[edge_starts + bin_counts] = last_edges
+
+    # uniform binning as np.histogram performs it, including its correction of rounding errors at the edges
+    segment_bins = bin_counts[segment_ids]
+    edge_offsets = edge_starts[segment_ids]
+    indices      = ((buffer - first_edges[segment_ids]) * (bin_counts / (last_edges - first_edges))[segment_ids]).astype(np.intp)
+    indices[indices == segment_bins] -= 1
+    indices[buffer < edges[edge_offsets + indices]] -= 1
+    indices[(buffer >= edges[edge_offsets + indices + 1]) & (indices != segment_bins - 1)] += 1
+
+    bin_starts  = edge_starts - np.arange(sizes.size)
+    counts      = np.bincount(bin_starts[segment_ids] + indices, minlength = int(bin_counts.sum()))
+    highest     = np.maximum.reduceat(counts, bin_starts)
+    bin_ids     = _segment_ids(bin_counts)
+    left_edges  = edge_starts[bin_ids] + np.arange(bin_ids.size) - bin_starts[bin_ids]
+    centres     = edges[left_edges] + (edges[left_edges + 1] - edges[left_edges]) / 2
+    is_mode     = counts == highest[bin_ids]
+
+    modes = [[] for _ in range(sizes.size)]
+    for segment, centre in zip(bin_ids[is_mode], centres[is_mode]):
+        modes[segment].append(float(centre))
+    histograms = [tfwda.analyse.histogram.Histogram(counts[bin_start:bin_start + bin_count], edges[edge_start:edge_start + bin_count + 1])
+                  for bin_start, edge_start, bin_count in zip(bin_starts, edge_starts, bin_counts)]
+    return histograms, modes
+
+
+def describe_segments(buffer: np.ndarray, offsets: np.ndarray, dtypes: list[np.dtype]) -> list[dict]:
+    """Computes all statistics of `tfwda.analyse.kernels.describe` for every segment of a packed
+    buffer at once, reductions run per segment and both sorts (values and absolute deviations)
+    are single segmented sorts over the whole buffer
+
+    Parameters
+    ----------
+        buffer  : np.ndarray
+            Packed float64 buffer, see `pack`
+        offsets : np.ndarray
+            Segment offsets, see `pack`
+        dtypes  : list[np.dtype]
+            Native dtype of every segment
+
+    Returns
+    -------
+        list[dict]
+            Statistics of every segment, in the same layout as `tfwda.analyse.kernels.describe`
+    """
+    starts      = offsets[:-1]
+    sizes       = np.diff(offsets)
+    segment_ids = _segment_ids(sizes)
+
+    sorted_buffer  = _segmented_sort(buffer, segment_ids)
+    minima         = sorted_buffer[starts]
+    maxima         = sorted_buffer[offsets[1:] - 1]
+    lower_quartile = _segmented_quantile(sorted_buffer, starts, sizes, 0.25)
+    medians        = _segmented_quantile(sorted_buffer, starts, sizes, 0.5)
+    upper_quartile = _segmented_quantile(sorted_buffer, starts, sizes, 0.75)
+    iqrs           = upper_quartile - lower_quartile
+    del sorted_buffer
+
+    means      = np.add.reduceat(buffer, starts) / sizes
+    deviations = buffer - means[segment_ids]
+    squared    = deviations * deviations
+    m2         = np.add.reduceat(squared, starts) / sizes
+    m3         = np.add.reduceat(squared * deviations, starts) / sizes
+    m4         = np.add.reduceat(squared * squared, starts) / sizes
+    del deviations, squared
+
+    absolute_deviations = np.abs(buffer - medians[segment_ids])
+    mads = _segmented_quantile(_segmented_sort(absolute_deviations, segment_ids), starts, sizes, 0.5) / tfwda.analyse.kernels.NORMAL_SCALE
+    del absolute_deviations
+
+    is_integer        = np.array([np.issubdtype(dtype, np.integer) for dtype in dtypes], dtype = bool)
+    histograms, modes = _segmented_histograms(buffer, segment_ids, sizes, minima, maxima, iqrs, is_integer)
+
+    statistics = []
+    for i, dtype in enumerate(dtypes):
+        skewness, kurtosis = tfwda.analyse.kernels.standardized_moments(means[i], m2[i], m3[i], m4[i], dtype if dtype.kind in 'biuf' else np.dtype(np.float32))
+        statistics.append({'min': float(minima[i]), 'max': float(maxima[i]), 'mean': float(means[i]), '25-quantile': float(lower_quartile[i]),
+                           'median': float(medians[i]), '75-quantile': float(upper_quartile[i]), 'IQR': float(iqrs[i]), 'mode': modes[i],
+                           'variance': float(m2[i]), 'skewness': float(skewness), 'kurtosis': float(kurtosis), 'MAD': float(mads[i]),
+                           'histogram': histograms[i]})
+    return statistics
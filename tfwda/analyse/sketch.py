@@ -0,0 +1,94 @@
+import numpy as np
+
+
+import tfwda.analyse.histogram
+import tfwda.analyse.kernels
+
+
+def sample_size(epsilon: float, delta: float) -> int:
+    """Number of samples for which the empirical distribution function deviates by at most `epsilon`
+    from the true one with probability `1 - delta`, after the Dvoretzky-Kiefer-Wolfowitz inequality
+
+    Parameters
+    ----------
+        epsilon : float
+            Maximal rank error, e.g. 0.005 means a reported quantile q lies between the true quantiles
+            q - 0.005 and q + 0.005
+        delta   : float
+            Probability that the bound does not hold
+    """
+    return int(np.ceil(np.log(2.0 / delta) / (2.0 * epsilon ** 2)))
+
+
+def stratified_sample(weight: np.ndarray, size: int, seed: int = 0) -> np.ndarray:
+    """Draws one element out of each of `size` equally large, consecutive strata. Compared to simple
+    random sampling no region of the tensor is left out, e.g. single output channels, and the
+    variance of the empirical distribution function does not increase
+
+    Parameters
+    ----------
+        weight : np.ndarray
+            Flat array
+        size   : int
+            Number of samples, at most the size of the weight
+        seed   : int
+            Seed of the random generator, thus the sample of a weight is reproducible
+    """
+    generator  = np.random.default_rng(seed = seed)
+    boundaries = np.linspace(0, weight.size, size + 1).astype(np.int64)
+    indices    = boundaries[:-1] + (generator.random(size) * np.diff(boundaries)).astype(np.int64)
+    return weight[indices]
+
+
+def describe(weight: np.ndarray, epsilon: float = 0.005, delta: float = 0.001, seed: int = 0,
+             chunk_size: int = tfwda.analyse.kernels.CHUNK_SIZE) -> dict:
+    """Approximate variant of `analyse.kernels.describe` for very large weights. Quartiles, median,
+    IQR and MAD come out of a stratified sample whose size is chosen for the rank error `epsilon`,
+    thus no sort or partition of the full weight is needed. Minimum, maximum, moments and the
+    histogram are still exact, they are read chunk by chunk in the native dtype like
+    `analyse.kernels.describe_chunked` does, only the sample is widened as a whole
+
+    Parameters
+    ----------
+        weight     : np.ndarray
+            Flat, non-empty array
+        epsilon    : float
+            Rank error of the quantiles, see `sample_size`
+        delta      : float
+            Probability that the rank error exceeds `epsilon`
+        seed       : int
+            Seed of the sample
+        chunk_size : int
+            Number of elements read at once
+
+    Returns
+    -------
+        dict
+            Statistics like `analyse.kernels.describe` plus 'quantile_error' and 'quantile_confidence',
+            i.e. `epsilon` and `1 - delta`. Weights which are not larger than the sample are described
+            exactly, their error is 0
+    """
+    size = sample_size(epsilon, delta)
+    if weight.size <= size:
+        return dict(tfwda.analyse.kernels.describe(weight), quantile_error = 0.0, quantile_confidence = 1.0)
+
+    sample           = tfwda.analyse.kernels.as_numeric(stratified_sample(weight, size, seed))
+    minimum, maximum = np.inf, -np.inf
+    for chunk in tfwda.analyse.kernels.chunks(weight, chunk_size):
+        minimum, maximum = min(minimum, float(np.min(chunk))), max(maximum, float(np.max(chunk)))
+    _, _, (lower_quartile, median_value, upper_quartile) = tfwda.analyse.kernels.order_statistics(sample)
+    mean, variance, skewness, kurtosis                   = tfwda.analyse.kernels.moments(weight, chunk_size)
+    iqr = upper_quartile - lower_quartile
+
+    bin_count = tfwda.analyse.kernels.auto_bin_count(weight.size, minimum, maximum, iqr, np.issubdtype(sample.dtype, np.integer))
+    counts    = 0
+    for chunk in tfwda.analyse.kernels.chunks(weight, chunk_size):
+        chunk_counts, edges = np.histogram(chunk, bins = bin_count, range = tfwda.analyse.kernels.histogram_range(minimum, maximum))
+        counts             += chunk_counts
+    histogram = tfwda.analyse.histogram.Histogram(counts, edges)
+    mad       = tfwda.analyse.kernels.median(np.abs(np.subtract(sample, median_value, dtype = np.float64))) / tfwda.analyse.kernels.NORMAL_SCALE
+
+    return {'min': minimum, 'max': maximum, 'mean': mean, '25-quantile': lower_quartile, 'median': median_value,
+            '75-quantile': upper_quartile, 'IQR': iqr, 'mode': histogram.modes(), 'variance': variance,
+            'skewness': skewness, 'kurtosis': kurtosis, 'MAD': mad, 'histogram': histogram,
+            'quantile_error': epsilon, 'quantile_confidence': 1.0 - delta}
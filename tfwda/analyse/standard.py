@@ -1,8 +1,16 @@
 import numpy as np
 import abc
 import collections
-import scipy.stats
 from abc import abstractmethod
+from typing import Optional, Sequence
+
+
+import tfwda.analyse.aggregate
+import tfwda.analyse.axes
+import tfwda.analyse.kernels
+import tfwda.analyse.segmented
+import tfwda.analyse.sketch
+import tfwda.logger.standard
 
 
 class IFAnalyser(metaclass = abc.ABCMeta):
@@ -34,50 +42,180 @@ class Analyser(IFAnalyser):
     """Extracts weights and metadata and computes statistics and
     metrics out of the data and store them in a property dictionary
 
+    Parameters
+    ----------
+        logger            : logger.standard.Logger
+            Logger instance
+        batched           : bool
+            Whether small weights should be analysed together in one segmented batch instead
+            of one after another
+        segment_threshold : int
+            Weights with at most this many elements are put into the segmented batch, larger
+            weights are always analysed on their own
+        approximate       : bool
+            Whether weights with more than `approximate_threshold` elements are described
+            approximately, see `analyse.sketch.describe`, the rank error of their quantiles is
+            recorded in the properties 'quantile_errors' and 'quantile_confidences'
+        approximate_threshold : int
+            Weights with more elements than this are described approximately
+        epsilon           : float
+            Rank error of the approximate quantiles
+        delta             : float
+            Probability that the rank error of the approximate quantiles exceeds `epsilon`
+        edge_scheme       : analyse.aggregate.IFEdgeScheme
+            If given, every weight is binned over the fixed edges of the scheme as well, these
+            histograms are recorded in the property 'fixed_histograms' and can be merged into
+            aggregates of layer types, blocks and models, see `analyse.aggregate`
+        axes              : Sequence[int]
+            If given, weights of at least rank 2 are described per slice along each of these axes of
+            their original shape as well, e.g. (-1, -2) for output filters and input channels of Keras
+            kernels, see `analyse.axes`, recorded in the property 'axis_statistics'
+
     Methods
     -------
         process(data : dict[str, np.ndarray]) dict[str, list]
             `data` contains weights of the neural network model and metadata, process computes
-            a series of metrics, e.g. median, MAD,...
+            a series of metrics, e.g. median, MAD,... All metrics of a weight are computed by the fused
+            kernels in `analyse.kernels`, i.e. out of one partition and one moment pass
+        describe(weights list[np.ndarray], names list[str], shapes list[Sequence]) list[dict]
+            Computes the statistics of every weight, in batched mode small weights are packed and
+            processed by `analyse.segmented`
+        fingerprint(size int) str
+            Method and accuracy a weight of this size is described with
+        new_properties() collections.OrderedDict `staticmethod`
+            Empty property dictionary
+        append(extracted_properties collections.OrderedDict, name str, shape Sequence, dtype str, statistics dict) `staticmethod`
+            Appends the statistics of a single weight to a property dictionary
     """
 
 
-    def __init__(self):
-        pass
+    def __init__(self, logger: tfwda.logger.standard.Logger, batched: bool = False, segment_threshold: int = 4096, approximate: bool = False,
+                 approximate_threshold: int = 2 ** 24, epsilon: float = 0.005, delta: float = 0.001,
+                 edge_scheme: Optional[tfwda.analyse.aggregate.IFEdgeScheme] = None, axes: Optional[Sequence[int]] = None):
+        self.logger                = logger
+        self.batched               = batched
+        self.segment_threshold     = segment_threshold
+        self.approximate           = approximate
+        self.approximate_threshold = approximate_threshold
+        self.epsilon               = epsilon
+        self.delta                 = delta
+        self.edge_scheme           = edge_scheme
+        self.axes                  = tuple(axes) if axes is not None else None
+
+
+    def describe(self, weights: list[np.ndarray], names: Optional[list[str]] = None, shapes: Optional[list[Sequence]] = None) -> list[dict]:
+        """Computes the statistics of every weight
+
+        Parameters
+        ----------
+            weights : list[np.ndarray]
+                Flat weights
+            names   : list[str]
+                Names of the weights, the edge scheme needs them to pick the edges of the fixed-edge
+                histograms, without names no fixed-edge histograms are computed
+            shapes  : list[Sequence]
+                Original shapes of the weights, without shapes no per-axis statistics are computed and
+                the edge scheme picks the edges by name alone
+
+        Returns
+        -------
+            list[dict]
+                Statistics of every weight in the order of `weights`, see `analyse.kernels.describe`,
+                plus 'fixed_histogram' if an edge scheme is set and 'axes' if axes are set
+        """
+        statistics = [None] * len(weights)
+        small      = []
+        for index, weight in enumerate(weights):
+            if self.batched and weight.size <= self.segment_threshold:
+                small.append(index)
+            elif self.approximate and weight.size > self.approximate_threshold:
+                statistics[index] = tfwda.analyse.sketch.describe(weight, self.epsilon, self.delta)
+            else:
+                statistics[index] = tfwda.analyse.kernels.describe(weight)
+        if small:
+            self.logger.log("%d small weights are analysed in one segmented batch...", "Info", len(small))
+            buffer, offsets = tfwda.analyse.segmented.pack([weights[index] for index in small])
+            batch           = tfwda.analyse.segmented.describe_segments(buffer, offsets, [weights[index].dtype for index in small])
+            for index, segment_statistics in zip(small, batch):
+                statistics[index] = segment_statistics
+        if self.edge_scheme is not None and names is not None:
+            for weight, name, shape, weight_statistics in zip(weights, names, shapes or [None] * len(weights), statistics):
+                weight_statistics['fixed_histogram'] = self.edge_scheme.histogram(weight, name, weight.dtype.name, shape)
+        if self.axes is not None and shapes is not None:
+            for weight, shape, weight_statistics in zip(weights, shapes, statistics):
+                weight_statistics['axes'] = tfwda.analyse.axes.describe_axes(weight, shape, self.axes)
+
+        return statistics
+
+
+    def fingerprint(self, size: int) -> str:
+        """Method and accuracy `describe` applies to a weight of `size` elements, weights with equal
+        fingerprints get the same statistics. It is part of the key of cached results, thus results of
+        an approximate run are never served to an exact one. Edge scheme and axes are not part of it,
+        cached statistics are completed for them
+
+        Parameters
+        ----------
+            size : int
+                Number of elements of the weight
+        """
+        if self.batched and size <= self.segment_threshold:
+            return "segmented"
+        if self.approximate and size > self.approximate_threshold:
+            return f"sketch|{self.epsilon}|{self.delta}"
+        return "exact"
 
 
     def process(self, data: dict[str, np.ndarray]) -> dict[str, list]:
         weights  = data["weights"]
         metadata = data["metadata"]
 
-        extracted_properties = collections.OrderedDict({'names': None, 'shapes': None, 'dtypes': None, 'min': [], 'max': [], 'mean': [], '25-quantile': [], 'median': [],
-                                                        '75-quantile': [], 'IQR': [], 'mode': [], 'variance': [], 'skewness': [], 'kurtosis': [], 'MAD': []})
-        for weight in weights:
-            extracted_properties['min'].append(float(np.min(weight)))
-            extracted_properties['max'].append(float(np.max(weight)))
-            extracted_properties['mean'].append(float(np.mean(weight)))
-            extracted_properties['25-quantile'].append(float(np.quantile(weight, q = 0.25)))
-            extracted_properties['median'].append(float(np.median(weight)))
-            extracted_properties['75-quantile'].append(float(np.quantile(weight, q = 0.75)))
-            extracted_properties['IQR'].append(float(np.quantile(weight, q = 0.75) - np.quantile(weight, q = 0.25)))
-
-            bin_frequencies, bins = np.histogram(weight, bins = 'auto')
-            max_indices           = np.where(bin_frequencies == np.max(bin_frequencies))
-            centralized_bins      = bins[:-1] + np.diff(bins) / 2
-            mode                  = centralized_bins[max_indices]
-            for mod in mode:
-                extracted_properties['mode'].append(float(mod))
-            extracted_properties['variance'].append(float(np.var(weight)))
-            extracted_properties['skewness'].append(float(scipy.stats.skew(weight)))
-            extracted_properties['kurtosis'].append(float(scipy.stats.kurtosis(weight)))
-            extracted_properties['MAD'].append(float(scipy.stats.median_abs_deviation(weight, scale = "normal")))
-        extracted_properties['names']  = metadata["names"]
-        extracted_properties['shapes'] = []
-        for tensor_shape in metadata["shapes"]:
-            extracted_properties['shapes'].append(tensor_shape.as_list())
-        extracted_properties['dtypes'] = []
-        for numpy_dtype in metadata["dtypes"]:
-            type_variable = np.dtype(numpy_dtype)
-            extracted_properties['dtypes'].append(type_variable.name)
-
-        return extracted_properties
\ No newline at end of file
+        extracted_properties = Analyser.new_properties()
+        for statistics, name, shape, dtype in zip(self.describe(weights, metadata["names"], metadata["shapes"]), metadata["names"], metadata["shapes"], metadata["dtypes"]):
+            Analyser.append(extracted_properties, name, shape, dtype, statistics)
+
+        return extracted_properties
+
+
+    @staticmethod
+    def new_properties() -> collections.OrderedDict:
+        """Empty property dictionary in the layout `process` returns"""
+        return collections.OrderedDict({'names': [], 'shapes': [], 'dtypes': [], 'min': [], 'max': [], 'mean': [], '25-quantile': [], 'median': [],
+                                        '75-quantile': [], 'IQR': [], 'mode': [], 'variance': [], 'skewness': [], 'kurtosis': [], 'MAD': [],
+                                        'histograms': [], 'quantile_errors': [], 'quantile_confidences': [],
+                                        'fixed_histograms': [], 'axis_statistics': []})
+
+
+    @staticmethod
+    def append(extracted_properties: collections.OrderedDict, name: str, shape: Sequence, dtype, statistics: dict) -> None:
+        """Appends the statistics of a single weight to a property dictionary, this allows to build the
+        properties of a model one weight after another
+
+        Parameters
+        ----------
+            extracted_properties : collections.OrderedDict
+                Property dictionary, see `new_properties`
+            name                 : str
+                Name of the weight
+            shape                : Sequence
+                Shape of the weight
+            dtype                : str | np.dtype
+                Dtype or dtype name of the weight
+            statistics           : dict
+                Statistics of the weight, see `describe`, exact statistics get a quantile error of 0,
+                weights without a fixed-edge histogram or per-axis statistics get None
+        """
+        extracted_properties['names'].append(name)
+        extracted_properties['shapes'].append(list(shape))
+        extracted_properties['dtypes'].append(dtype if isinstance(dtype, str) else np.dtype(dtype).name)
+        for key, value in statistics.items():
+            if key == 'mode':
+                extracted_properties['mode'].extend(value)
+            elif key == 'histogram':
+                extracted_properties['histograms'].append(value)
+            elif key not in ['quantile_error', 'quantile_confidence', 'fixed_histogram', 'axes']:
+                extracted_properties[key].append(value)
+        extracted_properties['quantile_errors'].append(statistics.get('quantile_error', 0.0))
+        extracted_properties['quantile_confidences'].append(statistics.get('quantile_confidence', 1.0))
+        extracted_properties['fixed_histograms'].append(statistics.get('fixed_histogram'))
+        extracted_properties['axis_statistics'].append(statistics.get('axes'))
@@ -0,0 +1,373 @@
+import os
+import json
+import time
+import hashlib
+import datetime
+import concurrent.futures
+from typing import Iterable, NamedTuple
+
+
+import tfwda.logger.standard
+
+
+# suffixes of the model files which are picked up in a directory, `.index` marks a tensorflow checkpoint prefix
+MODEL_SUFFIXES = (".h5", ".hdf5", ".keras", ".npz", ".index")
+# directory within the job directory which holds the tensor cache of every unfinished model
+TENSOR_DIR     = "tensors"
+
+
+class Task(NamedTuple):
+    """One model of a batch job
+
+    Attributes
+    ----------
+        name : str
+            Name of the model, unique within the job, e.g. 'run1_ckpt-10' for 'run1/ckpt-10.index'
+        path : str
+            Path to the model file or checkpoint prefix
+    """
+    name : str
+    path : str
+
+
+def _model_path(path: str) -> str:
+    """Path a model is loaded from, the prefix for the index file of a tensorflow checkpoint"""
+    return path[:-len(".index")] if path.endswith(".index") else path
+
+
+def _model_name(path: str, root: str) -> str:
+    """Name of a model out of its path relative to `root` without the model suffix"""
+    name = os.path.relpath(_model_path(path), root)
+    for suffix in MODEL_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.replace(os.sep, "_")
+
+
+def _common_parent(paths: list[str]) -> str:
+    """Deepest directory which contains all paths"""
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+
+
+def discover(inputs: Iterable[str]) -> list[Task]:
+    """Collects the models of a job. Directories are searched recursively for files with one of the
+    `MODEL_SUFFIXES`, model files are taken as they are and every other file is read as a manifest
+    with one model path per line, blank lines and lines starting with '#' are skipped and relative
+    paths are relative to the manifest
+
+    Models are named by their path relative to the directory they were found in, the directory of the
+    manifest or the common parent of all model files given directly, thus 'run1/ckpt-10' and
+    'run2/ckpt-10' become 'run1_ckpt-10' and 'run2_ckpt-10' in either case. Manifest entries outside
+    of the directory of the manifest are named relative to the common parent of both
+
+    Parameters
+    ----------
+        inputs : Iterable[str]
+            Directories, model files and manifests
+
+    Returns
+    -------
+        list[Task]
+            Models sorted by name, the order is the same on every node
+
+    Raises
+    ------
+        ValueError
+            Is triggered when two models end up with the same name
+    """
+    tasks = {}
+    def add(path: str, root: str) -> None:
+        name = _model_name(path, root)
+        if name in tasks and tasks[name].path != _model_path(path):
+            raise ValueError(f'{tasks[name].path} and {_model_path(path)} are both named {name}!')
+        tasks[name] = Task(name, _model_path(path))
+
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for directory, subdirectories, file_names in os.walk(entry):
+                subdirectories.sort()
+                for file_name in sorted(file_names):
+                    if file_name.endswith(MODEL_SUFFIXES):
+                        add(os.path.join(directory, file_name), entry)
+        elif entry.endswith(MODEL_SUFFIXES) or os.path.exists(f"{entry}.index"):
+            files.append(entry)
+        else:
+            with open(entry) as manifest:
+                lines = [line.strip() for line in manifest]
+            paths = [os.path.join(os.path.dirname(entry), line) for line in lines if line and not line.startswith("#")]
+            root  = _common_parent(paths + [entry])
+            for path in paths:
+                add(path, root)
+    if files:
+        root = _common_parent(files)
+        for path in files:
+            add(path, root)
+    return [tasks[name] for name in sorted(tasks)]
+
+
+def shard_of(name: str, shard_count: int) -> int:
+    """Shard of a model, a stable hash of its name modulo the number of shards. The shard only depends
+    on the name, thus models keep their shard when models are added to or removed from the job
+
+    Parameters
+    ----------
+        name        : str
+            Name of the model
+        shard_count : int
+            Number of shards
+    """
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size = 8).digest(), "big") % shard_count
+
+
+def shard(tasks: Iterable[Task], shard_index: int, shard_count: int) -> list[Task]:
+    """Models of one shard, every model belongs to exactly one shard, see `shard_of`
+
+    Parameters
+    ----------
+        tasks       : Iterable[Task]
+            All models of the job
+        shard_index : int
+            Index of the shard, from 0 to `shard_count` - 1
+        shard_count : int
+            Number of shards, e.g. the number of nodes
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError('The shard index has to be at least 0 and smaller than the shard count!')
+    return [task for task in tasks if shard_of(task.name, shard_count) == shard_index]
+
+
+def load_model(task: Task):
+    """Loads a model without tensorflow, `.npz` archives as `model.numpy.ArrayModel` and everything else
+    as `model.checkpoint.CheckpointModel`, weights are read lazily in both cases
+
+    Parameters
+    ----------
+        task : Task
+            Model of the job
+    """
+    if task.path.endswith(".npz"):
+        import tfwda.model.numpy as numpy_model
+        return numpy_model.ArrayModel.from_npz(task.name, task.path)
+    import tfwda.model.checkpoint as checkpoint
+    return checkpoint.CheckpointModel(task.name, task.path)
+
+
+class Journal:
+    """Append-only progress journal of a batch job in JSON lines. Every shard appends to its own file
+    `journal-<index>-of-<count>.jsonl` in the job directory and every line is synced to disk before
+    the next model is reported, a line torn by a crash is ignored. Completed models are read out of
+    all journal files of the directory, thus a job can be restarted with a different number of shards
+
+    Parameters
+    ----------
+        job_dir     : str
+            Directory of the job, it is created if it does not exist
+        shard_index : int
+            Index of the shard
+        shard_count : int
+            Number of shards
+
+    Attributes
+    ----------
+        path      : str
+            Location of the journal file of the shard
+        completed : dict
+            Last 'done' entry of every completed model, keyed by model name
+
+    Methods
+    -------
+        record(event str, task Task, **fields)
+            Appends an entry for a model
+    """
+
+
+    def __init__(self, job_dir: str, shard_index: int = 0, shard_count: int = 1):
+        os.makedirs(job_dir, exist_ok = True)
+        self.path      = os.path.join(job_dir, f"journal-{shard_index}-of-{shard_count}.jsonl")
+        self.completed = {}
+        for file_name in sorted(os.listdir(job_dir)):
+            if file_name.startswith("journal-") and file_name.endswith(".jsonl"):
+                self.__read(os.path.join(job_dir, file_name))
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb+") as journal:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b"\n":
+                    journal.write(b"\n")
+
+
+    def __read(self, path: str) -> None:
+        with open(path) as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("event") == "done":
+                    self.completed[entry["model"]] = entry
+
+
+    def record(self, event: str, task: Task, **fields) -> dict:
+        """Appends an entry for a model and syncs it to disk
+
+        Parameters
+        ----------
+            event  : str
+                Either 'done' or 'failed', only 'done' models are skipped by a restarted job
+            task   : Task
+                Model of the entry
+            fields : dict
+                Further JSON serializable fields, e.g. the number of tensors or the error
+        """
+        entry = dict({'event': event, 'model': task.name, 'path': task.path, 'date': datetime.datetime.utcnow().isoformat()}, **fields)
+        with open(self.path, "a") as journal:
+            journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        if event == "done":
+            self.completed[task.name] = entry
+        return entry
+
+
+def tensor_cache_path(job_dir: str, task: Task) -> str:
+    """Location of the tensor cache of a model within the job directory"""
+    return os.path.join(job_dir, TENSOR_DIR, f"{task.name}.sqlite")
+
+
+# model store of a worker process, created once per process by `_initialize`
+_model_store = None
+
+
+def _initialize(config: dict) -> None:
+    """Creates the model store of a worker process, see `BatchRunner`"""
+    global _model_store
+    import tfwda.model_store.tensorflow as model_store
+    config      = dict(config)
+    output      = config.pop("output")
+    file_format = config.pop("file_format")
+    per_tensor  = config.pop("per_tensor")
+    if output is not None:
+        import tfwda.persistence.columnar as columnar
+        config["result_store"] = columnar.ColumnarResultStore(output, file_format = file_format)
+    elif per_tensor:
+        import pymongo
+        import tfwda.persistence.mongodb as mongodb
+        database               = pymongo.MongoClient(config["db_connection_string"])[config["database_name"]]
+        config["result_store"] = mongodb.MongoTensorResultStore(database["tensor_information"])
+    _model_store = model_store.ModelStore.get_instance(**config)
+
+
+def _process(task: Task, job_dir: str, store_histograms: bool) -> dict:
+    """Streams one model through the model store of the worker. Every finished tensor is kept in the
+    tensor cache of the model, thus a model interrupted by a crash only analyses and plots its
+    remaining tensors when it is processed again
+
+    Returns
+    -------
+        dict
+            Number of tensors, of tensors taken from an earlier attempt and the seconds it took
+    """
+    import tfwda.cache.standard as cache
+    start              = time.perf_counter()
+    _model_store.cache = cache.TensorCache(tensor_cache_path(job_dir, task), max_bytes = 1 << 40)
+    model              = load_model(task)
+    try:
+        _model_store.pipe_models([model], streaming = True, store_histograms = store_histograms)
+        return {'tensors': _model_store.cache.hits + _model_store.cache.misses, 'resumed': _model_store.cache.hits,
+                'seconds': time.perf_counter() - start}
+    finally:
+        _model_store.cache.close()
+        _model_store.cache = None
+        if hasattr(model, "close"):
+            model.close()
+
+
+class BatchRunner:
+    """Runs the models of one shard of a batch job on a local pool of worker processes. Every worker holds
+    its own `model_store.tensorflow.ModelStore` and streams one model at a time, the results of a model
+    are persisted before the model is reported as done in the journal. A restarted job skips models the
+    journal reports as done and resumes interrupted models tensor by tensor out of their tensor cache,
+    failed models are reported and retried by the next run
+
+    Parameters
+    ----------
+        job_dir          : str
+            Directory of the journals and of the tensor caches of unfinished models
+        model_store      : dict
+            Keyword arguments of `ModelStore.get_instance` of every worker, `workers` should be 1 since
+            the pool parallelizes over models. With `output` set, a `persistence.columnar.ColumnarResultStore`
+            of that directory and `file_format` is used instead of MongoDB, with `per_tensor` set a
+            `persistence.mongodb.MongoTensorResultStore` writes one document per weight into the collection
+            `tensor_information`. The plot directory is created
+            up front since the workers cannot confirm its creation
+        shard_index      : int
+            Index of the shard this runner processes
+        shard_count      : int
+            Number of shards of the job
+        workers          : int
+            Number of worker processes
+        store_histograms : bool
+            Whether the histograms of the weights are stored
+        verbosity        : bool
+            Whether progress is printed
+
+    Methods
+    -------
+        run(tasks list[Task]) dict
+            Processes the models of the shard which are not done yet
+    """
+
+
+    def __init__(self, job_dir: str, model_store: dict, shard_index: int = 0, shard_count: int = 1, workers: int = 1,
+                 store_histograms: bool = False, verbosity: bool = True):
+        self.job_dir          = job_dir
+        self.model_store      = dict({'output': None, 'file_format': "parquet", 'per_tensor': False}, **model_store)
+        self.shard_index      = shard_index
+        self.shard_count      = shard_count
+        self.workers          = workers
+        self.store_histograms = store_histograms
+        self.logger           = tfwda.logger.standard.Logger(verbosity)
+        self.journal          = Journal(job_dir, shard_index, shard_count)
+        os.makedirs(self.model_store['path_to_dir'], exist_ok = True)
+
+
+    def run(self, tasks: list[Task]) -> dict:
+        """Processes the models of the shard which are not done yet
+
+        Parameters
+        ----------
+            tasks : list[Task]
+                All models of the job, e.g. out of `discover`, the runner picks its shard
+
+        Returns
+        -------
+            dict
+                Names of the models which are 'done', 'skipped' since an earlier run finished them, and
+                'failed' with their error
+        """
+        tasks   = shard(tasks, self.shard_index, self.shard_count)
+        pending = [task for task in tasks if task.name not in self.journal.completed]
+        summary = {'done': [], 'skipped': [task.name for task in tasks if task.name in self.journal.completed], 'failed': {}}
+        self.logger.log(f"Shard {self.shard_index} of {self.shard_count}: {len(pending)} of {len(tasks)} models are pending!", "Header")
+        if not pending:
+            return summary
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = self.workers, initializer = _initialize, initargs = (self.model_store,)) as pool:
+            futures = {pool.submit(_process, task, self.job_dir, self.store_histograms): task for task in pending}
+            for future in concurrent.futures.as_completed(futures):
+                task = futures[future]
+                try:
+                    result = future.result()
+                except Exception as error:
+                    self.journal.record("failed", task, error = f"{type(error).__name__}: {error}")
+                    summary['failed'][task.name] = str(error)
+                    self.logger.log("%s failed: %s", "Error", task.name, error)
+                    continue
+                self.journal.record("done", task, **result)
+                summary['done'].append(task.name)
+                cache_path = tensor_cache_path(self.job_dir, task)
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+                self.logger.log("%d of %d models are done, %s with %d tensors (%d resumed) in %.1f s...", "Info", len(summary['done']),
+                                len(pending), task.name, result['tensors'], result['resumed'], result['seconds'])
+        return summary
@@ -0,0 +1,374 @@
+import abc
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import collections
+import numpy as np
+from abc import abstractmethod
+from typing import NamedTuple, Optional, Sequence
+
+
+import tfwda.analyse.histogram
+
+
+# is mixed into every key, entries of an older layout or older kernels are never hit
+CACHE_VERSION = 2
+
+
+def tensor_key(weight: np.ndarray, dtype: str, shape: Sequence, fingerprint: str = "exact") -> str:
+    """Content hash of a weight, blake2b over the raw bytes together with dtype, shape and the
+    fingerprint of the analysis, thus byte-identical weights of different models share the key as
+    long as they are analysed the same way
+
+    Parameters
+    ----------
+        weight      : np.ndarray
+            Flat weight
+        dtype       : str
+            Dtype of the weight
+        shape       : Sequence
+            Shape of the weight before flattening
+        fingerprint : str
+            Method and accuracy of the analysis, see `analyse.standard.Analyser.fingerprint`
+
+    Returns
+    -------
+        str
+            Hex digest of 32 characters
+    """
+    digest = hashlib.blake2b(digest_size = 16)
+    digest.update(f"{CACHE_VERSION}|{dtype}|{tuple(shape)}|{fingerprint}|".encode())
+    digest.update(memoryview(np.ascontiguousarray(weight).reshape(-1).view(np.uint8)))
+    return digest.hexdigest()
+
+
+class CacheEntry(NamedTuple):
+    """Cached result of a weight
+
+    Attributes
+    ----------
+        statistics : dict
+            Statistics of the weight including its histogram, see `analyse.kernels.describe`
+        name       : str
+            Name of the weight the entry was created for
+        plot_path  : str
+            Location of the plot which was rendered for the weight, None if no plot was rendered
+    """
+    statistics : dict
+    name       : str
+    plot_path  : Optional[str]
+
+
+class IFTensorCache(metaclass = abc.ABCMeta):
+    """Interface for caches of per-weight results
+
+    Methods (abstract)
+    ------------------
+        get(key str) CacheEntry
+            Entry of a key, None if the key is unknown
+        put(key str, statistics dict, name str, plot_path str)
+            Stores the result of a weight
+
+    Methods
+    -------
+        flush()
+            Persists the pending writes, e.g. once per model, nothing is pending by default
+    """
+
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        pass
+
+
+    @abstractmethod
+    def put(self, key: str, statistics: dict, name: str, plot_path: Optional[str] = None):
+        pass
+
+
+    def flush(self) -> None:
+        pass
+
+
+class TensorCache(IFTensorCache):
+    """Persistent cache of per-weight results keyed by `tensor_key`. Statistics, histogram and plot
+    path are kept in a SQLite file, the cache is bounded by the size of the stored entries and the
+    least recently used entries are evicted first. The cache can be shared between threads. Hits only
+    note their access time in memory and puts are not committed one by one, both are written in a
+    single transaction by `flush`, which is called once per model, and by `close`
+
+    Parameters
+    ----------
+        path      : str
+            Location of the cache file, it is created if it does not exist
+        max_bytes : int
+            Upper bound of the size of all entries
+
+    Methods
+    -------
+        get(key str) CacheEntry
+            Entry of a key, None if the key is unknown, a hit marks the entry as recently used
+        put(key str, statistics dict, name str, plot_path str)
+            Stores the result of a weight and evicts the least recently used entries beyond `max_bytes`
+        flush()
+            Writes the pending access times and commits the pending entries
+        close()
+            Flushes and closes the cache file
+    """
+
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 ** 2):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        self.path         = path
+        self.max_bytes    = max_bytes
+        self.hits         = 0
+        self.misses       = 0
+        self.__lock       = threading.Lock()
+        self.__accessed   = {}
+        self.__connection = sqlite3.connect(path, check_same_thread = False)
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, name TEXT, plot_path TEXT, payload BLOB, size INTEGER, accessed INTEGER)")
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self.__connection.commit()
+        self.__size = self.__connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Entry of a key, a hit marks the entry as recently used
+
+        Parameters
+        ----------
+            key : str
+                Key of the weight, see `tensor_key`
+
+        Returns
+        -------
+            CacheEntry
+                Cached result, None if the key is unknown
+        """
+        with self.__lock:
+            row = self.__connection.execute("SELECT name, plot_path, payload FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__accessed[key] = time.time_ns()
+        name, plot_path, payload = row
+        return CacheEntry(TensorCache.decode(payload), name, plot_path)
+
+
+    def put(self, key: str, statistics: dict, name: str, plot_path: Optional[str] = None) -> None:
+        """Stores the result of a weight, an existing entry of the key is replaced
+
+        Parameters
+        ----------
+            key        : str
+                Key of the weight, see `tensor_key`
+            statistics : dict
+                Statistics of the weight, see `analyse.kernels.describe`
+            name       : str
+                Name of the weight
+            plot_path  : str
+                Location of the plot of the weight
+        """
+        payload = TensorCache.encode(statistics)
+        with self.__lock:
+            previous = self.__connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self.__connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", (key, name, plot_path, payload, len(payload), time.time_ns()))
+            self.__size += len(payload) - (previous[0] if previous is not None else 0)
+            self.__accessed.pop(key, None)
+            if self.__size > self.max_bytes:
+                self.__write_accessed()
+                self.__evict()
+
+
+    def flush(self) -> None:
+        """Writes the pending access times and commits the pending entries"""
+        with self.__lock:
+            self.__write_accessed()
+            self.__connection.commit()
+
+
+    def close(self) -> None:
+        """Flushes and closes the cache file"""
+        self.flush()
+        with self.__lock:
+            self.__connection.close()
+
+
+    def __write_accessed(self) -> None:
+        """Writes the access times noted by hits in one statement, eviction relies on them"""
+        if self.__accessed:
+            self.__connection.executemany("UPDATE entries SET accessed = ? WHERE key = ?", [(accessed, key) for key, accessed in self.__accessed.items()])
+            self.__accessed.clear()
+
+
+    def __evict(self) -> None:
+        """Removes the least recently used entries until all entries fit into `max_bytes`"""
+        while self.__size > self.max_bytes:
+            rows = self.__connection.execute("SELECT key, size FROM entries ORDER BY accessed LIMIT 64").fetchall()
+            if not rows:
+                return
+            for key, size in rows:
+                if self.__size <= self.max_bytes:
+                    return
+                self.__connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.__size -= size
+
+
+    @staticmethod
+    def encode(statistics: dict) -> bytes:
+        """Serializes the statistics of a weight, the histograms by their counts and edges
+
+        Parameters
+        ----------
+            statistics : dict
+                Statistics of the weight, see `analyse.kernels.describe`
+        """
+        document = {}
+        for key, value in statistics.items():
+            if key in ['histogram', 'fixed_histogram']:
+                document[key] = value.to_document()
+            elif key == 'mode':
+                document[key] = [float(mode) for mode in value]
+            elif key == 'axes':
+                document[key] = {str(axis): {statistic: values.tolist() for statistic, values in axis_statistics.items()}
+                                 for axis, axis_statistics in value.items()}
+            else:
+                document[key] = float(value)
+        return json.dumps(document).encode()
+
+
+    @staticmethod
+    def decode(payload: bytes) -> dict:
+        """Restores the statistics serialized by `encode`
+
+        Parameters
+        ----------
+            payload : bytes
+                Serialized statistics
+        """
+        statistics = json.loads(payload)
+        if 'histogram' in statistics:
+            statistics['histogram'] = tfwda.analyse.histogram.Histogram.from_document(statistics['histogram'])
+        if 'fixed_histogram' in statistics:
+            statistics['fixed_histogram'] = tfwda.analyse.histogram.FixedHistogram.from_document(statistics['fixed_histogram'])
+        if 'axes' in statistics:
+            statistics['axes'] = {int(axis): {statistic: np.asarray(values, dtype = np.float64) for statistic, values in axis_statistics.items()}
+                                  for axis, axis_statistics in statistics['axes'].items()}
+        return statistics
+
+
+class QueryCache:
+    """Size-bounded LRU cache of query results in memory, keyed by the query, e.g. a
+    `persistence.standard.Query`. Cached arrays are read-only since every hit returns the same arrays.
+    Results older than `max_age` seconds are not returned, thus results written by other processes
+    show up after at most `max_age` seconds, writes of the own process should call `clear`
+
+    Parameters
+    ----------
+        max_bytes : int
+            Upper bound of the size of the arrays of all cached results
+        max_age   : float
+            Seconds a result is served from the cache, without bound if None
+
+    Methods
+    -------
+        get(query Hashable) collections.OrderedDict
+            Cached result of a query, None if it is unknown or too old, a hit marks it as recently used
+        put(query Hashable, columns dict)
+            Caches a result and evicts the least recently used results beyond `max_bytes`
+        fetch(query Hashable, compute Callable) collections.OrderedDict
+            Cached result of a query or the result of `compute`, which is cached then
+        clear()
+            Removes all results
+    """
+
+
+    def __init__(self, max_bytes: int = 64 * 1024 ** 2, max_age: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.max_age   = max_age
+        self.hits      = 0
+        self.misses    = 0
+        self.__lock    = threading.Lock()
+        self.__entries = collections.OrderedDict()
+        self.__size    = 0
+
+
+    def get(self, query) -> Optional[collections.OrderedDict]:
+        """Cached result of a query, a hit marks it as recently used
+
+        Parameters
+        ----------
+            query : Hashable
+                Key of the result
+        """
+        with self.__lock:
+            entry = self.__entries.get(query)
+            if entry is not None and self.max_age is not None and time.monotonic() - entry[1] > self.max_age:
+                self.__remove(query)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__entries.move_to_end(query)
+        return entry[0]
+
+
+    def put(self, query, columns: dict) -> None:
+        """Caches a result, results larger than `max_bytes` are not cached
+
+        Parameters
+        ----------
+            query   : Hashable
+                Key of the result
+            columns : dict
+                Numpy array per column
+        """
+        size = sum(values.nbytes for values in columns.values())
+        if size > self.max_bytes:
+            return
+        for values in columns.values():
+            values.flags.writeable = False
+        with self.__lock:
+            if query in self.__entries:
+                self.__remove(query)
+            self.__entries[query] = (columns, time.monotonic(), size)
+            self.__size          += size
+            while self.__size > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+
+
+    def fetch(self, query, compute) -> collections.OrderedDict:
+        """Cached result of a query or the result of `compute`, which is cached then
+
+        Parameters
+        ----------
+            query   : Hashable
+                Key of the result
+            compute : Callable[[Hashable], dict]
+                Computes the result of a query, e.g. `IFResultStore.query`
+        """
+        columns = self.get(query)
+        if columns is None:
+            columns = compute(query)
+            self.put(query, columns)
+        return columns
+
+
+    def clear(self) -> None:
+        """Removes all results"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+
+    def __remove(self, query) -> None:
+        self.__size -= self.__entries.pop(query)[2]
@@ -0,0 +1,302 @@
+import abc
+import os
+import json
+import sys
+import time
+import resource
+import threading
+import tracemalloc
+import collections
+from abc import abstractmethod
+from typing import Optional
+
+
+def peak_rss() -> int:
+    """Peak resident set size of the process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class IFSink(metaclass = abc.ABCMeta):
+    """Interface for every sink, a sink receives the events of the instrumentation
+
+    Methods (abstract)
+    ------------------
+        emit(event dict)
+            Receives a single event
+        close()
+            Writes everything out and releases all resources
+    """
+
+
+    @abstractmethod
+    def emit(self, event: dict) -> None:
+        """Receives a single event
+
+        Parameters
+        ----------
+            event : dict
+                Event with 'kind' ('stage' or 'tensor'), 'stage', 'model', 'name', 'seconds', 'bytes',
+                'peak_memory_bytes', 'process_peak_rss_bytes' and 'timestamp'
+        """
+        pass
+
+
+    @abstractmethod
+    def close(self) -> None:
+        """Writes everything out and releases all resources"""
+        pass
+
+
+class MemorySink(IFSink):
+    """Collects all events in a list, mainly for tests
+
+    Attributes
+    ----------
+        events : list[dict]
+            Every event received so far
+    """
+
+
+    def __init__(self):
+        self.events = []
+
+
+    def emit(self, event: dict) -> None:
+        self.events.append(event)
+
+
+    def close(self) -> None:
+        pass
+
+
+class JSONLinesSink(IFSink):
+    """Appends every event as one JSON line to a file
+
+    Parameters
+    ----------
+        path : str
+            Location of the file
+    """
+
+
+    def __init__(self, path: str):
+        self.path   = path
+        self.__file = open(path, "a")
+        self.__lock = threading.Lock()
+
+
+    def emit(self, event: dict) -> None:
+        line = json.dumps(event)
+        with self.__lock:
+            self.__file.write(line + "\n")
+
+
+    def close(self) -> None:
+        self.__file.close()
+
+
+class PrometheusTextfileSink(IFSink):
+    """Aggregates the events per kind and stage and writes them in the Prometheus text format, e.g.
+    for the textfile collector of the node exporter. The file is replaced atomically on every `flush`
+    and on `close`
+
+    Parameters
+    ----------
+        path   : str
+            Location of the `.prom` file
+        prefix : str
+            Prefix of all metric names
+    """
+
+
+    def __init__(self, path: str, prefix: str = "tfwda"):
+        self.path      = path
+        self.prefix    = prefix
+        self.__counts  = collections.Counter()
+        self.__seconds = collections.Counter()
+        self.__bytes   = collections.Counter()
+        self.__peak    = {}
+        self.__lock    = threading.Lock()
+
+
+    def emit(self, event: dict) -> None:
+        key = (event["kind"], event["stage"])
+        with self.__lock:
+            self.__counts[key]  += 1
+            self.__seconds[key] += event["seconds"]
+            self.__bytes[key]   += event["bytes"]
+            self.__peak[key]     = max(self.__peak.get(key, 0), event["peak_memory_bytes"])
+
+
+    def flush(self) -> None:
+        """Writes the current aggregates"""
+        metrics = [("events_total", "counter", self.__counts), ("seconds_total", "counter", self.__seconds),
+                   ("bytes_total", "counter", self.__bytes), ("peak_memory_bytes", "gauge", self.__peak)]
+        lines = []
+        with self.__lock:
+            for name, kind, values in metrics:
+                lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+                for (event_kind, stage), value in sorted(values.items()):
+                    lines.append(f'{self.prefix}_{name}{{kind="{event_kind}",stage="{stage}"}} {value}')
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as metrics_file:
+            metrics_file.write("\n".join(lines) + "\n")
+        os.replace(temporary, self.path)
+
+
+    def close(self) -> None:
+        self.flush()
+
+
+class Measurement:
+    """Handle of a running measurement, the number of processed bytes can be set while it runs
+
+    Attributes
+    ----------
+        bytes : int
+            Number of bytes processed within the measurement
+    """
+
+
+    def __init__(self, instrumentation: 'Instrumentation', kind: str, stage: str, model: Optional[str], name: Optional[str], bytes: int):
+        self.bytes             = bytes
+        self.__instrumentation = instrumentation
+        self.__event           = {'kind': kind, 'stage': stage, 'model': model, 'name': name}
+
+
+    def __enter__(self) -> 'Measurement':
+        if self.__instrumentation.track_memory:
+            tracemalloc.reset_peak()
+            self.__baseline = tracemalloc.get_traced_memory()[0]
+        else:
+            self.__baseline = peak_rss()
+        self.__start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exception) -> None:
+        seconds      = time.perf_counter() - self.__start
+        process_peak = peak_rss()
+        if self.__instrumentation.track_memory:
+            peak = tracemalloc.get_traced_memory()[1] - self.__baseline
+        else:
+            peak = process_peak - self.__baseline
+        self.__instrumentation.emit(dict(self.__event, seconds = seconds, bytes = int(self.bytes), peak_memory_bytes = peak,
+                                         process_peak_rss_bytes = process_peak, timestamp = time.time()))
+
+
+class _NullMeasurement:
+    """Measurement of a disabled instrumentation, does nothing"""
+
+
+    @property
+    def bytes(self) -> int:
+        return 0
+
+
+    @bytes.setter
+    def bytes(self, value: int) -> None:
+        pass
+
+
+    def __enter__(self) -> '_NullMeasurement':
+        return self
+
+
+    def __exit__(self, *exception) -> None:
+        pass
+
+
+_NULL_MEASUREMENT = _NullMeasurement()
+
+
+class Instrumentation:
+    """Measures latency, processed bytes and peak memory of the stages of the pipeline and of single
+    tensors and hands the events to the sinks. Without sinks every measurement is a shared no-op
+
+    The peak memory of a measurement, 'peak_memory_bytes', is the peak above the memory in use when it
+    started. Every event carries the peak resident set size of the process so far as well, i.e. its
+    lifetime high-water mark, under 'process_peak_rss_bytes'
+
+    Parameters
+    ----------
+        sinks        : list[IFSink]
+            Receivers of the events
+        track_memory : bool
+            If true, the peak of the memory allocated within a measurement is traced with `tracemalloc`,
+            numpy allocations included, otherwise the increase of the peak resident set size of the
+            process during the measurement is reported, which is 0 unless the measurement raised the
+            high-water mark. Tracing slows allocations down and a nested measurement resets the peak of
+            the enclosing one
+
+    Methods
+    -------
+        stage(stage str, model str, bytes int) Measurement
+            Context manager measuring a stage, e.g. the analysis of a model
+        tensor(stage str, model str, name str, bytes int) Measurement
+            Context manager measuring a single tensor within a stage
+        close()
+            Closes all sinks
+    """
+
+
+    def __init__(self, sinks: Optional[list[IFSink]] = None, track_memory: bool = False):
+        self.sinks        = list(sinks) if sinks is not None else []
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any sink receives the events"""
+        return len(self.sinks) > 0
+
+
+    def stage(self, stage: str, model: Optional[str] = None, bytes: int = 0):
+        """Measures a stage
+
+        Parameters
+        ----------
+            stage : str
+                Name of the stage, e.g. 'serialize', 'analyse', 'plot' or 'persist'
+            model : str
+                Name of the model the stage processes, None for stages spanning several models
+            bytes : int
+                Number of processed bytes, can also be set on the returned handle
+        """
+        if not self.sinks:
+            return _NULL_MEASUREMENT
+        return Measurement(self, "stage", stage, model, None, bytes)
+
+
+    def tensor(self, stage: str, model: str, name: str, bytes: int = 0):
+        """Measures a single tensor within a stage
+
+        Parameters
+        ----------
+            stage : str
+                Name of the stage
+            model : str
+                Name of the model
+            name  : str
+                Name of the tensor
+            bytes : int
+                Size of the tensor
+        """
+        if not self.sinks:
+            return _NULL_MEASUREMENT
+        return Measurement(self, "tensor", stage, model, name, bytes)
+
+
+    def emit(self, event: dict) -> None:
+        """Hands an event to all sinks"""
+        for sink in self.sinks:
+            sink.emit(event)
+
+
+    def close(self) -> None:
+        """Closes all sinks"""
+        for sink in self.sinks:
+            sink.close()
@@ -11,7 +11,7 @@ class IFLogger(metaclass = abc.ABCMeta):
 
     methods (abstract)
     ------------------
-        log(message str, status str)
+        log(message str, status str, *args)
             Logs a message to the console, the message can have
             different stati which the implementation of this interface
             defines
@@ -19,7 +19,7 @@ class IFLogger(metaclass = abc.ABCMeta):
 
 
     @abstractmethod
-    def log(self, message: str, status: str):
+    def log(self, message: str, status: str, *args):
         """Logs a message with a status to the console
 
         Parameters
@@ -29,6 +29,9 @@ class IFLogger(metaclass = abc.ABCMeta):
             status  : str
                 The status mainly determines in which color the message
                 is printed, e.g. error in red, warning in yellow
+            args    : tuple
+                Arguments which are %-formatted into the message, only if the
+                message is actually printed
         """
         pass
 
@@ -43,9 +46,10 @@ class Logger(IFLogger):
 
     Methods
     -------
-        log(message str, status str)
+        log(message str, status str, *args)
             Logs a message to the console, the message can have
-            different stati, like warning, error, etc.
+            different stati, like warning, error, etc. The message is
+            only formatted if it is printed
     """
 
 
@@ -53,8 +57,10 @@ class Logger(IFLogger):
         self.verbosity = verbosity
 
 
-    def log(self, message: str, status: str) -> None:
-        """Prints to the console messages and its corresponding status
+    def log(self, message: str, status: str, *args) -> None:
+        """Prints to the console messages and its corresponding status, in hot loops
+        the arguments should be passed as `args` so that nothing is formatted while
+        verbosity is off, e.g. `log("%s is flattened now...", "Info", name)`
         
         Parameters
         ----------
@@ -62,6 +68,8 @@ class Logger(IFLogger):
                 The message wich should be logged
             status  : str
                 The status of the message
+            args    : tuple
+                Arguments which are %-formatted into the message
 
         Raises
         ------
@@ -72,6 +80,8 @@ class Logger(IFLogger):
             raise ValueError('Status has to be of one of the following types: Header, Info, Warning, Error!')
         if not self.verbosity:
             return
+        if args:
+            message = message % args
         if status == "Header":
             print(f"{tfwda.utils.coloring.TerminalColors.HEADER}{message.upper()}{tfwda.utils.coloring.TerminalColors.ENDC}")
         if status == "Info":
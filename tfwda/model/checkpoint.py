@@ -0,0 +1,401 @@
+import os
+import struct
+import zipfile
+import numpy as np
+from typing import Callable, Mapping, Optional, Union
+
+
+import tfwda.model.standard
+
+
+# numpy dtypes of the tensorflow DataType enum (types.proto), bfloat16 is resolved lazily
+_TF_DTYPES = {1: np.float32, 2: np.float64, 3: np.int32, 4: np.uint8, 5: np.int16, 6: np.int8, 9: np.int64,
+              10: np.bool_, 14: 'bfloat16', 17: np.uint16, 18: np.complex128, 8: np.complex64, 19: np.float16,
+              22: np.uint32, 23: np.uint64}
+_TABLE_MAGIC           = 0xdb4775248b80fb57
+_OBJECT_GRAPH_KEY      = "_CHECKPOINTABLE_OBJECT_GRAPH"
+_VARIABLE_VALUE_SUFFIX = "/.ATTRIBUTES/VARIABLE_VALUE"
+
+
+def _numpy_dtype(dtype) -> np.dtype:
+    """Resolves a numpy dtype, numpy has no bfloat16 of its own, it is taken from `ml_dtypes` if it is
+    installed and from the numpy type tensorflow registers otherwise"""
+    if dtype == 'bfloat16':
+        try:
+            import ml_dtypes
+            return np.dtype(ml_dtypes.bfloat16)
+        except ImportError:
+            import tensorflow as tf
+            return np.dtype(tf.bfloat16.as_numpy_dtype)
+    return np.dtype(dtype)
+
+
+class MappedVariable:
+    """A lazily loaded variable which mimics the interface of a tensorflow variable that the
+    Serializer relies on, i.e. `name`, `shape`, `dtype` and `numpy()`. The data is only read
+    when `numpy()` is called
+
+    Parameters
+    ----------
+        name   : str
+            Name of the variable
+        shape  : tuple
+            Shape of the variable
+        dtype  : np.dtype
+            Numpy dtype of the variable
+        loader : Callable
+            Returns the data as a flat array, ideally a view on a memory mapped file
+    """
+
+
+    def __init__(self, name: str, shape: tuple, dtype: np.dtype, loader: Callable[[], np.ndarray]):
+        self.name     = name
+        self.shape    = tuple(shape)
+        self.dtype    = dtype
+        self.__loader = loader
+
+
+    def numpy(self) -> np.ndarray:
+        """Reads the variable, the array is read-only if it is memory mapped"""
+        return self.__loader().reshape(self.shape)
+
+
+class CheckpointModel(tfwda.model.standard.IFModel):
+    """Model whose weights are read directly from a saved file without building a Keras model
+    and without importing tensorflow. Supported are HDF5 files (`.h5`/`.hdf5`, full models or
+    weights only), Keras archives (`.keras`) and tensorflow checkpoints given by their prefix,
+    e.g. `ckpt-10` for `ckpt-10.index` and `ckpt-10.data-00000-of-00001`
+
+    Contiguous, uncompressed tensors are memory mapped, so nothing is read before a weight is
+    requested with `numpy()`. Chunked or compressed HDF5 datasets are read lazily instead
+
+    Weights are named by their Keras variable path, e.g. 'dense/kernel', wherever the file records it,
+    thus they line up with the weights of the model in memory, see `model.standard.variable_path`:
+    tensorflow checkpoints name their tensors after the object graph, e.g.
+    'model/_operations/1/_kernel', the variable path is taken out of the object graph stored with them.
+    Legacy HDF5 files, as written by `save` and `save_weights` of Keras 2, list the variable names with
+    an output index like ':0'. Keras archives of the newer layout (`.keras`, `.weights.h5`) only record
+    the layer order, their weights keep the layout of the file, e.g. 'layers/dense_1/vars/0', unless
+    `names` maps them, see `keras_names`
+
+    Parameters
+    ----------
+        name              : str
+            Name of the architecture
+        path              : str
+            Path to the file or checkpoint prefix
+        include_optimizer : bool
+            Whether optimizer variables of a tensorflow checkpoint should be included
+        names             : Mapping[str, str] | Callable[[str], str]
+            Renames the weights, maps the name a weight would get otherwise to its new name, names
+            missing from a mapping are kept
+
+    Attributes
+    ----------
+        summary : method
+            Prints name, shape and dtype of every weight
+        weights : list[MappedVariable]
+            List of all lazily loaded weights
+    """
+
+
+    def __init__(self, name: str, path: str, include_optimizer: bool = False, names: Optional[Union[Mapping[str, str], Callable[[str], str]]] = None) -> None:
+        self.name     = name
+        self.path     = path
+        self.__mapped = {}
+        self.__files  = []
+        if path.endswith((".h5", ".hdf5")):
+            self.weights = self.__read_hdf5(path)
+        elif path.endswith(".keras"):
+            self.weights = self.__read_keras(path)
+        elif os.path.exists(f"{path}.index"):
+            self.weights = self.__read_checkpoint(path, include_optimizer)
+        else:
+            raise ValueError(f'{path} is neither a .h5/.hdf5 file, a .keras archive nor a tensorflow checkpoint prefix!')
+        if names is not None:
+            rename = names if callable(names) else (lambda weight_name: names.get(weight_name, weight_name))
+            for weight in self.weights:
+                weight.name = rename(weight.name)
+
+
+    def summary(self) -> None:
+        """Prints name, shape and dtype of every weight"""
+        for weight in self.weights:
+            print(f"{weight.name:<80} {str(weight.shape):<24} {weight.dtype.name}")
+
+
+    def close(self) -> None:
+        """Releases the memory maps and open file handles, weights cannot be read afterwards"""
+        self.__mapped.clear()
+        for handle in self.__files:
+            handle.close()
+        self.__files.clear()
+
+
+    def __map(self, path: str) -> np.memmap:
+        """Maps a file once, read-only and lazily, all views of the file share the map"""
+        if path not in self.__mapped:
+            self.__mapped[path] = np.memmap(path, dtype = np.uint8, mode = 'r')
+        return self.__mapped[path]
+
+
+    def __view_loader(self, path: str, offset: int, dtype: np.dtype, count: int) -> Callable[[], np.ndarray]:
+        return lambda: np.frombuffer(self.__map(path), dtype = dtype, count = count, offset = offset)
+
+
+    def __read_hdf5(self, path: str) -> list[MappedVariable]:
+        import h5py
+        handle = h5py.File(path, 'r')
+        self.__files.append(handle)
+        return self.__hdf5_variables(handle, path, 0)
+
+
+    def __read_keras(self, path: str) -> list[MappedVariable]:
+        """A Keras archive is a zip file with a `model.weights.h5` member, a stored (uncompressed)
+        member is mapped right out of the archive"""
+        import h5py
+        archive = zipfile.ZipFile(path)
+        self.__files.append(archive)
+        info   = archive.getinfo("model.weights.h5")
+        member = archive.open(info)
+        self.__files.append(member)
+        handle = h5py.File(member, 'r')
+        self.__files.append(handle)
+        if info.compress_type != zipfile.ZIP_STORED:
+            return self.__hdf5_variables(handle, None, 0)
+
+        with open(path, 'rb') as archive_file:
+            archive_file.seek(info.header_offset)
+            local_header = archive_file.read(30)
+        filename_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        return self.__hdf5_variables(handle, path, info.header_offset + 30 + filename_length + extra_length)
+
+
+    def __hdf5_variables(self, handle, path: str, base_offset: int) -> list[MappedVariable]:
+        """Collects the datasets of an HDF5 file, Keras weight files list the variable names of every
+        layer in the `layer_names` and `weight_names` attributes, in their order. Other files are
+        walked in the order of the file
+
+        Parameters
+        ----------
+            handle      : h5py.File
+                Open HDF5 file
+            path        : str
+                File which can be memory mapped, None if the data is not mappable
+            base_offset : int
+                Offset of the HDF5 data within `path`
+        """
+        import h5py
+        root     = handle["model_weights"] if "model_weights" in handle else handle
+        datasets = []
+        if "layer_names" in root.attrs:
+            for layer_name in root.attrs["layer_names"]:
+                layer = root[layer_name.decode() if isinstance(layer_name, bytes) else layer_name]
+                for weight_name in layer.attrs.get("weight_names", []):
+                    weight_name = weight_name.decode() if isinstance(weight_name, bytes) else weight_name
+                    datasets.append((weight_name, layer[weight_name]))
+        else:
+            root.visititems(lambda name, item: datasets.append((name, item)) if isinstance(item, h5py.Dataset) else None)
+
+        variables = []
+        for name, dataset in datasets:
+            dtype  = dataset.dtype
+            offset = dataset.id.get_offset() if dataset.chunks is None and dataset.compression is None else None
+            if path is not None and offset is not None and dtype.kind in 'biufc':
+                loader = self.__view_loader(path, base_offset + offset, dtype, dataset.size)
+            else:
+                loader = lambda dataset = dataset: np.asarray(dataset[()]).reshape(-1)
+            variables.append(MappedVariable(name, dataset.shape, dtype, loader))
+        return variables
+
+
+    def __read_checkpoint(self, prefix: str, include_optimizer: bool) -> list[MappedVariable]:
+        """Reads the tensor bundle index of a tensorflow checkpoint, every entry tells shard, offset
+        and size of a tensor which are then mapped out of the data shards. The weights are named by
+        the variable paths of the object graph and ordered like it, i.e. like the layers of the model"""
+        with open(f"{prefix}.index", 'rb') as index_file:
+            table = index_file.read()
+
+        variables  = []
+        entries    = {}
+        num_shards = 1
+        for key, value in _read_table(table):
+            if key == b"":
+                num_shards = _parse_message(value).get(1, [1])[0]
+                continue
+            entries[key.decode()] = _parse_message(value)
+        shard_of = lambda entry: f"{prefix}.data-{entry.get(3, [0])[0]:05d}-of-{num_shards:05d}"
+        paths    = {}
+        if _OBJECT_GRAPH_KEY in entries:
+            paths = _variable_paths(_read_string(shard_of(entries[_OBJECT_GRAPH_KEY]), entries[_OBJECT_GRAPH_KEY]))
+        order = {key: position for position, key in enumerate(paths.keys())}
+
+        for name in sorted(entries.keys(), key = lambda key: (order.get(key, len(order)), key)):
+            entry = entries[name]
+            if name == _OBJECT_GRAPH_KEY:
+                continue
+            if not include_optimizer and (name.startswith("optimizer/") or ".OPTIMIZER_SLOT" in name):
+                continue
+            if 7 in entry or entry.get(1, [0])[0] not in _TF_DTYPES:
+                continue
+            dtype  = _numpy_dtype(_TF_DTYPES[entry[1][0]])
+            shape  = tuple(_signed(_parse_message(dim).get(1, [0])[0]) for dim in _parse_message(entry.get(2, [b""])[0]).get(2, []))
+            offset = entry.get(4, [0])[0]
+            count  = entry.get(5, [0])[0] // dtype.itemsize
+            if name in paths:
+                name = paths[name]
+            elif name.endswith(_VARIABLE_VALUE_SUFFIX):
+                name = name[:-len(_VARIABLE_VALUE_SUFFIX)]
+            variables.append(MappedVariable(name, shape, dtype, self.__view_loader(shard_of(entry), offset, dtype, count)))
+        return variables
+
+
+def keras_names(architecture, path: str) -> dict[str, str]:
+    """Maps the names of the weights of a Keras archive or `.weights.h5` file of the newer layout, e.g.
+    'layers/dense_1/vars/0', to the variable paths of an architecture, e.g. 'head/kernel', see
+    `model.standard.variable_path`, for `CheckpointModel(names = ...)`.
+    The file records the name of the layer owning every group of variables, the variables of a layer are
+    stored in the order of its own `weights`. The architecture only provides the names, e.g. a model built
+    once for all checkpoints of a series, the file is not loaded into it. Layers which are not reachable
+    through `layers`, e.g. the projections of a MultiHeadAttention, keep the names of the file
+
+    Parameters
+    ----------
+        architecture : keras.Model
+            Model of the same architecture as the file
+        path         : str
+            Keras archive or weights file
+    """
+    import h5py
+    layers = {}
+    queue  = list(architecture.layers)
+    while queue:
+        layer = queue.pop(0)
+        layers.setdefault(layer.name, layer)
+        queue.extend(getattr(layer, 'layers', None) or [])
+
+    groups  = []
+    archive = zipfile.ZipFile(path) if path.endswith(".keras") else None
+    with h5py.File(archive.open("model.weights.h5") if archive is not None else path, 'r') as handle:
+        handle.visititems(lambda group_name, group: groups.append((group_name, _decode(group.attrs.get("name")), list(group.keys())))
+                          if isinstance(group, h5py.Group) and group_name.split("/")[-1] == "vars" else None)
+    if archive is not None:
+        archive.close()
+
+    names = {}
+    for group_name, layer_name, members in groups:
+        if layer_name not in layers:
+            continue
+        layer  = layers[layer_name]
+        nested = {id(weight) for sublayer in getattr(layer, 'layers', None) or [] for weight in sublayer.weights}
+        for index, weight in enumerate(weight for weight in layer.weights if id(weight) not in nested):
+            if str(index) in members:
+                names[f"{group_name}/{index}"] = tfwda.model.standard.variable_path(weight.name)
+    return names
+
+
+def _decode(value):
+    """HDF5 attributes are either str or bytes depending on the writer"""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _read_string(path: str, entry: dict) -> bytes:
+    """Reads a scalar string tensor of a data shard, it is stored as varint length, a checksum of the
+    length and the bytes"""
+    with open(path, 'rb') as shard:
+        shard.seek(entry.get(4, [0])[0])
+        data = shard.read(entry.get(5, [0])[0])
+    length, position = _read_varint(data, 0)
+    return data[position + 4:position + 4 + length]
+
+
+def _variable_paths(object_graph: bytes) -> dict[str, str]:
+    """Checkpoint key and variable path of every variable of a serialized `TrackableObjectGraph`, the
+    nodes are numbered breadth first from the root, thus the keys follow the structure of the model"""
+    paths = {}
+    for node in _parse_message(object_graph).get(1, []):
+        for attribute in _parse_message(node).get(2, []):
+            fields = _parse_message(attribute)
+            if fields.get(1, [b""])[0] == b"VARIABLE_VALUE" and fields.get(2, [b""])[0]:
+                paths[fields[3][0].decode()] = fields[2][0].decode()
+    return paths
+
+
+def _signed(value: int) -> int:
+    """Interprets a varint as two's complement int64"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _read_varint(buffer: bytes, position: int) -> tuple[int, int]:
+    result = 0
+    shift  = 0
+    while True:
+        byte    = buffer[position]
+        result |= (byte & 0x7f) << shift
+        position += 1
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def _parse_message(buffer: bytes) -> dict[int, list]:
+    """Minimal protobuf wire format decoder, returns all values per field number, varints as
+    int and length delimited fields as bytes"""
+    fields   = {}
+    position = 0
+    while position < len(buffer):
+        tag, position = _read_varint(buffer, position)
+        field, wire   = tag >> 3, tag & 0x7
+        if wire == 0:
+            value, position = _read_varint(buffer, position)
+        elif wire == 1:
+            value, position = struct.unpack_from("<Q", buffer, position)[0], position + 8
+        elif wire == 2:
+            length, position = _read_varint(buffer, position)
+            value, position  = buffer[position:position + length], position + length
+        elif wire == 5:
+            value, position = struct.unpack_from("<I", buffer, position)[0], position + 4
+        else:
+            raise ValueError(f'Unsupported protobuf wire type {wire}!')
+        fields.setdefault(field, []).append(value)
+    return fields
+
+
+def _read_block(table: bytes, handle: bytes) -> list[tuple[bytes, bytes]]:
+    """Decodes a block of a LevelDB style table given its encoded block handle"""
+    offset, position = _read_varint(handle, 0)
+    size, _          = _read_varint(handle, position)
+    if table[offset + size] != 0:
+        raise ValueError('Compressed checkpoint index blocks are not supported!')
+    block        = table[offset:offset + size]
+    num_restarts = struct.unpack_from("<I", block, size - 4)[0]
+    end          = size - 4 - 4 * num_restarts
+
+    entries  = []
+    key      = b""
+    position = 0
+    while position < end:
+        shared, position       = _read_varint(block, position)
+        non_shared, position   = _read_varint(block, position)
+        value_length, position = _read_varint(block, position)
+        key       = key[:shared] + block[position:position + non_shared]
+        position += non_shared
+        entries.append((key, block[position:position + value_length]))
+        position += value_length
+    return entries
+
+
+def _read_table(table: bytes) -> list[tuple[bytes, bytes]]:
+    """Returns all key-value pairs of a LevelDB style table as tensorflow writes its checkpoint
+    index, in key order"""
+    footer = table[-48:]
+    if struct.unpack_from("<Q", footer, 40)[0] != _TABLE_MAGIC:
+        raise ValueError('The checkpoint index is not a valid table!')
+    _, position     = _read_varint(footer, 0)
+    _, position     = _read_varint(footer, position)
+    index_handle    = footer[position:40]
+
+    entries = []
+    for _, data_handle in _read_block(table, index_handle):
+        entries.extend(_read_block(table, data_handle))
+    return entries
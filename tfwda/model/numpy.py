@@ -0,0 +1,84 @@
+import numpy as np
+from typing import Any, Mapping
+
+
+import tfwda.model.standard
+import tfwda.model.checkpoint
+
+
+class ArrayModel(tfwda.model.standard.IFModel):
+    """Framework-agnostic model out of a plain mapping of weight name to array, e.g. a PyTorch or JAX
+    state dict exported to numpy. Neither tensorflow nor any other framework is imported, thus the
+    model can be analysed by workers which only have numpy installed. Arrays are converted with
+    `np.asarray` only when the serializer reads them
+
+    Parameters
+    ----------
+        name   : str
+            Name of the model
+        arrays : Mapping[str, Any]
+            Weight name to array or array-like with `shape` and `dtype`, e.g. `np.ndarray`, `np.memmap`
+            or a CPU `torch.Tensor`, the order of the mapping is the order of the weights
+
+    Attributes
+    ----------
+        weights : list[model.checkpoint.MappedVariable]
+            Lazily converted weights
+
+    Methods
+    -------
+        from_npz(name str, path str) ArrayModel `staticmethod`
+            Model out of a `.npz` archive, every array is read from the archive when it is needed
+    """
+
+
+    def __init__(self, name: str, arrays: Mapping[str, Any]) -> None:
+        self.name    = name
+        self.weights = [ArrayModel.__variable(weight_name, array) for weight_name, array in arrays.items()]
+
+
+    def summary(self) -> None:
+        """Prints name, shape and dtype of every weight"""
+        for weight in self.weights:
+            print(f"{weight.name:<48} {str(weight.shape):<24} {weight.dtype.name}")
+
+
+    @staticmethod
+    def from_npz(name: str, path: str) -> 'ArrayModel':
+        """Model out of a `.npz` archive as written by `np.savez`, e.g. of a state dict, the archive only
+        lists its members up front and every array is read when the serializer requests it
+
+        Parameters
+        ----------
+            name : str
+                Name of the model
+            path : str
+                Location of the archive
+        """
+        archive = np.load(path)
+        model   = ArrayModel(name, {})
+        for key in archive.files:
+            shape, dtype = ArrayModel.__header(archive, key)
+            model.weights.append(tfwda.model.checkpoint.MappedVariable(key, shape, dtype, lambda key = key: archive[key].reshape(-1)))
+        return model
+
+
+    @staticmethod
+    def __variable(name: str, array: Any) -> tfwda.model.checkpoint.MappedVariable:
+        try:
+            dtype = np.dtype(array.dtype)
+        except (AttributeError, TypeError):
+            array = np.asarray(array)
+            dtype = array.dtype
+        return tfwda.model.checkpoint.MappedVariable(name, tuple(array.shape), dtype, lambda: np.asarray(array).reshape(-1))
+
+
+    @staticmethod
+    def __header(archive, key: str) -> tuple[tuple, np.dtype]:
+        """Shape and dtype of a member of an archive out of its npy header, the data is not read"""
+        with archive.zip.open(f"{key}.npy") as member:
+            if np.lib.format.read_magic(member) == (1, 0):
+                shape, _, dtype = np.lib.format.read_array_header_1_0(member)
+            else:
+                shape, _, dtype = np.lib.format.read_array_header_2_0(member)
+        return tuple(shape), dtype
@@ -0,0 +1,140 @@
+import abc
+import re
+import numpy as np
+from typing import Iterator, Optional, Sequence
+
+
+class IFModel(metaclass = abc.ABCMeta):
+    """Interface for Model which holds the relevant information on
+    the neural network model/architecture
+
+    Methods
+    -------
+        iter_layer_weights() Iterator[tuple[str, object]]
+            Yields the type of the owning layer and the variable of every weight, the layer type is
+            None unless the model knows its layers
+        select(pattern str, layer_types Sequence[str], trainable bool, dtypes Sequence[str], min_size int, max_size int) Selection
+            Lazy selection of the weights which pass all given filters
+    """
+
+
+    def iter_layer_weights(self) -> Iterator[tuple[Optional[str], object]]:
+        """Yields the type of the owning layer, e.g. 'Conv2D', and the variable of every weight"""
+        for weight in self.weights:
+            yield None, weight
+
+
+    def select(self, pattern: Optional[str] = None, layer_types: Optional[Sequence[str]] = None, trainable: Optional[bool] = None,
+               dtypes: Optional[Sequence[str]] = None, min_size: Optional[int] = None, max_size: Optional[int] = None) -> 'Selection':
+        """Selects weights by name, layer type, trainability, dtype and number of elements, see `Selection`"""
+        return Selection(self, pattern, layer_types, trainable, dtypes, min_size, max_size)
+
+
+def shape_of(weight) -> tuple:
+    """Shape of a variable as a tuple, works for tensorflow variables and numpy-like arrays"""
+    shape = weight.shape
+    if hasattr(shape, 'as_list'):
+        return tuple(shape.as_list())
+    return tuple(shape)
+
+
+def dtype_of(weight) -> str:
+    """Name of the numpy dtype of a variable, e.g. float32 or bfloat16"""
+    return np.dtype(getattr(weight.dtype, 'as_numpy_dtype', weight.dtype)).name
+
+
+def variable_path(name: str) -> str:
+    """Keras variable path of a weight name, i.e. the name without the output index which Keras 2 and
+    tensorflow append, 'dense/kernel:0' and 'dense/kernel' both give 'dense/kernel'. Weights of models
+    which were loaded differently, e.g. from a checkpoint and with Keras, are matched by it"""
+    return re.sub(r":\d+$", "", name)
+
+
+class Selection(IFModel):
+    """Lazy selection of the weights of a model. The filters only look at name, shape, dtype,
+    trainability and the layer of a variable, thus weights which are not selected are never
+    converted to numpy. The selection is a model itself, it can be passed to the serializer and
+    the model store and can be narrowed further with `select`
+
+    Parameters
+    ----------
+        model       : IFModel
+            Model whose weights are selected
+        pattern     : str
+            Regular expression which has to match somewhere in the weight name, or in its path for
+            variables which carry one like Keras 3 variables, e.g. 'conv\\d_block'
+        layer_types : Sequence[str]
+            Class names of the owning layers, e.g. ['Conv2D', 'DepthwiseConv2D'], weights of models
+            without layer information never match
+        trainable   : bool
+            Only trainable weights if true, only non-trainable weights, e.g. moving statistics, if false
+        dtypes      : Sequence[str]
+            Names of the accepted dtypes
+        min_size    : int
+            Minimal number of elements
+        max_size    : int
+            Maximal number of elements
+
+    Attributes
+    ----------
+        name    : str
+            Name of the underlying model
+        weights : list
+            Selected variables, evaluated on every access
+    """
+
+
+    def __init__(self, model: IFModel, pattern: Optional[str] = None, layer_types: Optional[Sequence[str]] = None, trainable: Optional[bool] = None,
+                 dtypes: Optional[Sequence[str]] = None, min_size: Optional[int] = None, max_size: Optional[int] = None) -> None:
+        self.model       = model
+        self.name        = model.name
+        self.pattern     = re.compile(pattern) if pattern is not None else None
+        self.layer_types = set(layer_types) if layer_types is not None else None
+        self.trainable   = trainable
+        self.dtypes      = set(dtypes) if dtypes is not None else None
+        self.min_size    = min_size
+        self.max_size    = max_size
+
+
+    @property
+    def weights(self) -> list:
+        return [weight for _, weight in self.iter_layer_weights()]
+
+
+    def iter_layer_weights(self) -> Iterator[tuple[Optional[str], object]]:
+        for layer_type, weight in self.model.iter_layer_weights():
+            if self.accepts(layer_type, weight):
+                yield layer_type, weight
+
+
+    def accepts(self, layer_type: Optional[str], weight) -> bool:
+        """Whether a weight passes all filters
+
+        Parameters
+        ----------
+            layer_type : str
+                Class name of the owning layer or None
+            weight     : tf.Variable
+                Variable, only its metadata is read
+        """
+        if self.pattern is not None and not self.pattern.search(getattr(weight, 'path', None) or weight.name):
+            return False
+        if self.layer_types is not None and layer_type not in self.layer_types:
+            return False
+        if self.trainable is not None and bool(getattr(weight, 'trainable', True)) != self.trainable:
+            return False
+        if self.dtypes is not None and dtype_of(weight) not in self.dtypes:
+            return False
+        if self.min_size is not None or self.max_size is not None:
+            size = int(np.prod(shape_of(weight), dtype = np.int64))
+            if self.min_size is not None and size < self.min_size:
+                return False
+            if self.max_size is not None and size > self.max_size:
+                return False
+        return True
+
+
+    def summary(self) -> None:
+        """Prints name, shape and dtype of every selected weight"""
+        for weight in self.weights:
+            print(f"{weight.name:<48} {str(shape_of(weight)):<24} {dtype_of(weight)}")
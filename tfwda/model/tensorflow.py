@@ -1,13 +1,12 @@
-import abc
 import tensorflow as tf
 import keras.engine.functional
+from typing import Iterator
 
 
-class IFModel(metaclass = abc.ABCMeta):
-    """Interface for Model which holds the relevant information on
-    the neural network model/architecture
-    """
-    pass
+import tfwda.model.standard
+
+
+IFModel = tfwda.model.standard.IFModel
 
 
 class Model(IFModel):
@@ -26,7 +25,14 @@ class Model(IFModel):
         summary : method
             Prints the relevant structure of the architecture
         weights : list
-            List of all layer variables and weights
+            List of all layer variables and weights, read from the architecture on access
+
+    Methods
+    -------
+        iter_layer_weights() Iterator[tuple[str, tf.Variable]]
+            Yields the class name of the owning layer and the variable of every weight
+        select(pattern str, layer_types Sequence[str], trainable bool, dtypes Sequence[str], min_size int, max_size int) model.standard.Selection
+            Lazy selection of weights, e.g. `model.select(layer_types = ["Conv2D"], trainable = True)`
     """
 
 
@@ -36,4 +42,24 @@ class Model(IFModel):
             raise TypeError('The architecture variable has to be of type tf.python.keras.engine.functional.Functional!')
         self.architecture = architecture
         self.summary      = self.architecture.summary
-        self.weights      = self.architecture.weights
\ No newline at end of file
+
+
+    @property
+    def weights(self) -> list:
+        return self.architecture.weights
+
+
+    def iter_layer_weights(self) -> Iterator[tuple[str, tf.Variable]]:
+        """Yields the class name of the owning layer and the variable of every weight in the order
+        of `weights`, layers of nested models are resolved"""
+        owners = {}
+        layers = list(self.architecture.layers)
+        while layers:
+            layer = layers.pop(0)
+            if hasattr(layer, 'layers') and layer.layers:
+                layers[:0] = list(layer.layers)
+                continue
+            for weight in layer.weights:
+                owners.setdefault(id(weight), type(layer).__name__)
+        for weight in self.weights:
+            yield owners.get(id(weight)), weight
@@ -1,16 +1,28 @@
 import abc
-import tensorflow as tf
-import pymongo
-import collections
+import os
+import shutil
 import datetime
+import collections
+import numpy as np
 from abc import abstractmethod
+from typing import Optional, Sequence, Union
 
-import tfwda.model.tensorflow 
+import tfwda.model.standard
 import tfwda.logger.standard    
 import tfwda.serializer.standard 
 import tfwda.plotter.standard    
+import tfwda.plotter.raster
 import tfwda.analyse.standard    
+import tfwda.analyse.parallel
+import tfwda.analyse.drift
+import tfwda.analyse.aggregate
+import tfwda.analyse.axes
+import tfwda.analyse.compare
 import tfwda.utils.errors   
+import tfwda.persistence.standard
+import tfwda.cache.standard
+import tfwda.instrumentation.standard
+import tfwda.pipeline.standard
 
 
 class IFModelStore(metaclass = abc.ABCMeta):
@@ -20,14 +32,14 @@ class IFModelStore(metaclass = abc.ABCMeta):
 
     Methods (abstract)
     ------------------
-        pipe_models(models list[model.tensorflow.IFModel])
+        pipe_models(models list[model.standard.IFModel])
             A list of models will be piped into the model store and the model
             store will delegate these models to the different components
         get_instance(db_connection_string str, database_name str) IFModelStore
             Instance of the model store is either initialised or fetched
     """
     @abstractmethod
-    def pipe_models(self, models: list[tfwda.model.tensorflow.IFModel]):
+    def pipe_models(self, models: list[tfwda.model.standard.IFModel]):
         pass
 
     
@@ -54,6 +66,38 @@ class ModelStore(IFModelStore):
             The Path to the directory where the plots should be deposited
         verbosity            : bool
             The verbosity of the information which are given to the user over console
+        batched_analysis     : bool
+            Whether the analyser should process small weights in one segmented batch
+        approximate_analysis : bool
+            Whether weights with more than 2^24 elements are described approximately, quantiles, median,
+            IQR and MAD come out of a sample then and their rank error bound is stored with them
+        workers              : int
+            Number of worker processes of the analysis and of the raster plotter, with more than one
+            worker the weights are analysed in parallel over shared memory
+        plot_backend         : str
+            Either 'plotly' (plotly/kaleido export per weight) or 'raster' (numpy binning and
+            matplotlib Agg rendering on the worker pool), the file names are the same
+        binary_arrays        : bool
+            Whether the per-weight statistics are stored as packed float32 binaries instead of lists
+        result_store         : persistence.standard.IFResultStore
+            Alternative result store, e.g. a `persistence.columnar.ColumnarResultStore`, if given no
+            MongoDB connection is set up and `db_connection_string` may be None
+        cache                : cache.standard.IFTensorCache
+            Cache of per-weight results, weights whose content has been analysed before are neither
+            analysed nor plotted again, their plots are copied
+        instrumentation      : instrumentation.standard.Instrumentation
+            Receives latency, processed bytes and peak memory of every stage and, in streaming mode,
+            of every tensor, disabled if None
+        edge_scheme          : analyse.aggregate.IFEdgeScheme
+            If given, every weight is binned over the fixed edges of the scheme as well, the fixed-edge
+            histograms are stored with the statistics and merged into aggregates per layer type, block and
+            model, see `analyse.aggregate`
+        axes                 : Sequence[int]
+            If given, weights of at least rank 2 are described per slice along these axes of their original
+            shape as well, e.g. (-1, -2) for every output filter and input channel, see `analyse.axes`
+        query_cache_max_age  : float
+            Seconds a query result is served from `query_cache`, results written by other processes, e.g.
+            the workers of a batch job, show up after at most this long, without bound if None
 
     Attributes
     ----------
@@ -62,42 +106,88 @@ class ModelStore(IFModelStore):
         serializer : serializer.standard.Serializer
             Serializer instance which is responsible for flattening the neural network model
         plotter    : plotter.standard.Plotter
-            Plotting instance which will perform all the distribution plots
+            Plotting instance which will perform all the distribution plots, a `plotter.raster.RasterPlotter`
+            for the raster backend
         analyser   : analyser.standard.Analyser
             Analyser instance which processes model data and outputs relevant information on the weight
-            distributions
+            distributions, an `analyser.parallel.ParallelAnalyser` if more than one worker is requested
+        result_store : persistence.standard.IFResultStore
+            Result store, by default a `persistence.mongodb.MongoResultStore` which writes the documents
+            in bulk in the background
+        cache        : cache.standard.IFTensorCache
+            Cache of per-weight results, None if no cache is used
+        instrumentation : instrumentation.standard.Instrumentation
+            Measures the stages, without sinks all measurements are no-ops
+        query_cache     : cache.standard.QueryCache
+            Recent query results, cleared whenever the model store has written results and expired after
+            `query_cache_max_age` seconds
 
     Methods
     -------
-        get_instance(db_connection_string str, database_name str, path_to_dir str, verbosity bool) ModelStore `staticmethod`
+        get_instance(db_connection_string str, database_name str, path_to_dir str, verbosity bool, batched_analysis bool, workers int, plot_backend str, binary_arrays bool, result_store IFResultStore, cache IFTensorCache, instrumentation Instrumentation, approximate_analysis bool, edge_scheme IFEdgeScheme, axes Sequence[int], query_cache_max_age float) ModelStore `staticmethod`
             Since the model store is a Singleton, this method must be use to fetch an instance, this will be
             the central instance, coordinating and speaking to all the other components
-        pipe_models(models list[model.tensorflow.Model])
-            A list of tensorflow models will be serialized, plotted and analysed
+        pipe_models(models list[model.standard.IFModel], streaming bool, store_histograms bool, pipelined bool, capacity int)
+            A list of models will be serialized, plotted and analysed, either stage by stage,
+            streamed weight by weight or with all stages running concurrently
+        pipe_series(models list[model.standard.IFModel], store_histograms bool)
+            An ordered series of checkpoints of one architecture is analysed incrementally and the drift
+            of every weight between consecutive checkpoints is stored
+        compare_models(models list[model.standard.IFModel], points int, bins int) analyse.compare.Comparison
+            Distances between the weight distributions of the models, per weight and aggregated
+        query(models list[str], pattern str, start datetime, end datetime, columns list[str], frame bool) np.recarray
+            Stored statistics of the weights matching the filters as record array or DataFrame
     """
-    __instance = None
-    __client   = None
-    __database = None
-    logger     = None
-    serializer = None
-    plotter    = None
-    analyser   = None
+    __instance      = None
+    __client        = None
+    __database      = None
+    logger          = None
+    serializer      = None
+    plotter         = None
+    analyser        = None
+    result_store    = None
+    cache           = None
+    instrumentation = None
+    query_cache     = None
     
 
-    def __init__(self, db_connection_string: str, database_name: str, path_to_dir: str, verbosity: bool) -> None:
+    def __init__(self, db_connection_string: str, database_name: str, path_to_dir: str, verbosity: bool, batched_analysis: bool = False, workers: int = 1, plot_backend: str = "plotly", binary_arrays: bool = False, result_store: Optional[tfwda.persistence.standard.IFResultStore] = None,
+                 cache: Optional[tfwda.cache.standard.IFTensorCache] = None, instrumentation: Optional[tfwda.instrumentation.standard.Instrumentation] = None,
+                 approximate_analysis: bool = False, edge_scheme: Optional[tfwda.analyse.aggregate.IFEdgeScheme] = None,
+                 axes: Optional[Sequence[int]] = None, query_cache_max_age: Optional[float] = 60.0) -> None:
         if ModelStore.__instance != None:
             raise tfwda.utils.errors.NotCreatedInstanceError("An instance has been already created! Get it with ModelStore.get_instance()!")
+        if plot_backend not in ["plotly", "raster"]:
+            raise ValueError('The plot backend has to be either plotly or raster!')
         ModelStore.__instance = self
         if self.__database == None:
-            self.__setup_db_connection(db_connection_string, database_name)
-            self.logger     = tfwda.logger.standard.Logger(verbosity)
-            self.serializer = tfwda.serializer.standard.Serializer(self.logger)
-            self.plotter    = tfwda.plotter.standard.Plotter(self.logger, path_to_dir)
-            self.analyser   = tfwda.analyse.standard.Analyser(self.plotter, self.logger)
+            if result_store is None:
+                import tfwda.persistence.mongodb as mongodb
+                self.__setup_db_connection(db_connection_string, database_name)
+                result_store = mongodb.MongoResultStore(self.__database["model_information"], binary_arrays = binary_arrays)
+            self.logger          = tfwda.logger.standard.Logger(verbosity)
+            self.result_store    = result_store
+            self.cache           = cache
+            self.instrumentation = instrumentation if instrumentation is not None else tfwda.instrumentation.standard.Instrumentation()
+            self.query_cache     = tfwda.cache.standard.QueryCache(max_age = query_cache_max_age)
+            self.serializer      = tfwda.serializer.standard.Serializer(self.logger)
+            if plot_backend == "raster":
+                self.plotter = tfwda.plotter.raster.RasterPlotter(self.logger, path_to_dir, workers = workers)
+            else:
+                self.plotter = tfwda.plotter.standard.Plotter(self.logger, path_to_dir)
+            if workers > 1:
+                self.analyser = tfwda.analyse.parallel.ParallelAnalyser(self.logger, workers, batched = batched_analysis, approximate = approximate_analysis,
+                                                                        edge_scheme = edge_scheme, axes = axes)
+            else:
+                self.analyser = tfwda.analyse.standard.Analyser(self.logger, batched = batched_analysis, approximate = approximate_analysis, edge_scheme = edge_scheme,
+                                                                axes = axes)
 
 
     @staticmethod
-    def get_instance(db_connection_string: str, database_name: str, path_to_dir: str, verbosity: bool) -> object:
+    def get_instance(db_connection_string: str, database_name: str, path_to_dir: str, verbosity: bool, batched_analysis: bool = False, workers: int = 1, plot_backend: str = "plotly", binary_arrays: bool = False, result_store: Optional[tfwda.persistence.standard.IFResultStore] = None,
+                 cache: Optional[tfwda.cache.standard.IFTensorCache] = None, instrumentation: Optional[tfwda.instrumentation.standard.Instrumentation] = None,
+                 approximate_analysis: bool = False, edge_scheme: Optional[tfwda.analyse.aggregate.IFEdgeScheme] = None,
+                 axes: Optional[Sequence[int]] = None, query_cache_max_age: Optional[float] = 60.0) -> object:
         """This class is a Singleton, thus the instance is returned through this method
         
         Parameters
@@ -110,6 +200,29 @@ class ModelStore(IFModelStore):
                 Path where the plots will be stored in
             verbosity            : bool
                 Whether the info output to the console should be verbose or not
+            batched_analysis     : bool
+                Whether the analyser should process small weights in one segmented batch
+            approximate_analysis : bool
+                Whether very large weights are described approximately with a bounded rank error
+            workers              : int
+                Number of worker processes of the analysis and of the raster plotter
+            plot_backend         : str
+                Either 'plotly' or 'raster'
+            binary_arrays        : bool
+                Whether the per-weight statistics are stored as packed float32 binaries
+            result_store         : persistence.standard.IFResultStore
+                Alternative result store, no MongoDB connection is set up if given
+            cache                : cache.standard.IFTensorCache
+                Cache of per-weight results, e.g. a `cache.standard.TensorCache`
+            instrumentation      : instrumentation.standard.Instrumentation
+                Measures the stages and hands the measurements to its sinks
+            edge_scheme          : analyse.aggregate.IFEdgeScheme
+                Edges of the fixed-edge histograms of the weights, none are computed if None
+            axes                 : Sequence[int]
+                Axes along which weights are described per slice as well, e.g. (-1,) for output filters
+            query_cache_max_age  : float
+                Seconds a result of `query` is served from the cache, 60 by default, thus results written by
+                other processes show up within a minute, without bound if None
 
         Returns
         -------
@@ -117,70 +230,403 @@ class ModelStore(IFModelStore):
                 Instance of the ModelStore class
         """
         if ModelStore.__instance == None:
-            ModelStore(db_connection_string, database_name, path_to_dir, verbosity)
+            ModelStore(db_connection_string, database_name, path_to_dir, verbosity, batched_analysis, workers, plot_backend, binary_arrays, result_store, cache, instrumentation, approximate_analysis, edge_scheme, axes,
+                       query_cache_max_age)
         return ModelStore.__instance
 
 
-    def pipe_models(self, models: list[tfwda.model.tensorflow.Model]) -> None:
+    def pipe_models(self, models: list[tfwda.model.standard.IFModel], streaming: bool = False, store_histograms: bool = False,
+                    pipelined: bool = False, capacity: int = 2) -> None:
         """A list of models is processed, meaning that weights are extracted, given to the serializer,
         metadata are written and the plots are generated 
 
         Parameters
         ----------
-            models : list[model.tensorflow.Model]
-                A list of tensorflow models which weights should be analysed
+            models    : list[model.standard.IFModel]
+                A list of models which weights should be analysed, e.g. `model.tensorflow.Model`, `model.checkpoint.CheckpointModel`
+                or `model.numpy.ArrayModel` instances
+            streaming : bool
+                If true, every weight flows through serialization, analysis and plotting on its own and
+                is released right after, every model is stored as soon as its last weight is done. Otherwise
+                every stage processes all models before the next stage starts
+            store_histograms : bool
+                Whether the histograms of the weights should be stored next to the statistics, plots can be
+                rendered out of them later without loading the model again
+            pipelined        : bool
+                If true, serialization, analysis, plotting and persistence run concurrently in their own
+                threads, every model passes them one after another, see `pipeline.standard.Pipeline`.
+                The first error of any stage stops all stages and is raised as `utils.errors.PipelineError`,
+                it cannot be combined with `streaming`
+            capacity         : int
+                Maximal number of models waiting between two stages in pipelined mode, bounds the memory
         """
+        if streaming and pipelined:
+            raise ValueError('Streaming and pipelined mode cannot be combined, choose one of them!')
+        if streaming:
+            self.__pipe_models_streaming(models, store_histograms)
+            return
+        if pipelined:
+            self.__pipe_models_pipelined(models, store_histograms, capacity)
+            return
+
         self.logger.log(f"{len(models)} models are being processed now!", "Header")
         serialized_weights_per_model = collections.OrderedDict()
         for count, model in enumerate(models):
-            flattened_weights, metadata              = self.serializer.flatten(model)
+            with self.instrumentation.stage("serialize", model.name) as measurement:
+                flattened_weights, metadata = self.serializer.flatten(model)
+                measurement.bytes           = sum(weight.nbytes for weight in flattened_weights)
             serialized_weights_per_model[model.name] = {'weights': flattened_weights, 'metadata': metadata}
-            self.logger.log(f"{count} model serializations have been finished...", "Info")
+            self.logger.log("%d model serializations have been finished...", "Info", count)
         self.logger.log(f"{len(models)} models have been processed now...", "Info")
 
-        self.logger.log("Plotting will start now!", "Header")
-        for model_name, model_data in serialized_weights_per_model.items():
-            self.plotter.plot(model_name, model_data["weights"], model_data["metadata"])
-        self.logger.log("Plotting terminated successfully!", "Info")
-
         self.logger.log("Analysis process will start now!", "Header")
         model_information = collections.OrderedDict({'model_names': [], 'extracted_info': []})
+        cached_plots      = {}
         for model_name, model_data in serialized_weights_per_model.items():
-            extracted_properties = self.analyser.process(model_data)
+            with self.instrumentation.stage("analyse", model_name, ModelStore.__size(model_data)):
+                if self.cache is None:
+                    extracted_properties = self.analyser.process(model_data)
+                else:
+                    extracted_properties, cached_plots[model_name] = self.__process_cached(model_name, model_data)
             model_information["model_names"].append(model_name)
             model_information["extracted_info"].append(extracted_properties)
         self.logger.log("Analysis process terminated successfully!", "Info")
 
+        self.logger.log("Plotting will start now!", "Header")
+        for (model_name, model_data), info in zip(serialized_weights_per_model.items(), model_information["extracted_info"]):
+            with self.instrumentation.stage("plot", model_name, ModelStore.__size(model_data)):
+                if model_name in cached_plots:
+                    self.__plot_cached(model_name, model_data, info["histograms"], cached_plots[model_name])
+                else:
+                    self.plotter.plot(model_name, model_data["weights"], model_data["metadata"], info["histograms"])
+        self.logger.log("Plotting terminated successfully!", "Info")
+        if self.cache is not None:
+            self.logger.log(f"Tensor cache: {self.cache.hits} hits, {self.cache.misses} misses...", "Info")
+
         self.logger.log("Storing persistently extracted analysis information in database...", "Header")
-        collection = self.__database["model_information"]
-        for model_name, info in zip(model_information["model_names"], model_information["extracted_info"]):
-            document = {
-                "model_name": model_name,
-                "date": datetime.datetime.utcnow(),
-                "weights": {
-                    "names": info["names"],
-                    "shapes": info["shapes"],
-                    "dtypes": info["dtypes"],
-                    "minima": info["min"],
-                    "maxima": info["max"],
-                    "means": info["mean"],
-                    "25_quantiles": info["25-quantile"],
-                    "medians": info["median"],
-                    "75_quantiles": info["75-quantile"],
-                    "IQRs": info["IQR"],
-                    "modes": info["mode"],
-                    "variances": info["variance"],
-                    "skewness": info["skewness"],
-                    "kurtosis": info["kurtosis"],
-                    "MADs": info["MAD"]
-                }
-            }
-            collection.insert_one(document)
+        with self.instrumentation.stage("persist"):
+            for model_name, info in zip(model_information["model_names"], model_information["extracted_info"]):
+                self.result_store.write(model_name, info, store_histograms)
+            self.result_store.flush()
+            self.query_cache.clear()
         self.logger.log("Data have been successfully stored in the database...", "Info")
 
         self.logger.log("Successful! All operations are finished!", "Header")
 
 
+    def __pipe_models_streaming(self, models: list[tfwda.model.standard.IFModel], store_histograms: bool) -> None:
+        """Streaming variant of `pipe_models`, only a single flattened weight is alive at a time and
+        the document of a model is inserted as soon as the model is finished
+
+        Parameters
+        ----------
+            models           : list[model.standard.IFModel]
+                A list of models which weights should be analysed
+            store_histograms : bool
+                Whether the histograms of the weights should be stored
+        """
+        self.logger.log(f"{len(models)} models are being streamed now!", "Header")
+        for count, model in enumerate(models):
+            extracted_properties = tfwda.analyse.standard.Analyser.new_properties()
+            with self.instrumentation.stage("stream", model.name) as measurement:
+                for record in self.serializer.iter_flatten(model):
+                    measurement.bytes += record.view.nbytes
+                    entry = None
+                    if self.cache is not None:
+                        key   = tfwda.cache.standard.tensor_key(record.view, record.dtype, record.shape, self.analyser.fingerprint(record.view.size))
+                        entry = self.cache.get(key)
+                    if entry is None:
+                        with self.instrumentation.tensor("analyse", model.name, record.name, record.view.nbytes):
+                            statistics = self.analyser.describe([record.view], [record.name], [record.shape])[0]
+                        with self.instrumentation.tensor("plot", model.name, record.name, record.view.nbytes):
+                            self.plotter.plot_weight(model.name, record.view, record.name, record.shape, record.dtype, statistics['histogram'])
+                        if self.cache is not None:
+                            self.cache.put(key, statistics, record.name, self.plotter.file_path(model.name, record.name, record.shape, record.dtype))
+                    else:
+                        statistics = self.__complete(entry.statistics, record.view, record.name, record.shape)
+                        source     = entry.plot_path if entry.name == record.name else None
+                        if not self.__copy_plot(source, model.name, record.name, record.shape, record.dtype):
+                            self.plotter.plot_histogram(model.name, statistics['histogram'], record.name, record.shape, record.dtype)
+                    tfwda.analyse.standard.Analyser.append(extracted_properties, record.name, record.shape, record.dtype, statistics)
+                    del record
+            if self.cache is not None:
+                self.cache.flush()
+            self.result_store.write(model.name, extracted_properties, store_histograms)
+            self.logger.log("%d models have been streamed and handed to the result store...", "Info", count + 1)
+        self.result_store.flush()
+        self.query_cache.clear()
+
+        self.logger.log("Successful! All operations are finished!", "Header")
+
+
+    def __pipe_models_pipelined(self, models: list[tfwda.model.standard.IFModel], store_histograms: bool, capacity: int) -> None:
+        """Pipelined variant of `pipe_models`, the four stages run concurrently and are connected by
+        queues of at most `capacity` models, thus the end-to-end time approaches the time of the slowest
+        stage while at most a few models are held at a time
+
+        Parameters
+        ----------
+            models           : list[model.standard.IFModel]
+                A list of models which weights should be analysed
+            store_histograms : bool
+                Whether the histograms of the weights should be stored
+            capacity         : int
+                Maximal number of models waiting between two stages
+        """
+        def serialize(model) -> dict:
+            with self.instrumentation.stage("serialize", model.name) as measurement:
+                weights, metadata = self.serializer.flatten(model)
+                measurement.bytes = sum(weight.nbytes for weight in weights)
+            return {'model_name': model.name, 'weights': weights, 'metadata': metadata}
+
+        def analyse(model_data: dict) -> dict:
+            with self.instrumentation.stage("analyse", model_data['model_name'], ModelStore.__size(model_data)):
+                if self.cache is None:
+                    model_data['info'], model_data['plots'] = self.analyser.process(model_data), None
+                else:
+                    model_data['info'], model_data['plots'] = self.__process_cached(model_data['model_name'], model_data)
+            return model_data
+
+        def plot(model_data: dict) -> dict:
+            with self.instrumentation.stage("plot", model_data['model_name'], ModelStore.__size(model_data)):
+                if model_data['plots'] is None:
+                    self.plotter.plot(model_data['model_name'], model_data['weights'], model_data['metadata'], model_data['info']['histograms'])
+                else:
+                    self.__plot_cached(model_data['model_name'], model_data, model_data['info']['histograms'], model_data['plots'])
+            return model_data
+
+        def persist(model_data: dict) -> str:
+            with self.instrumentation.stage("persist", model_data['model_name']):
+                self.result_store.write(model_data['model_name'], model_data['info'], store_histograms)
+            return model_data['model_name']
+
+        self.logger.log(f"{len(models)} models are being processed in a pipeline now!", "Header")
+        stages   = [tfwda.pipeline.standard.Stage("serialize", serialize), tfwda.pipeline.standard.Stage("analyse", analyse),
+                    tfwda.pipeline.standard.Stage("plot", plot), tfwda.pipeline.standard.Stage("persist", persist)]
+        pipeline = tfwda.pipeline.standard.Pipeline(stages, capacity = capacity)
+        for count, model_name in enumerate(pipeline.run(models)):
+            self.logger.log("%s has passed the pipeline as model %d...", "Info", model_name, count + 1)
+        self.result_store.flush()
+        self.query_cache.clear()
+
+        self.logger.log("Successful! All operations are finished!", "Header")
+
+
+    def pipe_series(self, models: list[tfwda.model.standard.IFModel], store_histograms: bool = False) -> None:
+        """An ordered series of checkpoints of one architecture, e.g. `model.checkpoint.CheckpointModel`
+        instances of one training run, is processed step by step. Weights are aligned with the previous
+        step by their variable path, see `model.standard.variable_path`, byte-identical weights keep their
+        statistics and plots, only changed weights are analysed and plotted again. For every weight which
+        exists in both steps with the same shape and dtype the drift, i.e. L2 and L-infinity norm of the
+        difference, the relative change and the changes of the statistics, is handed to the result store
+        next to the statistics. A weight which was reshaped or retyped is analysed again and gets no drift,
+        its layouts are unrelated. At most two steps are held at a time
+
+        Parameters
+        ----------
+            models           : list[model.standard.IFModel]
+                Checkpoints in the order of training
+            store_histograms : bool
+                Whether the histograms of the weights should be stored
+        """
+        self.logger.log(f"A series of {len(models)} checkpoints is being processed now!", "Header")
+        previous_name = None
+        previous      = {}
+        for count, model in enumerate(models):
+            extracted_properties = tfwda.analyse.standard.Analyser.new_properties()
+            drift_properties     = tfwda.analyse.drift.new_drift()
+            current              = {}
+            recomputed           = 0
+            for record in self.serializer.iter_flatten(model):
+                path   = tfwda.model.standard.variable_path(record.name)
+                before = previous.get(path)
+                if before is not None and (before[2], before[3]) != (tuple(record.shape), record.dtype):
+                    before = None
+                if before is not None and tfwda.analyse.drift.unchanged(before[0], record.view):
+                    statistics = before[1]
+                    source     = self.plotter.file_path(previous_name, record.name, record.shape, record.dtype)
+                    if not self.__copy_plot(source, model.name, record.name, record.shape, record.dtype):
+                        self.plotter.plot_histogram(model.name, statistics['histogram'], record.name, record.shape, record.dtype)
+                else:
+                    statistics  = self.analyser.describe([record.view], [record.name], [record.shape])[0]
+                    recomputed += 1
+                    self.plotter.plot_weight(model.name, record.view, record.name, record.shape, record.dtype, statistics['histogram'])
+                if before is not None:
+                    weight_drift = tfwda.analyse.drift.drift(before[0], record.view, before[1], statistics)
+                    tfwda.analyse.drift.append(drift_properties, record.name, weight_drift)
+                tfwda.analyse.standard.Analyser.append(extracted_properties, record.name, record.shape, record.dtype, statistics)
+                current[path] = (record.view, statistics, tuple(record.shape), record.dtype)
+
+            self.result_store.write(model.name, extracted_properties, store_histograms)
+            if previous_name is not None:
+                self.result_store.write_drift(model.name, previous_name, drift_properties)
+            self.logger.log("%d checkpoints have been processed, %d of %d weights of %s were recomputed...", "Info", count + 1, recomputed, len(current), model.name)
+            previous_name, previous = model.name, current
+        self.result_store.flush()
+        self.query_cache.clear()
+
+        self.logger.log("Successful! All operations are finished!", "Header")
+
+
+    def compare_models(self, models: list[tfwda.model.standard.IFModel], points: int = 129, bins: int = 64) -> tfwda.analyse.compare.Comparison:
+        """Compares the weight distributions of models or checkpoints, weights are matched by name and
+        shape. Wasserstein-1 distance, Kolmogorov-Smirnov statistic and the KL and JS divergences are
+        computed for all models at once out of one quantile function per model and weight, see
+        `analyse.compare.compare`
+
+        Parameters
+        ----------
+            models : list[model.standard.IFModel]
+                Models which are compared
+            points : int
+                Number of quantiles per weight
+            bins   : int
+                Number of bins of the histograms of the KL and JS divergences
+
+        Returns
+        -------
+            analyse.compare.Comparison
+                Models x models matrix per weight and distance and their aggregate over all weights
+        """
+        self.logger.log(f"{len(models)} models are being compared now!", "Header")
+        comparison = tfwda.analyse.compare.compare(models, self.serializer, points, bins)
+        self.logger.log("%d weights have been compared...", "Info", len(comparison.layers))
+        return comparison
+
+
+    def query(self, models: Optional[Union[str, Sequence[str]]] = None, pattern: Optional[str] = None, start: Optional[datetime.datetime] = None,
+              end: Optional[datetime.datetime] = None, columns: Optional[Sequence[str]] = None, frame: bool = False):
+        """Reads the stored statistics of all weights which pass the filters, one row per weight and
+        stored model. Filters and projection are evaluated by the result store, e.g. MongoDB or the
+        columnar dataset, recent results are served from `query_cache`
+
+        Parameters
+        ----------
+            models  : str | Sequence[str]
+                Name or names of the models, all models if None
+            pattern : str
+                Regular expression which has to match somewhere in the weight name, e.g. 'bn/gamma'
+            start   : datetime.datetime
+                Earliest date of the stored results, inclusive
+            end     : datetime.datetime
+                Latest date of the stored results, exclusive
+            columns : Sequence[str]
+                Columns out of `persistence.standard.QUERY_COLUMNS`, e.g. ['kurtosis'], model name, date
+                and weight name are always returned
+            frame   : bool
+                Whether a pandas.DataFrame is returned instead of a record array
+
+        Returns
+        -------
+            np.recarray | pandas.DataFrame
+                One row per weight, ordered by model, date and position of the weight within its model
+        """
+        query   = tfwda.persistence.standard.build_query(models, pattern, start, end, columns)
+        results = self.query_cache.fetch(query, self.result_store.query)
+        if frame:
+            return tfwda.persistence.standard.to_frame(results)
+        return tfwda.persistence.standard.to_records(results)
+
+
+    def __process_cached(self, model_name: str, model_data: dict) -> tuple[collections.OrderedDict, list]:
+        """Variant of `Analyser.process` which consults the cache first, only the weights which are
+        not cached are analysed and afterwards added to the cache
+
+        Parameters
+        ----------
+            model_name : str
+                Name of the model
+            model_data : dict
+                Flattened weights and metadata of the model
+
+        Returns
+        -------
+            collections.OrderedDict, list
+                Extracted properties of the model and the cached plot of every weight which can be
+                reused, None for weights which have to be plotted
+        """
+        weights, metadata = model_data["weights"], model_data["metadata"]
+        statistics        = [None] * len(weights)
+        plots             = [None] * len(weights)
+        keys              = []
+        misses            = []
+        for index, (weight, name, shape, dtype) in enumerate(zip(weights, metadata["names"], metadata["shapes"], metadata["dtypes"])):
+            keys.append(tfwda.cache.standard.tensor_key(weight, dtype, shape, self.analyser.fingerprint(weight.size)))
+            entry = self.cache.get(keys[-1])
+            if entry is None:
+                misses.append(index)
+                continue
+            statistics[index] = self.__complete(entry.statistics, weight, name, shape)
+            if entry.name == name:
+                plots[index] = entry.plot_path
+        self.logger.log("%d of %d weights of %s are cached...", "Info", len(weights) - len(misses), len(weights), model_name)
+
+        for index, result in zip(misses, self.analyser.describe([weights[index] for index in misses], [metadata["names"][index] for index in misses],
+                                                                [metadata["shapes"][index] for index in misses])):
+            statistics[index] = result
+            plot_path         = self.plotter.file_path(model_name, metadata["names"][index], metadata["shapes"][index], metadata["dtypes"][index])
+            self.cache.put(keys[index], result, metadata["names"][index], plot_path)
+        self.cache.flush()
+
+        extracted_properties = tfwda.analyse.standard.Analyser.new_properties()
+        for result, name, shape, dtype in zip(statistics, metadata["names"], metadata["shapes"], metadata["dtypes"]):
+            tfwda.analyse.standard.Analyser.append(extracted_properties, name, shape, dtype, result)
+        return extracted_properties, plots
+
+
+    def __plot_cached(self, model_name: str, model_data: dict, histograms: list, plots: list) -> None:
+        """Copies the cached plots and plots the remaining weights of a model
+
+        Parameters
+        ----------
+            model_name : str
+                Name of the model
+            model_data : dict
+                Flattened weights and metadata of the model
+            histograms : list[analyse.histogram.Histogram]
+                Histograms of the weights
+            plots      : list[str]
+                Cached plot of every weight, None if the weight has to be plotted
+        """
+        weights, metadata = model_data["weights"], model_data["metadata"]
+        remaining         = [index for index, source in enumerate(plots)
+                             if not self.__copy_plot(source, model_name, metadata["names"][index], metadata["shapes"][index], metadata["dtypes"][index])]
+        if remaining:
+            remaining_metadata = collections.OrderedDict({key: [metadata[key][index] for index in remaining] for key in ["names", "shapes", "dtypes"]})
+            self.plotter.plot(model_name, [weights[index] for index in remaining], remaining_metadata, [histograms[index] for index in remaining])
+
+
+    def __complete(self, statistics: dict, weight: np.ndarray, name: str, shape) -> dict:
+        """Cached statistics carry the fixed-edge histogram and the per-axis statistics configured at the
+        time they were cached, they are computed again if the current edges or axes differ"""
+        scheme = self.analyser.edge_scheme
+        if scheme is not None:
+            edges = scheme.edges(name, weight.dtype.name, shape)
+            fixed = statistics.get('fixed_histogram')
+            if fixed is None or (float(fixed.edges[0]), float(fixed.edges[-1]), fixed.counts.size) != (float(edges.low), float(edges.high), edges.bins):
+                statistics = dict(statistics, fixed_histogram = scheme.histogram(weight, name, weight.dtype.name, shape))
+        axes = self.analyser.axes
+        if axes is not None and list(statistics.get('axes', {}).keys()) != tfwda.analyse.axes.applicable(shape, axes):
+            statistics = dict(statistics, axes = tfwda.analyse.axes.describe_axes(weight, shape, self.analyser.axes))
+        return statistics
+
+
+    def __copy_plot(self, source: Optional[str], model_name: str, name: str, shape, dtype: str) -> bool:
+        """Reuses a cached plot for a weight, returns whether the plot is in place"""
+        if source is None or not os.path.exists(source):
+            return False
+        target = self.plotter.file_path(model_name, name, shape, dtype)
+        if os.path.abspath(source) != os.path.abspath(target):
+            shutil.copyfile(source, target)
+        return True
+
+
+    @staticmethod
+    def __size(model_data: dict) -> int:
+        """Number of bytes of the flattened weights of a model"""
+        return sum(weight.nbytes for weight in model_data["weights"])
+
+
     def __setup_db_connection(self, db_connection_string: str, database_name: str) -> None:
         """This method setups the database connection - pay attention: this method does
         not check whether a successful connection could be established!
@@ -192,5 +638,6 @@ class ModelStore(IFModelStore):
             database_name        : str
                 Name of the target database
         """
+        import pymongo
         self.__client   = pymongo.MongoClient(db_connection_string)
         self.__database = self.__client[database_name]
\ No newline at end of file
@@ -0,0 +1,244 @@
+import os
+import uuid
+import datetime
+import collections
+from typing import Optional
+
+
+import tfwda.analyse.drift
+import tfwda.persistence.standard
+
+
+# statistics stored as float64 columns, named like the properties of the Analyser
+STATISTIC_COLUMNS = ['min', 'max', 'mean', '25-quantile', 'median', '75-quantile', 'IQR', 'variance', 'skewness', 'kurtosis', 'MAD']
+FORMATS           = {"parquet": "parquet", "arrow": "arrow"}
+# file name prefix of every kind of table within the dataset directory
+KINDS             = {"results": "results-", "drift": "drift-"}
+
+
+def _schema(store_histograms: bool):
+    import pyarrow as pa
+    fields = [pa.field("model_name", pa.string()), pa.field("date", pa.timestamp("us")), pa.field("name", pa.string()),
+              pa.field("shape", pa.list_(pa.int64())), pa.field("dtype", pa.string())]
+    fields += [pa.field(column, pa.float64()) for column in STATISTIC_COLUMNS]
+    fields += [pa.field("modes", pa.list_(pa.float64())), pa.field("quantile_error", pa.float64()), pa.field("quantile_confidence", pa.float64())]
+    fields += [pa.field("fixed_histogram_counts", pa.list_(pa.int64())), pa.field("fixed_histogram_edges", pa.list_(pa.float64())),
+               pa.field("fixed_histogram_underflow", pa.int64()), pa.field("fixed_histogram_overflow", pa.int64())]
+    fields += [pa.field("axis_statistics", pa.list_(pa.struct([pa.field("axis", pa.int64())] +
+                                                             [pa.field(column, pa.list_(pa.float64())) for column in STATISTIC_COLUMNS])))]
+    if store_histograms:
+        fields += [pa.field("histogram_counts", pa.list_(pa.int64())), pa.field("histogram_edges", pa.list_(pa.float64()))]
+    return pa.schema(fields)
+
+
+def _drift_schema():
+    import pyarrow as pa
+    fields = [pa.field("model_name", pa.string()), pa.field("previous_model_name", pa.string()), pa.field("date", pa.timestamp("us")),
+              pa.field("name", pa.string()), pa.field("changed", pa.bool_())]
+    fields += [pa.field(column, pa.float64()) for column in tfwda.analyse.drift.DRIFT_NORMS + tfwda.analyse.drift.DRIFT_STATISTICS]
+    return pa.schema(fields)
+
+
+class ColumnarResultStore(tfwda.persistence.standard.IFResultStore):
+    """Persists the extracted properties as local columnar files, one row per weight with model name,
+    date, weight name, shape, dtype and all statistics. Every flush writes a new Parquet or Arrow IPC
+    file into `path_to_dir`, all files together form one dataset which is scanned with column
+    projection and predicate pushdown, files are memory mapped while reading. The drift of checkpoint
+    series is kept in a second dataset of `drift-` files in the same directory
+
+    Parameters
+    ----------
+        path_to_dir   : str
+            Directory of the dataset, it is created if it does not exist
+        file_format   : str
+            Either 'parquet' or 'arrow' (uncompressed Arrow IPC, which can be read zero-copy)
+        rows_per_file : int
+            Rows are buffered until this many rows are pending or `flush` is called
+
+    Methods
+    -------
+        write(model_name str, info collections.OrderedDict, store_histograms bool)
+            Buffers one row per weight of the model
+        write_drift(model_name str, previous_model_name str, drift collections.OrderedDict)
+            Buffers one drift row per weight of a step of a series
+        flush()
+            Writes all buffered rows into a new file
+        close()
+            Flushes the buffered rows
+        scan(columns list[str], filter pyarrow.compute.Expression, kind str) pyarrow.Table
+            Reads the requested columns of all rows matching the filter
+        query(query persistence.standard.Query) collections.OrderedDict
+            Numpy array per requested column of all weights matching the query
+    """
+
+
+    def __init__(self, path_to_dir: str, file_format: str = "parquet", rows_per_file: int = 100000):
+        if file_format not in FORMATS:
+            raise ValueError('The file format has to be either parquet or arrow!')
+        os.makedirs(path_to_dir, exist_ok = True)
+        self.path_to_dir   = path_to_dir
+        self.file_format   = file_format
+        self.rows_per_file = rows_per_file
+        self.__rows        = {False: [], True: []}
+        self.__drift_rows  = []
+
+
+    def write(self, model_name: str, info: collections.OrderedDict, store_histograms: bool = False) -> None:
+        """Buffers one row per weight of the model, the modes of every weight are taken from its histogram,
+        the columns of the fixed-edge histogram and the per-axis statistics are null for weights without them
+
+        Parameters
+        ----------
+            model_name       : str
+                Name of the model
+            info             : collections.OrderedDict
+                Extracted properties of the model, see `analyse.standard.Analyser.process`
+            store_histograms : bool
+                Whether the histograms of the weights are stored as well
+        """
+        date = datetime.datetime.utcnow()
+        for index, name in enumerate(info["names"]):
+            histogram = info["histograms"][index]
+            row       = {"model_name": model_name, "date": date, "name": name, "shape": list(info["shapes"][index]),
+                         "dtype": info["dtypes"][index], "modes": histogram.modes()}
+            for column in STATISTIC_COLUMNS:
+                row[column] = info[column][index]
+            row["quantile_error"]      = info["quantile_errors"][index] if "quantile_errors" in info else 0.0
+            row["quantile_confidence"] = info["quantile_confidences"][index] if "quantile_confidences" in info else 1.0
+            fixed = info["fixed_histograms"][index] if "fixed_histograms" in info else None
+            if fixed is not None:
+                row["fixed_histogram_counts"]    = fixed.counts.tolist()
+                row["fixed_histogram_edges"]     = fixed.edges.tolist()
+                row["fixed_histogram_underflow"] = fixed.underflow
+                row["fixed_histogram_overflow"]  = fixed.overflow
+            axes = info["axis_statistics"][index] if "axis_statistics" in info else None
+            if axes:
+                row["axis_statistics"] = [dict({column: statistics[column].tolist() for column in STATISTIC_COLUMNS}, axis = axis)
+                                          for axis, statistics in axes.items()]
+            if store_histograms:
+                row["histogram_counts"] = histogram.counts.tolist()
+                row["histogram_edges"]  = histogram.edges.tolist()
+            self.__rows[store_histograms].append(row)
+        self.__flush_full()
+
+
+    def write_drift(self, model_name: str, previous_model_name: str, drift: collections.OrderedDict) -> None:
+        """Buffers one drift row per weight of a step of a series
+
+        Parameters
+        ----------
+            model_name          : str
+                Name of the model, i.e. of the current step
+            previous_model_name : str
+                Name of the previous step
+            drift               : collections.OrderedDict
+                Drift of the weights, see `analyse.drift.new_drift`
+        """
+        date    = datetime.datetime.utcnow()
+        columns = [key for key in drift.keys() if key != 'names']
+        for index, name in enumerate(drift["names"]):
+            row = {"model_name": model_name, "previous_model_name": previous_model_name, "date": date, "name": name}
+            for column in columns:
+                row[column] = drift[column][index]
+            self.__drift_rows.append(row)
+        self.__flush_full()
+
+
+    def flush(self) -> None:
+        """Writes all buffered rows into new files, rows with and without histograms end up in
+        different files since their schemas differ"""
+        for store_histograms, rows in self.__rows.items():
+            self.__write_rows(rows, _schema(store_histograms), "results")
+        self.__write_rows(self.__drift_rows, _drift_schema(), "drift")
+
+
+    def close(self) -> None:
+        """Flushes the buffered rows"""
+        self.flush()
+
+
+    def scan(self, columns: Optional[list[str]] = None, filter = None, kind: str = "results"):
+        """Reads the requested columns of all rows matching the filter, only the needed columns and
+        row groups are read
+
+        Parameters
+        ----------
+            columns : list[str]
+                Columns which should be read, all columns if None
+            filter  : pyarrow.compute.Expression
+                Predicate, e.g. `pyarrow.dataset.field("model_name") == "DenseNet121"`
+            kind    : str
+                Either 'results' (statistics) or 'drift' (drift of checkpoint series)
+
+        Returns
+        -------
+            pyarrow.Table
+                Matching rows, an empty table if nothing has been written yet
+        """
+        import pyarrow.dataset
+        import pyarrow.fs
+        paths = sorted(os.path.join(self.path_to_dir, file_name) for file_name in os.listdir(self.path_to_dir)
+                       if file_name.startswith(KINDS[kind]) and file_name.endswith(f".{self.file_format}"))
+        schema = _schema(True) if kind == "results" else _drift_schema()
+        if not paths:
+            return schema.empty_table().select(columns) if columns is not None else schema.empty_table()
+        dataset = pyarrow.dataset.dataset(paths, schema = schema, format = FORMATS[self.file_format],
+                                          filesystem = pyarrow.fs.LocalFileSystem(use_mmap = True))
+        return dataset.to_table(columns = columns, filter = filter)
+
+
+    def query(self, query: tfwda.persistence.standard.Query) -> collections.OrderedDict:
+        """Numpy array per requested column of all weights matching the query, all filters including the
+        name pattern are pushed down into the scan, thus only matching rows of the requested columns are read
+
+        Parameters
+        ----------
+            query : persistence.standard.Query
+                Filters and columns, see `persistence.standard.build_query`
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset
+        conditions = []
+        if query.models is not None:
+            conditions.append(pyarrow.dataset.field("model_name").isin(list(query.models)))
+        if query.pattern is not None:
+            conditions.append(pc.match_substring_regex(pyarrow.dataset.field("name"), query.pattern))
+        if query.start is not None:
+            conditions.append(pyarrow.dataset.field("date") >= pa.scalar(query.start, pa.timestamp("us")))
+        if query.end is not None:
+            conditions.append(pyarrow.dataset.field("date") < pa.scalar(query.end, pa.timestamp("us")))
+        condition = None
+        for expression in conditions:
+            condition = expression if condition is None else condition & expression
+
+        table   = self.scan(columns = list(query.columns), filter = condition)
+        table   = table.take(pc.sort_indices(table, sort_keys = [("model_name", "ascending"), ("date", "ascending")]))
+        columns = collections.OrderedDict()
+        for column in query.columns:
+            if column in ['model_name', 'name', 'dtype', 'shape']:
+                columns[column] = table.column(column).to_pylist()
+            else:
+                columns[column] = table.column(column).to_numpy()
+        return tfwda.persistence.standard.as_columns(columns)
+
+
+    def __flush_full(self) -> None:
+        if sum(len(rows) for rows in self.__rows.values()) + len(self.__drift_rows) >= self.rows_per_file:
+            self.flush()
+
+
+    def __write_rows(self, rows: list[dict], schema, kind: str) -> None:
+        """Writes buffered rows into a new file of the given kind and empties the buffer"""
+        if not rows:
+            return
+        import pyarrow as pa
+        table = pa.Table.from_pylist(rows, schema = schema)
+        path  = os.path.join(self.path_to_dir, f"{KINDS[kind]}{uuid.uuid4().hex}.{self.file_format}")
+        if self.file_format == "parquet":
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(table, path)
+        else:
+            import pyarrow.feather
+            pyarrow.feather.write_feather(table, path, compression = "uncompressed")
+        rows.clear()
@@ -0,0 +1,450 @@
+import re
+import queue
+import threading
+import collections
+import numpy as np
+import bson
+import bson.binary
+
+
+import tfwda.persistence.standard
+
+
+PACKED_ENCODING = "float32-le"
+# indexes of the per-tensor collection, the weights of a model in the order of `query`, the latest run of a model
+# by traversing it backwards, and one weight across all models
+TENSOR_INDEXES  = [[("model_name", 1), ("date", 1), ("index", 1)], [("name", 1), ("model_name", 1), ("date", -1)]]
+# fields of the model documents which hold the columns of a query
+QUERY_FIELDS    = dict({'shape': "shapes", 'dtype': "dtypes", 'quantile_error': "quantile_errors", 'quantile_confidence': "quantile_confidences"},
+                       **tfwda.persistence.standard.STATISTIC_FIELDS)
+
+
+def pack_array(values: list) -> bson.binary.Binary:
+    """Packs a list of numbers as little-endian float32 binary
+
+    Parameters
+    ----------
+        values : list
+            Numbers which should be packed
+    """
+    return bson.binary.Binary(np.asarray(values, dtype = '<f4').tobytes())
+
+
+def unpack_array(packed: bytes) -> np.ndarray:
+    """Restores the array of a packed binary, see `pack_array`
+
+    Parameters
+    ----------
+        packed : bytes
+            Packed float32 binary
+    """
+    return np.frombuffer(packed, dtype = '<f4')
+
+
+def unpack_document(document: dict) -> dict:
+    """Turns the packed statistics of a document back into numpy arrays, documents without packed
+    arrays are returned unchanged, statistics left out by a projection stay left out
+
+    Parameters
+    ----------
+        document : dict
+            Document as it is stored in the database
+    """
+    if document.get("encoding") != PACKED_ENCODING:
+        return document
+    weights = dict(document["weights"])
+    for field in tfwda.persistence.standard.STATISTIC_FIELDS.values():
+        if field in weights:
+            weights[field] = unpack_array(weights[field])
+    if "axis_statistics" in weights:
+        weights["axis_statistics"] = [{axis: {field: unpack_array(values) for field, values in fields.items()} for axis, fields in axes.items()}
+                                      if axes is not None else None for axes in weights["axis_statistics"]]
+    return dict(document, weights = weights)
+
+
+def build_filter(query: tfwda.persistence.standard.Query, names: bool = False) -> dict:
+    """MongoDB filter of the models and the date range of a query, with `names` the name pattern is
+    part of the filter as well, which requires one document per weight
+
+    Parameters
+    ----------
+        query : persistence.standard.Query
+            Query whose filters are translated
+        names : bool
+            Whether the name pattern is matched on the field 'name'
+    """
+    condition = {}
+    if query.models is not None:
+        condition["model_name"] = {"$in": list(query.models)}
+    if query.start is not None or query.end is not None:
+        condition["date"] = {}
+        if query.start is not None:
+            condition["date"]["$gte"] = query.start
+        if query.end is not None:
+            condition["date"]["$lt"] = query.end
+    if names and query.pattern is not None:
+        condition["name"] = {"$regex": query.pattern}
+    return condition
+
+
+class MongoResultStore(tfwda.persistence.standard.IFResultStore):
+    """Persists the extracted properties into a MongoDB collection. Documents are collected and written
+    in bulk with unordered `insert_many`, optionally by a background writer thread, thus the writes
+    overlap with the analysis of the next models. Errors of the background writer are raised by the
+    next call of `write`, `flush` or `close`
+
+    Parameters
+    ----------
+        collection       : pymongo.collection.Collection
+            Target collection, any object with a compatible `insert_many`, e.g. of mongomock, works
+        batch_size       : int
+            Maximal number of documents per bulk write
+        background       : bool
+            Whether a background thread performs the writes
+        binary_arrays    : bool
+            Whether the per-weight statistics are stored as packed float32 binaries instead of lists
+            of floats, see `unpack_document`
+        max_pending      : int
+            Maximal number of documents waiting for the background writer, `write` blocks beyond
+        drift_collection : pymongo.collection.Collection
+            Collection of the drift documents of checkpoint series, by default `model_drift` of the
+            database of `collection`
+
+    Methods
+    -------
+        write(model_name str, info collections.OrderedDict, store_histograms bool)
+            Queues the document of a model
+        build_documents(model_name str, info collections.OrderedDict, store_histograms bool) list[tuple]
+            Documents of a model and their collections, subclasses change the schema here
+        write_drift(model_name str, previous_model_name str, drift collections.OrderedDict)
+            Queues the drift document of a step of a series
+        flush()
+            Blocks until all queued documents are written
+        close()
+            Flushes and stops the background writer
+        query(query persistence.standard.Query) collections.OrderedDict
+            Numpy array per requested column of all weights matching the query
+    """
+
+
+    def __init__(self, collection, batch_size: int = 64, background: bool = True, binary_arrays: bool = False, max_pending: int = 256,
+                 drift_collection = None):
+        self.collection       = collection
+        self.drift_collection = drift_collection if drift_collection is not None else collection.database["model_drift"]
+        self.batch_size       = batch_size
+        self.background       = background
+        self.binary_arrays    = binary_arrays
+        self.__pending        = []
+        self.__failed_models  = set()
+        self.__error          = None
+        self.__queue          = None
+        self.__writer         = None
+        if background:
+            self.__queue  = queue.Queue(maxsize = max_pending)
+            self.__writer = threading.Thread(target = self.__run, name = "tfwda-mongo-writer", daemon = True)
+            self.__writer.start()
+
+
+    def write(self, model_name: str, info: collections.OrderedDict, store_histograms: bool = False) -> None:
+        """Builds the document of a model and queues it for the next bulk write
+
+        Parameters
+        ----------
+            model_name       : str
+                Name of the model
+            info             : collections.OrderedDict
+                Extracted properties of the model, see `analyse.standard.Analyser.process`
+            store_histograms : bool
+                Whether the histograms of the weights should be persisted as well
+        """
+        self.__raise_error()
+        for collection, document in self.build_documents(model_name, info, store_histograms):
+            self.__put(collection, document)
+
+
+    def build_documents(self, model_name: str, info: collections.OrderedDict, store_histograms: bool = False) -> list[tuple[object, dict]]:
+        """Documents of a model and the collections they are written to, a single document per model
+        in `collection`, see `persistence.standard.build_document`
+
+        Parameters
+        ----------
+            model_name       : str
+                Name of the model
+            info             : collections.OrderedDict
+                Extracted properties of the model
+            store_histograms : bool
+                Whether the histograms of the weights should be persisted as well
+        """
+        document = tfwda.persistence.standard.build_document(model_name, info, store_histograms)
+        if self.binary_arrays:
+            for field in tfwda.persistence.standard.STATISTIC_FIELDS.values():
+                document["weights"][field] = pack_array(document["weights"][field])
+            if "axis_statistics" in document["weights"]:
+                document["weights"]["axis_statistics"] = [{axis: {field: pack_array(values) for field, values in fields.items()} for axis, fields in axes.items()}
+                                                          if axes is not None else None for axes in document["weights"]["axis_statistics"]]
+            document["encoding"] = PACKED_ENCODING
+        return [(self.collection, document)]
+
+
+    def write_drift(self, model_name: str, previous_model_name: str, drift: collections.OrderedDict) -> None:
+        """Builds the drift document of a step of a series and queues it for the next bulk write
+
+        Parameters
+        ----------
+            model_name          : str
+                Name of the model, i.e. of the current step
+            previous_model_name : str
+                Name of the previous step
+            drift               : collections.OrderedDict
+                Drift of the weights, see `analyse.drift.new_drift`
+        """
+        self.__raise_error()
+        self.__put(self.drift_collection, tfwda.persistence.standard.build_drift_document(model_name, previous_model_name, drift))
+
+
+    def flush(self) -> None:
+        """Blocks until all queued documents are written"""
+        if self.background:
+            done = threading.Event()
+            self.__queue.put(done)
+            done.wait()
+        else:
+            self.__write_pending()
+            self.__failed_models.clear()
+        self.__raise_error()
+
+
+    def close(self) -> None:
+        """Flushes and stops the background writer, the store cannot be used afterwards"""
+        if self.background and self.__writer is not None:
+            self.__queue.put(None)
+            self.__writer.join()
+            self.__writer = None
+        else:
+            self.__write_pending()
+        self.__raise_error()
+
+
+    def query(self, query: tfwda.persistence.standard.Query) -> collections.OrderedDict:
+        """Numpy array per requested column of all weights matching the query. Models and date range are
+        filtered by the server and only the names and the requested arrays of the matching documents are
+        transferred, the name pattern is applied to the names afterwards. Documents which are still
+        queued are not seen, see `flush`
+
+        Parameters
+        ----------
+            query : persistence.standard.Query
+                Filters and columns, see `persistence.standard.build_query`
+        """
+        fields     = [column for column in query.columns if column not in tfwda.persistence.standard.KEY_COLUMNS]
+        projection = dict({"_id": 0, "model_name": 1, "date": 1, "encoding": 1, "weights.names": 1},
+                          **{f"weights.{QUERY_FIELDS[column]}": 1 for column in fields})
+        pattern    = re.compile(query.pattern) if query.pattern is not None else None
+        values     = collections.OrderedDict((column, []) for column in query.columns)
+        for document in self.collection.find(build_filter(query), projection).sort([("model_name", 1), ("date", 1)]):
+            weights = unpack_document(document)["weights"]
+            for index, name in enumerate(weights["names"]):
+                if pattern is not None and not pattern.search(name):
+                    continue
+                values["model_name"].append(document["model_name"])
+                values["date"].append(document["date"])
+                values["name"].append(name)
+                for column in fields:
+                    field = weights.get(QUERY_FIELDS[column])
+                    values[column].append(field[index] if field is not None else np.nan)
+        return tfwda.persistence.standard.as_columns(values)
+
+
+    def __put(self, collection, document: dict) -> None:
+        if self.background:
+            self.__queue.put((collection, document))
+            return
+        self.__pending.append((collection, document))
+        if len(self.__pending) >= self.batch_size:
+            self.__write_pending()
+            self.__raise_error()
+
+
+    def __run(self) -> None:
+        """Loop of the background writer, documents are written once a batch is full or no further
+        document is waiting"""
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                self.__write_pending()
+                return
+            if isinstance(item, threading.Event):
+                self.__write_pending()
+                self.__failed_models.clear()
+                item.set()
+                continue
+            self.__pending.append(item)
+            if len(self.__pending) >= self.batch_size or self.__queue.empty():
+                self.__write_pending()
+
+
+    def __write_pending(self) -> None:
+        """Writes the pending documents in bulk per collection. Payloads are uploaded first and per model,
+        documents of a model whose upload failed are skipped until the next flush, thus no document
+        refers to a missing payload"""
+        if not self.__pending:
+            return
+        pending, self.__pending = self.__pending, []
+        batches = collections.OrderedDict()
+        for collection, document in pending:
+            batches.setdefault(id(collection), (collection, []))[1].append(document)
+        for writer, payloads in [batch for batch in batches.values() if isinstance(batch[0], _PayloadWriter)]:
+            models = collections.OrderedDict()
+            for payload in payloads:
+                models.setdefault(payload["metadata"]["model_name"], []).append(payload)
+            for model_name, model_payloads in models.items():
+                try:
+                    writer.insert_many(model_payloads, ordered = False)
+                except Exception as error:
+                    self.__error = error
+                    self.__failed_models.add(model_name)
+        for collection, documents in batches.values():
+            documents = [document for document in documents if document.get("model_name") not in self.__failed_models]
+            if isinstance(collection, _PayloadWriter) or not documents:
+                continue
+            try:
+                collection.insert_many(documents, ordered = False)
+            except Exception as error:
+                self.__error = error
+
+
+    def __raise_error(self) -> None:
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
+
+
+class _PayloadWriter:
+    """Uploads payloads through a GridFS bucket behind the `insert_many` of a collection, thus the background
+    writer uploads the payloads of a model in bulk and before the documents which refer to them, see
+    `MongoResultStore.__write_pending`"""
+
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+
+    def insert_many(self, payloads: list[dict], ordered: bool = False) -> None:
+        for payload in payloads:
+            self.bucket.upload_from_stream_with_id(payload["_id"], payload["filename"], payload["data"], metadata = payload["metadata"])
+
+
+class MongoTensorResultStore(MongoResultStore):
+    """Persists one document per weight instead of one document per model, see
+    `persistence.standard.build_tensor_documents`, thus no document approaches the 16 MB limit of MongoDB
+    and a weight of all models is found through an index without unpacking whole models. The indexes
+    of `TENSOR_INDEXES` are created on `collection`. Payloads, i.e. histogram, fixed-edge histogram and
+    per-axis statistics of a weight, beyond `inline_bytes` are BSON encoded into a GridFS bucket and the
+    document keeps their id under 'payload_id', smaller payloads stay in the document under 'payload'.
+    Payloads are uploaded before the documents, the documents of a model whose upload fails are not
+    written. Drift documents keep the layout of `MongoResultStore`
+
+    Parameters
+    ----------
+        collection       : pymongo.collection.Collection
+            Target collection of the weight documents
+        bucket           : gridfs.GridFSBucket
+            Bucket of the payloads, by default `<collection>_payloads` of the database of `collection`,
+            gridfs is only imported in that case
+        inline_bytes     : int
+            Payloads up to this BSON size stay in the document
+        batch_size       : int
+            Maximal number of documents per bulk write
+        background       : bool
+            Whether a background thread performs the writes
+        max_pending      : int
+            Maximal number of documents waiting for the background writer
+        drift_collection : pymongo.collection.Collection
+            Collection of the drift documents of checkpoint series
+
+    Methods
+    -------
+        create_indexes()
+            Creates the indexes of `TENSOR_INDEXES`, existing indexes are kept
+        load_payload(document dict) dict
+            Payload of a weight document, read from GridFS if it was moved there
+        query(query persistence.standard.Query) collections.OrderedDict
+            Numpy array per requested column of all weights matching the query
+    """
+
+
+    def __init__(self, collection, bucket = None, inline_bytes: int = 4096, batch_size: int = 512, background: bool = True, max_pending: int = 4096,
+                 drift_collection = None):
+        super().__init__(collection, batch_size = batch_size, background = background, max_pending = max_pending, drift_collection = drift_collection)
+        if bucket is None:
+            import gridfs
+            bucket = gridfs.GridFSBucket(collection.database, bucket_name = f"{collection.name}_payloads")
+        self.bucket       = bucket
+        self.inline_bytes = inline_bytes
+        self.__payloads   = _PayloadWriter(bucket)
+        self.create_indexes()
+
+
+    def create_indexes(self) -> None:
+        """Creates the indexes of `TENSOR_INDEXES`, existing indexes are kept"""
+        for keys in TENSOR_INDEXES:
+            self.collection.create_index(keys)
+
+
+    def build_documents(self, model_name: str, info: collections.OrderedDict, store_histograms: bool = False) -> list[tuple[object, dict]]:
+        """One document per weight in `collection`, preceded by the payloads which go to GridFS
+
+        Parameters
+        ----------
+            model_name       : str
+                Name of the model
+            info             : collections.OrderedDict
+                Extracted properties of the model
+            store_histograms : bool
+                Whether the histograms of the weights should be persisted as well
+        """
+        payloads, documents = [], []
+        for document in tfwda.persistence.standard.build_tensor_documents(model_name, info, store_histograms):
+            payload = document.pop("payload")
+            if payload:
+                encoded = bson.encode(payload)
+                if len(encoded) > self.inline_bytes:
+                    document["payload_id"] = bson.ObjectId()
+                    payloads.append((self.__payloads, {'_id': document["payload_id"], 'filename': f"{model_name}/{document['name']}", 'data': encoded,
+                                                       'metadata': {'model_name': model_name, 'name': document["name"]}}))
+                else:
+                    document["payload"] = payload
+            documents.append((self.collection, document))
+        return payloads + documents
+
+
+    def load_payload(self, document: dict) -> dict:
+        """Payload of a weight document with the keys 'histogram', 'fixed_histogram' and 'axis_statistics'
+        if the weight has them, see `persistence.standard.build_tensor_documents`
+
+        Parameters
+        ----------
+            document : dict
+                Weight document as it is stored, with 'payload' or 'payload_id'
+        """
+        if "payload_id" in document:
+            return bson.decode(self.bucket.open_download_stream(document["payload_id"]).read())
+        return document.get("payload", {})
+
+
+    def query(self, query: tfwda.persistence.standard.Query) -> collections.OrderedDict:
+        """Numpy array per requested column of all weights matching the query, every filter including the
+        name pattern is evaluated by the server along the indexes of `TENSOR_INDEXES` and only the requested
+        fields are transferred
+
+        Parameters
+        ----------
+            query : persistence.standard.Query
+                Filters and columns, see `persistence.standard.build_query`
+        """
+        projection = dict({"_id": 0}, **{column: 1 for column in query.columns})
+        values     = collections.OrderedDict((column, []) for column in query.columns)
+        for document in self.collection.find(build_filter(query, names = True), projection).sort([("model_name", 1), ("date", 1), ("index", 1)]):
+            for column in query.columns:
+                values[column].append(document.get(column, np.nan))
+        return tfwda.persistence.standard.as_columns(values)
@@ -0,0 +1,325 @@
+import abc
+import collections
+import datetime
+import numpy as np
+from abc import abstractmethod
+from typing import NamedTuple, Optional, Sequence, Union
+
+
+import tfwda.analyse.aggregate
+
+
+# property names of the Analyser and the field names they are stored with
+STATISTIC_FIELDS = collections.OrderedDict({'min': "minima", 'max': "maxima", 'mean': "means", '25-quantile': "25_quantiles", 'median': "medians",
+                                            '75-quantile': "75_quantiles", 'IQR': "IQRs", 'mode': "modes", 'variance': "variances",
+                                            'skewness': "skewness", 'kurtosis': "kurtosis", 'MAD': "MADs"})
+# columns every query returns, they identify a weight of a stored model
+KEY_COLUMNS      = ['model_name', 'date', 'name']
+# columns a query can return, named like the columns of `persistence.columnar.ColumnarResultStore`
+QUERY_COLUMNS    = KEY_COLUMNS + ['shape', 'dtype'] + [property_name for property_name in STATISTIC_FIELDS.keys() if property_name != 'mode'] + \
+                   ['quantile_error', 'quantile_confidence']
+
+
+class Query(NamedTuple):
+    """Query on the stored statistics, one row per weight of every stored model which passes all
+    filters, filters which are None accept everything. A query is hashable, thus it can key a cache
+
+    Attributes
+    ----------
+        models  : tuple[str]
+            Names of the models
+        pattern : str
+            Regular expression which has to match somewhere in the weight name, e.g. 'conv2_block\\d+_1_conv'
+        start   : datetime.datetime
+            Earliest date of the stored models, inclusive
+        end     : datetime.datetime
+            Latest date of the stored models, exclusive
+        columns : tuple[str]
+            Columns out of `QUERY_COLUMNS`, starting with the `KEY_COLUMNS`
+    """
+    models  : Optional[tuple]
+    pattern : Optional[str]
+    start   : Optional[datetime.datetime]
+    end     : Optional[datetime.datetime]
+    columns : tuple
+
+
+def build_query(models: Optional[Union[str, Sequence[str]]] = None, pattern: Optional[str] = None, start: Optional[datetime.datetime] = None,
+                end: Optional[datetime.datetime] = None, columns: Optional[Sequence[str]] = None) -> Query:
+    """Normalizes the filters of a query, equal filters give equal queries
+
+    Parameters
+    ----------
+        models  : str | Sequence[str]
+            Name or names of the models
+        pattern : str
+            Regular expression on the weight names
+        start   : datetime.datetime
+            Earliest date, inclusive
+        end     : datetime.datetime
+            Latest date, exclusive
+        columns : Sequence[str]
+            Requested columns, all `QUERY_COLUMNS` if None, the `KEY_COLUMNS` are always returned
+
+    Raises
+    ------
+        ValueError
+            Is triggered when a column is not one of `QUERY_COLUMNS`
+    """
+    columns = QUERY_COLUMNS if columns is None else list(columns)
+    unknown = [column for column in columns if column not in QUERY_COLUMNS]
+    if unknown:
+        raise ValueError(f'Unknown columns {unknown}, the columns have to be out of {QUERY_COLUMNS}!')
+    if isinstance(models, str):
+        models = [models]
+    return Query(tuple(models) if models is not None else None, pattern, start, end,
+                 tuple(KEY_COLUMNS + [column for column in columns if column not in KEY_COLUMNS]))
+
+
+def as_columns(values: dict) -> collections.OrderedDict:
+    """Turns lists of values per column into numpy arrays, names and dtypes become unicode arrays,
+    dates `datetime64[us]`, shapes object arrays of tuples and statistics float64
+
+    Parameters
+    ----------
+        values : dict
+            List of values per column, every list has one value per row
+    """
+    columns = collections.OrderedDict()
+    for column, column_values in values.items():
+        if column in ['model_name', 'name', 'dtype']:
+            columns[column] = np.array(column_values, dtype = str) if column_values else np.empty(0, dtype = "U1")
+        elif column == 'date':
+            columns[column] = np.array(column_values, dtype = "datetime64[us]")
+        elif column == 'shape':
+            columns[column] = np.empty(len(column_values), dtype = object)
+            columns[column][:] = [tuple(shape) for shape in column_values]
+        else:
+            columns[column] = np.array(column_values, dtype = np.float64)
+    return columns
+
+
+def to_records(columns: dict) -> np.recarray:
+    """Record array of the columns of a query result, e.g. `records['kurtosis'][records.name == 'dense/kernel:0']`,
+    columns which collide with attributes of arrays like 'shape' are only reachable by indexing
+
+    Parameters
+    ----------
+        columns : dict
+            Numpy array per column, see `as_columns`
+    """
+    return np.rec.fromarrays(list(columns.values()), names = list(columns.keys()))
+
+
+def to_frame(columns: dict):
+    """pandas.DataFrame of the columns of a query result, pandas is only imported here
+
+    Parameters
+    ----------
+        columns : dict
+            Numpy array per column, see `as_columns`
+    """
+    import pandas as pd
+    return pd.DataFrame(columns)
+
+
+class IFResultStore(metaclass = abc.ABCMeta):
+    """Interface for every result store, a result store persists the extracted
+    properties of the models
+
+    Methods (abstract)
+    ------------------
+        write(model_name str, info collections.OrderedDict, store_histograms bool)
+            Persists the extracted properties of a model
+        write_drift(model_name str, previous_model_name str, drift collections.OrderedDict)
+            Persists the drift of the weights of a model since the previous step of a series
+        flush()
+            Blocks until everything written so far is persisted
+        close()
+            Flushes and releases all resources
+        query(query Query) collections.OrderedDict
+            Reads the requested columns of all weights matching the query
+    """
+
+
+    @abstractmethod
+    def write(self, model_name: str, info: collections.OrderedDict, store_histograms: bool = False) -> None:
+        """Persists the extracted properties of a model
+
+        Parameters
+        ----------
+            model_name       : str
+                Name of the model
+            info             : collections.OrderedDict
+                Extracted properties of the model, see `analyse.standard.Analyser.process`
+            store_histograms : bool
+                Whether the histograms of the weights should be persisted as well
+        """
+        pass
+
+
+    @abstractmethod
+    def write_drift(self, model_name: str, previous_model_name: str, drift: collections.OrderedDict) -> None:
+        """Persists the drift of the weights of a model since the previous step of a series
+
+        Parameters
+        ----------
+            model_name          : str
+                Name of the model, i.e. of the current step
+            previous_model_name : str
+                Name of the previous step
+            drift               : collections.OrderedDict
+                Drift of the weights, see `analyse.drift.new_drift`
+        """
+        pass
+
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Blocks until everything written so far is persisted"""
+        pass
+
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flushes and releases all resources"""
+        pass
+
+
+    @abstractmethod
+    def query(self, query: Query) -> collections.OrderedDict:
+        """Reads the requested columns of all weights matching the query, filters are evaluated by the
+        backend wherever it can, only the requested columns are transferred
+
+        Parameters
+        ----------
+            query : Query
+                Filters and columns, see `build_query`
+
+        Returns
+        -------
+            collections.OrderedDict
+                Numpy array per column in the order of `query.columns`, see `as_columns`, rows are ordered
+                by model, date and position of the weight within its model
+        """
+        pass
+
+
+def build_document(model_name: str, info: collections.OrderedDict, store_histograms: bool = False) -> dict:
+    """Builds the document of a model out of its extracted properties, the statistics are stored as
+    parallel arrays over the weights of the model, next to the rank error bound of the quantiles of
+    every weight which is 0 unless the weight was described approximately. Fixed-edge histograms are
+    always stored since they are small, together with their aggregates per layer type, block and model,
+    as well as per-axis statistics if the weights were described along axes
+
+    Parameters
+    ----------
+        model_name       : str
+            Name of the model
+        info             : collections.OrderedDict
+            Extracted properties of the model, see `analyse.standard.Analyser.process`
+        store_histograms : bool
+            Whether the histograms of the weights are part of the document
+    """
+    weights = {"names": info["names"], "shapes": info["shapes"], "dtypes": info["dtypes"]}
+    for property_name, field in STATISTIC_FIELDS.items():
+        weights[field] = info[property_name]
+    weights["quantile_errors"]      = info.get("quantile_errors", [0.0] * len(info["names"]))
+    weights["quantile_confidences"] = info.get("quantile_confidences", [1.0] * len(info["names"]))
+    if store_histograms:
+        weights["histograms"] = [histogram.to_document() for histogram in info["histograms"]]
+    document = {
+        "model_name": model_name,
+        "date": datetime.datetime.utcnow(),
+        "weights": weights
+    }
+
+    fixed_histograms = info.get("fixed_histograms", [])
+    if any(histogram is not None for histogram in fixed_histograms):
+        weights["fixed_histograms"] = [histogram.to_document() if histogram is not None else None for histogram in fixed_histograms]
+        document["aggregates"]      = tfwda.analyse.aggregate.aggregate_model(info["names"], info["shapes"], fixed_histograms)
+    axis_statistics = info.get("axis_statistics", [])
+    if any(axes for axes in axis_statistics):
+        weights["axis_statistics"] = [build_axis_document(axes) if axes else None for axes in axis_statistics]
+    return document
+
+
+def build_axis_document(axes: dict) -> dict:
+    """Per-axis statistics of a weight in the layout they are stored in, one list per statistic and
+    axis under the field names of the statistics, the axes are keys like "-1"
+
+    Parameters
+    ----------
+        axes : dict
+            Statistics per axis, see `analyse.axes.describe_axes`
+    """
+    return {str(axis): {STATISTIC_FIELDS[statistic]: values.tolist() for statistic, values in statistics.items()}
+            for axis, statistics in axes.items()}
+
+
+def build_tensor_documents(model_name: str, info: collections.OrderedDict, store_histograms: bool = False) -> list[dict]:
+    """Builds one document per weight of a model out of its extracted properties, the alternative to
+    `build_document` for models whose parallel arrays grow too large. Every document holds the statistics
+    of its weight as scalars, named like the properties of the Analyser and the columns of
+    `persistence.columnar.ColumnarResultStore`. Histogram, fixed-edge histogram and per-axis statistics
+    are collected under 'payload', a store may move the payload out of the document
+
+    Parameters
+    ----------
+        model_name       : str
+            Name of the model
+        info             : collections.OrderedDict
+            Extracted properties of the model, see `analyse.standard.Analyser.process`
+        store_histograms : bool
+            Whether the histograms of the weights are part of the payloads
+    """
+    date      = datetime.datetime.utcnow()
+    documents = []
+    for index, name in enumerate(info["names"]):
+        histogram = info["histograms"][index]
+        document  = {"model_name": model_name, "date": date, "name": name, "index": index, "shape": list(info["shapes"][index]),
+                     "dtype": info["dtypes"][index]}
+        for property_name in STATISTIC_FIELDS.keys():
+            if property_name != 'mode':
+                document[property_name] = info[property_name][index]
+        document["modes"]               = histogram.modes()
+        document["quantile_error"]      = info["quantile_errors"][index] if "quantile_errors" in info else 0.0
+        document["quantile_confidence"] = info["quantile_confidences"][index] if "quantile_confidences" in info else 1.0
+
+        payload = {}
+        if store_histograms:
+            payload["histogram"] = histogram.to_document()
+        fixed = info["fixed_histograms"][index] if "fixed_histograms" in info else None
+        if fixed is not None:
+            payload["fixed_histogram"] = fixed.to_document()
+        axes = info["axis_statistics"][index] if "axis_statistics" in info else None
+        if axes:
+            payload["axis_statistics"] = build_axis_document(axes)
+        document["payload"] = payload
+        documents.append(document)
+    return documents
+
+
+def build_drift_document(model_name: str, previous_model_name: str, drift: collections.OrderedDict) -> dict:
+    """Builds the drift document of a step of a series, the changes of the statistics are stored
+    under the field names of the statistics
+
+    Parameters
+    ----------
+        model_name          : str
+            Name of the model, i.e. of the current step
+        previous_model_name : str
+            Name of the previous step
+        drift               : collections.OrderedDict
+            Drift of the weights, see `analyse.drift.new_drift`
+    """
+    weights = {}
+    for key, values in drift.items():
+        weights[STATISTIC_FIELDS.get(key, key)] = values
+
+    return {
+        "model_name": model_name,
+        "previous_model_name": previous_model_name,
+        "date": datetime.datetime.utcnow(),
+        "drift": weights
+    }
@@ -0,0 +1,183 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+
+import tfwda.utils.errors
+
+
+# marks the end of the items of a queue, every consumer of a queue receives one
+_END           = object()
+# returned by a get of a cancelled pipeline
+_CANCELLED     = object()
+# seconds a blocked put or get waits before it checks for cancellation
+_POLL_INTERVAL = 0.05
+
+
+class Stage(NamedTuple):
+    """A step of a pipeline
+
+    Attributes
+    ----------
+        name     : str
+            Name of the stage, used in errors
+        function : Callable
+            Turns an item into the item of the next stage, the return value of the last stage is collected
+        workers  : int
+            Number of threads running the stage, with more than one worker the order of the items is
+            not preserved
+    """
+    name     : str
+    function : Callable[[Any], Any]
+    workers  : int = 1
+
+
+class Pipeline:
+    """Runs stages concurrently, every stage in its own threads, connected by bounded queues. A stage
+    which is ahead blocks as soon as the queue to the next stage is full, thus at most `capacity`
+    items wait between two stages and memory stays bounded. The end-to-end time approaches the time
+    of the slowest stage as long as the stages release the GIL, e.g. numpy, file or network I/O
+
+    The first error of any stage cancels the pipeline, all threads stop and `run` raises a
+    `utils.errors.PipelineError` with the error as its cause. `cancel` stops the pipeline from
+    another thread, `run` raises a `utils.errors.PipelineCancelledError` then
+
+    Parameters
+    ----------
+        stages   : list[Stage]
+            Stages in the order the items pass them
+        capacity : int
+            Maximal number of items waiting between two stages
+
+    Methods
+    -------
+        run(items Iterable) list
+            Feeds the items through all stages and returns the results of the last stage
+        cancel()
+            Stops the pipeline
+    """
+
+
+    def __init__(self, stages: list[Stage], capacity: int = 2):
+        if not stages:
+            raise ValueError('A pipeline needs at least one stage!')
+        if capacity < 1:
+            raise ValueError('The capacity has to be at least 1!')
+        self.stages      = stages
+        self.capacity    = capacity
+        self.__cancelled = threading.Event()
+        self.__lock      = threading.Lock()
+        self.__error     = None
+
+
+    def run(self, items: Iterable) -> list:
+        """Feeds the items through all stages
+
+        Parameters
+        ----------
+            items : Iterable
+                Items of the first stage, they are consumed lazily by a feeder thread
+
+        Returns
+        -------
+            list
+                Results of the last stage, in the order of the items if every stage has a single worker
+        """
+        self.__cancelled.clear()
+        self.__error = None
+        queues       = [queue.Queue(maxsize = self.capacity) for _ in range(len(self.stages) + 1)]
+        results      = []
+        consumers    = [stage.workers for stage in self.stages] + [1]
+        threads      = [threading.Thread(target = self.__feed, args = (items, queues[0], consumers[0]), name = "tfwda-pipeline-feeder", daemon = True)]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(target = self.__work, args = (stage, queues[index], queues[index + 1], remaining, consumers[index + 1]),
+                                                name = f"tfwda-pipeline-{stage.name}-{worker}", daemon = True))
+        for thread in threads:
+            thread.start()
+
+        while True:
+            item = self.__get(queues[-1])
+            if item is _END or item is _CANCELLED:
+                break
+            results.append(item)
+        for thread in threads:
+            thread.join()
+
+        if self.__error is not None:
+            stage, error = self.__error
+            raise tfwda.utils.errors.PipelineError(f"The stage {stage} failed: {error!r}", stage) from error
+        if self.__cancelled.is_set():
+            raise tfwda.utils.errors.PipelineCancelledError("The pipeline has been cancelled!")
+        return results
+
+
+    def cancel(self) -> None:
+        """Stops the pipeline, items which are processed at the moment are finished, the rest is dropped"""
+        self.__cancelled.set()
+
+
+    def __feed(self, items: Iterable, output: queue.Queue, consumers: int) -> None:
+        try:
+            for item in items:
+                if not self.__put(output, item):
+                    return
+        except BaseException as error:
+            self.__fail("feeder", error)
+            return
+        for _ in range(consumers):
+            self.__put(output, _END)
+
+
+    def __work(self, stage: Stage, input: queue.Queue, output: queue.Queue, remaining: list, consumers: int) -> None:
+        """Loop of a worker thread, the last worker of a stage hands an end marker to every consumer
+        of the next stage"""
+        while True:
+            item = self.__get(input)
+            if item is _CANCELLED:
+                return
+            if item is _END:
+                break
+            try:
+                result = stage.function(item)
+            except BaseException as error:
+                self.__fail(stage.name, error)
+                return
+            if not self.__put(output, result):
+                return
+
+        with self.__lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(consumers):
+                self.__put(output, _END)
+
+
+    def __put(self, output: queue.Queue, item) -> bool:
+        """Puts an item unless the pipeline is cancelled, returns whether the item was put"""
+        while not self.__cancelled.is_set():
+            try:
+                output.put(item, timeout = _POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+    def __get(self, input: queue.Queue) -> Optional[Any]:
+        """Gets an item, returns `_CANCELLED` if the pipeline is cancelled"""
+        while not self.__cancelled.is_set():
+            try:
+                return input.get(timeout = _POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _CANCELLED
+
+
+    def __fail(self, stage: str, error: BaseException) -> None:
+        with self.__lock:
+            if self.__error is None:
+                self.__error = (stage, error)
+        self.__cancelled.set()
@@ -0,0 +1,216 @@
+import collections
+import concurrent.futures
+import numpy as np
+from typing import Optional, Sequence
+
+
+import tfwda.analyse.histogram
+import tfwda.analyse.kernels
+import tfwda.logger.standard
+import tfwda.plotter.standard
+
+
+def render_histogram(counts: np.ndarray, edges: np.ndarray, title: str, path: str, dpi: int = 100) -> str:
+    """Draws an already binned histogram with matplotlib's Agg canvas and writes it as PNG. The
+    figure is created without pyplot, thus no global state is involved and this function can
+    be run by any worker
+
+    Parameters
+    ----------
+        counts : np.ndarray
+            Bin frequencies
+        edges  : np.ndarray
+            Bin edges, one more than `counts`
+        title  : str
+            Title of the plot
+        path   : str
+            Location of the PNG file
+        dpi    : int
+            Resolution of the PNG file
+
+    Returns
+    -------
+        str
+            Location of the PNG file
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize = (8, 5))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.stairs(counts, edges, fill = True)
+    axes.set_xlabel("Weights")
+    axes.set_ylabel("Frequency")
+    axes.set_title(title)
+    figure.savefig(path, dpi = dpi, format = "png")
+    return path
+
+
+class RasterPlotter(tfwda.plotter.standard.Plotter):
+    """High-throughput variant of the Plotter, weights are binned with numpy and only the bin
+    counts and edges are handed to a pool of workers which render the histograms with matplotlib's
+    Agg backend. File names and the output directory are the same as for the Plotter
+
+    Parameters
+    ----------
+        logger      : logger.standard.Logger
+            Logger instance
+        path_to_dir : str
+            Directory where the plots are stored to
+        workers     : int
+            Number of rendering processes, with a single worker the plots are rendered in process
+        max_bins    : int
+            Upper bound of the number of bins of a plot, finer histograms, e.g. of the Analyser, are
+            coarsened by merging neighbouring bins
+        dpi         : int
+            Resolution of the plots
+
+    Methods
+    -------
+        plot(model_name str, flattened_weight list[np.ndarray], metadata collections.OrderedDict, histograms list[Histogram])
+            Bins all weights of a model, unless their histograms are given, and renders them on the worker pool
+        plot_weight(model_name str, weight np.ndarray, name str, shape Sequence, dtype str, histogram Histogram)
+            Bins and renders a single weight in process
+        plot_histogram(model_name str, histogram Histogram, name str, shape Sequence, dtype str)
+            Renders an already binned weight in process
+        bin(weight np.ndarray) tuple[np.ndarray, np.ndarray]
+            Bins a weight with the 'auto' estimator, capped at `max_bins`
+        coarsen(histogram Histogram) tuple[np.ndarray, np.ndarray]
+            Merges neighbouring bins of a histogram until at most `max_bins` are left
+        close()
+            Shuts the worker pool down
+    """
+
+
+    def __init__(self, logger: tfwda.logger.standard.Logger, path_to_dir: str, workers: int = 1, max_bins: int = 256, dpi: int = 100):
+        super().__init__(logger, path_to_dir)
+        if workers < 1:
+            raise ValueError('The number of workers has to be at least 1!')
+        self.workers    = workers
+        self.max_bins   = max_bins
+        self.dpi        = dpi
+        self.__executor = None
+
+
+    def plot(self, model_name: str, flattened_weight: list[np.ndarray], metadata: collections.OrderedDict,
+             histograms: Optional[list[tfwda.analyse.histogram.Histogram]] = None) -> None:
+        """Bins all weights of a model and renders them, on the worker pool if there is more than
+        one worker
+
+        Parameters
+        ----------
+            model_name       : str
+                Name of the model
+            flattened_weight : list[np.ndarray]
+                The flattened weights of the model
+            metadata         : collections.OrderedDict
+                Metadata of the weights
+            histograms       : list[analyse.histogram.Histogram]
+                Histograms of the weights, if given the weights are not binned again
+        """
+        if self.workers == 1:
+            super().plot(model_name, flattened_weight, metadata, histograms)
+            return
+
+        if histograms is None:
+            histograms = [None] * len(flattened_weight)
+        executor = self.__get_executor()
+        futures  = []
+        for weight, name, shape, dtype, histogram in zip(flattened_weight, metadata['names'], metadata['shapes'], metadata['dtypes'], histograms):
+            counts, edges = self.bin(weight) if histogram is None else self.coarsen(histogram)
+            futures.append(executor.submit(render_histogram, counts, edges, name, self.file_path(model_name, name, shape, dtype), self.dpi))
+        for future in futures:
+            future.result()
+
+
+    def plot_weight(self, model_name: str, weight: np.ndarray, name: str, shape: Sequence, dtype: str,
+                    histogram: Optional[tfwda.analyse.histogram.Histogram] = None) -> None:
+        """Bins and renders a single weight in process
+
+        Parameters
+        ----------
+            model_name : str
+                Name of the model
+            weight     : np.ndarray
+                The flattened weight
+            name       : str
+                Name of the weight
+            shape      : Sequence
+                Shape of the weight
+            dtype      : str
+                Dtype of the weight
+            histogram  : analyse.histogram.Histogram
+                Histogram of the weight, if given the weight is not binned again
+        """
+        counts, edges = self.bin(weight) if histogram is None else self.coarsen(histogram)
+        render_histogram(counts, edges, name, self.file_path(model_name, name, shape, dtype), self.dpi)
+
+
+    def plot_histogram(self, model_name: str, histogram: tfwda.analyse.histogram.Histogram, name: str, shape: Sequence, dtype: str) -> None:
+        """Renders an already binned weight in process
+
+        Parameters
+        ----------
+            model_name : str
+                Name of the model
+            histogram  : analyse.histogram.Histogram
+                Histogram of the weight
+            name       : str
+                Name of the weight
+            shape      : Sequence
+                Shape of the weight
+            dtype      : str
+                Dtype of the weight
+        """
+        counts, edges = self.coarsen(histogram)
+        render_histogram(counts, edges, name, self.file_path(model_name, name, shape, dtype), self.dpi)
+
+
+    def bin(self, weight: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Bins a weight with the 'auto' estimator of `analyse.kernels.auto_bin_count`, at most `max_bins`
+        bins are used. Range and quartiles come out of a single partition, no edges are computed
+        before the bin count is capped
+
+        Parameters
+        ----------
+            weight : np.ndarray
+                The flattened weight
+        """
+        weight = tfwda.analyse.kernels.as_numeric(weight)
+        if weight.size == 0:
+            return np.histogram(weight, bins = 1, range = (0.0, 1.0))
+        minimum, maximum, (lower_quartile, _, upper_quartile) = tfwda.analyse.kernels.order_statistics(weight)
+        bin_count = tfwda.analyse.kernels.auto_bin_count(weight.size, minimum, maximum, upper_quartile - lower_quartile,
+                                                         np.issubdtype(weight.dtype, np.integer))
+        return np.histogram(weight, bins = min(bin_count, self.max_bins), range = tfwda.analyse.kernels.histogram_range(minimum, maximum))
+
+
+    def coarsen(self, histogram: tfwda.analyse.histogram.Histogram) -> tuple[np.ndarray, np.ndarray]:
+        """Merges groups of neighbouring bins until at most `max_bins` bins are left, the counts stay exact
+        since only whole bins are merged
+
+        Parameters
+        ----------
+            histogram : analyse.histogram.Histogram
+                Histogram of the weight, e.g. of the Analyser
+        """
+        counts, edges = histogram
+        if counts.size <= self.max_bins:
+            return counts, edges
+        factor = -(-counts.size // self.max_bins)
+        merged = np.add.reduceat(counts, np.arange(0, counts.size, factor))
+        return merged, np.append(edges[:-1:factor], edges[-1])
+
+
+    def close(self) -> None:
+        """Shuts the worker pool down, a later call of `plot` starts a new one"""
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+
+    def __get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self.__executor is None:
+            self.__executor = concurrent.futures.ProcessPoolExecutor(max_workers = self.workers)
+        return self.__executor
@@ -2,14 +2,11 @@ import abc
 import os
 import collections
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
 from abc import abstractmethod
-from typing import Callable, Sequence
+from typing import Callable, Optional, Sequence
 
 
+import tfwda.analyse.histogram
 import tfwda.logger.standard
 
 
@@ -18,13 +15,14 @@ class IFPlotter(metaclass = abc.ABCMeta):
     
     Methods (abstract)
     ------------------
-        plot(model_name str, flattened_weight list[np.ndarray], metadata collections.OrderedDict)
+        plot(model_name str, flattened_weight list[np.ndarray], metadata collections.OrderedDict, histograms list[Histogram])
             Responsible for plotting
     """
 
 
     @abstractmethod
-    def plot(self, model_name: str, flattened_weight: list[np.ndarray], metadata: collections.OrderedDict):
+    def plot(self, model_name: str, flattened_weight: list[np.ndarray], metadata: collections.OrderedDict,
+             histograms: Optional[list[tfwda.analyse.histogram.Histogram]] = None):
         """Plotting the flattened model weights
         
         Parameters
@@ -35,6 +33,9 @@ class IFPlotter(metaclass = abc.ABCMeta):
                 Flattened weights of the model
             metadata         : collections.OrderedDict
                 Metadata of the weights
+            histograms       : list[analyse.histogram.Histogram]
+                Histograms of the weights as the Analyser computed them, if given the weights are
+                not binned again
         """
         pass
 
@@ -48,6 +49,17 @@ class Plotter(IFPlotter):
             Logger instance
         path_to_dir : str
             Directory where the plots are stored to
+
+    Methods
+    -------
+        plot(model_name str, flattened_weight list[np.ndarray], metadata collections.OrderedDict, histograms list[Histogram])
+            Plots all weights of a model
+        plot_weight(model_name str, weight np.ndarray, name str, shape Sequence, dtype str, histogram Histogram)
+            Plots a single weight
+        plot_histogram(model_name str, histogram Histogram, name str, shape Sequence, dtype str)
+            Plots an already binned weight, e.g. a histogram restored from the database
+        file_path(model_name str, name str, shape Sequence, dtype str) str
+            Location of the plot of a weight
     """
 
 
@@ -62,7 +74,8 @@ class Plotter(IFPlotter):
         self.path_to_dir = path_to_dir
     
     
-    def plot(self, model_name: str, flattened_weight: list[np.ndarray], metadata: collections.OrderedDict) -> None:
+    def plot(self, model_name: str, flattened_weight: list[np.ndarray], metadata: collections.OrderedDict,
+             histograms: Optional[list[tfwda.analyse.histogram.Histogram]] = None) -> None:
         """Plotting the weights and storing these to the location given by `path_to_dir`
         
         Parameters
@@ -73,14 +86,83 @@ class Plotter(IFPlotter):
                 The flattened weights of the model
             metadata : collections.OrderedDict
                 Metdata of the weights
+            histograms : list[analyse.histogram.Histogram]
+                Histograms of the weights, if given the weights are not binned again
+        """
+        if histograms is None:
+            histograms = [None] * len(flattened_weight)
+        for weight, name, shape, dtype, histogram in zip(flattened_weight, metadata['names'], metadata['shapes'], metadata['dtypes'], histograms):
+            self.plot_weight(model_name, weight, name, shape, dtype, histogram)
+
+
+    def plot_weight(self, model_name: str, weight: np.ndarray, name: str, shape: Sequence, dtype: str,
+                    histogram: Optional[tfwda.analyse.histogram.Histogram] = None) -> None:
+        """Plotting a single weight and storing it to the location given by `path_to_dir`
+
+        Parameters
+        ----------
+            model_name : str
+                Name of the model
+            weight     : np.ndarray
+                The flattened weight
+            name       : str
+                Name of the weight
+            shape      : Sequence
+                Shape of the weight
+            dtype      : str
+                Dtype of the weight
+            histogram  : analyse.histogram.Histogram
+                Histogram of the weight, if given the weight is not binned again
+        """
+        if histogram is not None:
+            self.plot_histogram(model_name, histogram, name, shape, dtype)
+            return
+        import pandas as pd
+        import plotly.express as px
+        df  = pd.DataFrame({'weight': weight})
+        fig = px.histogram(df, x = "weight", labels = {'x': "Weights", 'y': "Frequency"})
+        fig.write_image(self.file_path(model_name, name, shape, dtype))
+
+
+    def plot_histogram(self, model_name: str, histogram: tfwda.analyse.histogram.Histogram, name: str, shape: Sequence, dtype: str) -> None:
+        """Plotting an already binned weight, no access to the weight itself is needed
+
+        Parameters
+        ----------
+            model_name : str
+                Name of the model
+            histogram  : analyse.histogram.Histogram
+                Histogram of the weight
+            name       : str
+                Name of the weight
+            shape      : Sequence
+                Shape of the weight
+            dtype      : str
+                Dtype of the weight
+        """
+        import plotly.graph_objects as go
+        fig = go.Figure(go.Bar(x = histogram.centres(), y = histogram.counts, width = np.diff(histogram.edges)))
+        fig.update_layout(xaxis_title = "Weights", yaxis_title = "Frequency", bargap = 0)
+        fig.write_image(self.file_path(model_name, name, shape, dtype))
+
+
+    def file_path(self, model_name: str, name: str, shape: Sequence, dtype: str) -> str:
+        """Location of the plot of a weight within `path_to_dir`
+
+        Parameters
+        ----------
+            model_name : str
+                Name of the model
+            name       : str
+                Name of the weight
+            shape      : Sequence
+                Shape of the weight
+            dtype      : str
+                Dtype of the weight
         """
-        for weight, name, shape, dtype in zip(flattened_weight, metadata['names'], metadata['shapes'], metadata['dtypes']):
-            df  = pd.DataFrame({'weight': weight})
-            fig = px.histogram(df, x = "weight", labels = {'x': "Weights", 'y': "Frequency"})
-            
-            name = name.replace("/", "_")
-            name = name.replace(":", "_")
-            fig.write_image(f"{self.path_to_dir}/{model_name}_{name}_{shape}_{dtype}.png")
+        name = name.replace("/", "_")
+        name = name.replace(":", "_")
+        return f"{self.path_to_dir}/{model_name}_{name}_{shape}_{dtype}.png"
 
 
     @staticmethod
@@ -94,6 +176,8 @@ class Plotter(IFPlotter):
                 A layer of a neural network contains N weights,
                 these weights are given as a list of values
         """
+        import pandas as pd
+        import plotly.express as px
         df  = pd.DataFrame({'weight': weight})
         fig = px.histogram(df, x = "weight", labels = {'x': "Weights", 'y': "Frequency"})
         fig.show()
@@ -115,6 +199,7 @@ class Plotter(IFPlotter):
             popt   : Sequence
                 The fit parameters
         """
+        import matplotlib.pyplot as plt
         x       = np.linspace(np.min(weight), np.max(weight), 1000)
         fig, ax = plt.subplots(figsize = (10, 6))
         ax.hist(x = weight, bins = number_of_bins, label = "Weight Distribution")
@@ -2,10 +2,10 @@ import abc
 import numpy as np
 import collections
 from abc import abstractmethod
-from typing import Tuple
+from typing import Iterator, NamedTuple, Tuple
 
 
-import tfwda.model.tensorflow
+import tfwda.model.standard
 import tfwda.logger.standard 
 
 
@@ -15,30 +15,58 @@ class IFSerializer(metaclass = abc.ABCMeta):
     
     Methods (abstract)
     ------------------
-        model : model.tensorflow.IFModel
+        model : model.standard.IFModel
             The model whose weights should be serialized
     """
 
 
     @abstractmethod
-    def flatten(self, model: tfwda.model.tensorflow.IFModel):
+    def flatten(self, model: tfwda.model.standard.IFModel):
         """Flattens the model weights
         
         Parameters
         ----------
-            model : model.tensorflow.IFModel
+            model : model.standard.IFModel
                 Model which represents a neural network architecture and holds the weights of it
         """
         pass
 
 
+class WeightRecord(NamedTuple):
+    """A single flattened weight
+
+    Attributes
+    ----------
+        name  : str
+            Name of the variable
+        shape : tuple
+            Shape of the variable before flattening
+        dtype : str
+            Name of the native numpy dtype, e.g. float32, float16 or bfloat16
+        view  : np.ndarray
+            Flat, contiguous array in the native dtype, a view on the variable data whenever
+            the data is contiguous already
+    """
+    name  : str
+    shape : tuple
+    dtype : str
+    view  : np.ndarray
+
+
 class Serializer(IFSerializer):
     """The Serializer flattens the weights of the model and extracts information as metadata
 
     Parameters
     ----------
         logger : logger.standard.Logger
-            Logger instance which is responsible for logging    
+            Logger instance which is responsible for logging
+
+    Methods
+    -------
+        iter_flatten(model model.standard.IFModel) Iterator[WeightRecord]
+            Yields the flattened weights one at a time
+        flatten(model model.standard.IFModel) list, collections.OrderedDict
+            Flattens all weights at once
     """
 
 
@@ -46,12 +74,34 @@ class Serializer(IFSerializer):
         self.logger = logger
 
 
-    def flatten(self, model: tfwda.model.tensorflow.Model) -> Tuple[list, collections.OrderedDict]:
+    def iter_flatten(self, model: tfwda.model.standard.IFModel) -> Iterator[WeightRecord]:
+        """The weights of the model are extracted lazily, every weight is only converted to numpy
+        when the record is requested and flattened without copying or casting
+
+        Parameters
+        ----------
+            model : model.standard.IFModel
+                Model with weights which should be flattened
+
+        Returns
+        -------
+            Iterator[WeightRecord]
+                Records of name, shape, dtype and flat view of every weight
+        """
+        for weight in model.weights:
+            name  = weight.name
+            shape = Serializer.shape_of(weight)
+            dtype = tfwda.model.standard.dtype_of(weight)
+            self.logger.log("%s of shape %s and type %s is flattened now...", "Info", name, shape, dtype)
+            yield WeightRecord(name, shape, dtype, np.ascontiguousarray(weight.numpy()).reshape(-1))
+
+
+    def flatten(self, model: tfwda.model.standard.IFModel) -> Tuple[list, collections.OrderedDict]:
         """The weights of the model are extracted and serialized, also the metdata is extracted
 
         Parameters
         ----------
-            model : model.tensorflow.Model
+            model : model.standard.IFModel
                 Model with weights which should be flattened
 
         Returns
@@ -62,15 +112,22 @@ class Serializer(IFSerializer):
         """
         serialized_weights = []
         metadata           = collections.OrderedDict({'names': [], 'shapes': [], 'dtypes': []})
-        for weight in model.weights:
-            name  = weight.name
-            shape = weight.shape
-            dtype = np.dtype(weight.dtype.as_numpy_dtype).name
-            value = weight.numpy()
-            self.logger.log(f"{name} of shape {shape} and type {dtype} is flattened now...", "Info")
-            serialized_weights.append(value.flatten())
-            metadata['names'].append(name)
-            metadata['shapes'].append(shape)
-            metadata['dtypes'].append(dtype)
-            
-        return serialized_weights, metadata
\ No newline at end of file
+        for record in self.iter_flatten(model):
+            serialized_weights.append(record.view)
+            metadata['names'].append(record.name)
+            metadata['shapes'].append(record.shape)
+            metadata['dtypes'].append(record.dtype)
+
+        return serialized_weights, metadata
+
+
+    @staticmethod
+    def shape_of(weight) -> tuple:
+        """Shape of a variable as a tuple, works for tensorflow variables and numpy-like arrays
+
+        Parameters
+        ----------
+            weight : tf.Variable
+                Variable whose shape is requested
+        """
+        return tfwda.model.standard.shape_of(weight)
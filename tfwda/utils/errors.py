@@ -6,4 +6,25 @@ class NotCreatedInstanceError(Exception):
     """
 
     def __init__(self, message) -> None:
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class PipelineError(Exception):
+    """
+    This Error should be raised when a stage of a pipeline
+    failed, the original exception is chained as its cause
+    and the name of the failed stage is kept.
+    """
+
+    def __init__(self, message, stage) -> None:
+        super().__init__(message)
+        self.stage = stage
+
+
+class PipelineCancelledError(Exception):
+    """
+    This Error should be raised when a pipeline has been
+    cancelled before all items were processed.
+    """
+
+    def __init__(self, message) -> None:
+        super().__init__(message)